@@ -1,11 +1,12 @@
 import networkx as nx
-import matplotlib.pyplot as plt
-from networkx.algorithms import isomorphism
+
+from experiments.exp_04_structural_analysis.partition_matcher import PartitionedMatcher
 
 class PatternDetector:
     """
     [Classical Algorithm Approach]
-    Uses VF2 algorithm to find exact subgraph isomorphism/homomorphism.
+    Finds exact pattern matches (cycles, fan-in/out, chains, VF2 subgraph monomorphisms)
+    via the exp_04 pattern registry.
     Target: Detecting Circular Trading (Money Laundering) patterns.
     """
     def __init__(self):
@@ -28,30 +29,24 @@ class PatternDetector:
         self.market_graph.add_edges_from(fraud_edges)
         print("⚠️ Injected Fraud Pattern: 100 -> 101 -> 102 -> 100")
 
-    def detect_pattern(self, pattern_type="circular"):
+    def detect_pattern(self, pattern_type="circular", max_workers=1):
         """
         Detects if the pattern graph exists within the market graph.
-        Mapping: Subgraph Isomorphism
+        pattern_type: a registered pattern name (circular, k_cycle, fan_in, fan_out, layering_chain,
+        bidirectional) or a Pattern object (e.g. SubgraphPattern with attribute predicates).
+        Matching runs through PartitionedMatcher (partitions + process pool for large graphs).
         """
-        # Define the pattern to search for
-        pattern_graph = nx.DiGraph()
-        if pattern_type == "circular":
-            # Finding a 3-cycle (Triangle)
-            pattern_graph.add_edges_from([(0, 1), (1, 2), (2, 0)])
-        
-        # Use VF2 Algorithm for Subgraph Isomorphism
-        # G1: Market (Large), G2: Pattern (Small)
-        matcher = isomorphism.DiGraphMatcher(self.market_graph, pattern_graph)
-        
-        results = list(matcher.subgraph_isomorphisms_iter())
-        
+        # 패턴 정의/매칭은 exp_04 레지스트리 + 파티션 매처를 사용 (자기동형 중복은 병합 단계에서 제거)
+        matcher = PartitionedMatcher([pattern_type], max_workers=max_workers)
+        results = next(iter(matcher.run(self.market_graph).values()))
+
         if results:
-            print(f"\n🚨 [MATHEMATICAL DETECTION] Found {len(results)} isomorphic subgraphs!")
-            for idx, mapping in enumerate(results):
-                print(f"   Match #{idx+1} (Market Node -> Pattern Node): {mapping}")
-                # 역매핑을 통해 실제 마켓의 노드들을 추출 가능
+            print(f"\n🚨 [MATHEMATICAL DETECTION] Found {len(results)} '{results[0].pattern}' subgraphs!")
+            for idx, match in enumerate(results):
+                print(f"   Match #{idx+1} (Market Nodes): {match.nodes}")
         else:
             print("\n✅ No fraud patterns detected.")
+        return results
 
 if __name__ == "__main__":
     detector = PatternDetector()
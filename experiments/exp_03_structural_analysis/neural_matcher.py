@@ -47,12 +47,25 @@ class GIN(torch.nn.Module):
         
         return x
 
+_MODEL = None
+
+def get_model(seed=0):
+    """
+    호출마다 무작위 초기화된 새 모델을 만들면 같은 그래프 쌍도 호출마다 점수가 달라지므로
+    seed를 고정한 모델 하나를 만들어 재사용
+    """
+    global _MODEL
+    if _MODEL is None:
+        torch.manual_seed(seed)
+        _MODEL = GIN(in_channels=1, hidden_channels=32, out_channels=16)
+        _MODEL.eval()
+    return _MODEL
+
 def calculate_similarity(graph1, graph2):
     """
     Compares two graphs using GIN embeddings.
     """
-    model = GIN(in_channels=1, hidden_channels=32, out_channels=16)
-    model.eval()
+    model = get_model()
 
     # Dummy Feature (All 1s) - We focus on structure, not node features here
     with torch.no_grad():
@@ -0,0 +1,266 @@
+import json
+import os
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import networkx as nx
+
+from .embedding_service import GraphEmbeddingService
+from .tensor_convert import CSRGraph, batch_edge_arrays
+from .utils import generate_financial_network
+
+def _atomic_write(path: str, write):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+class IVFIndex:
+    """
+    [Retrieval Approach]
+    Inverted-file (IVF) approximate nearest-neighbour index for L2-normalised embeddings (cosine).
+
+    - k-means로 나눈 n_lists개 셀(centroid)에 벡터를 배정하고, 질의 시 가까운 n_probe개 셀만 탐색 (sub-linear)
+    - 학습 전(train_min 미만)에는 전수 탐색 버퍼로 동작하고, 충분히 쌓이면 자동으로 학습
+    - add()는 가장 가까운 셀에 추가만 하므로 신규 계좌를 바로 넣을 수 있음 (재학습 불필요)
+    - save()/load(): .npy + meta.json, 벡터는 mmap으로 로드
+    """
+    def __init__(self, dim: int, n_lists: Optional[int] = None, n_probe: int = 8, train_min: int = 1024,
+                 kmeans_iters: int = 20, seed: int = 0):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_min = train_min
+        self.kmeans_iters = kmeans_iters
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self._ids: List[List[np.ndarray]] = []        # 셀별 id 조각 (search 시 병합)
+        self._vectors: List[List[np.ndarray]] = []
+        self._pending_ids: List[np.ndarray] = []      # 학습 전 버퍼
+        self._pending_vectors: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        stored = sum(len(chunk) for chunks in self._ids for chunk in chunks)
+        return stored + sum(len(chunk) for chunk in self._pending_ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    # ------------------------------------------
+    # Training / Insert
+    # ------------------------------------------
+    def _kmeans(self, vectors: np.ndarray, n_lists: int) -> np.ndarray:
+        """구면(spherical) k-means: 내적 기준 배정 + 평균 후 정규화"""
+        rng = np.random.default_rng(self.seed)
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iters):
+            assign = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, vectors)
+            empty = np.bincount(assign, minlength=n_lists) == 0
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]  # 빈 셀은 임의 점으로 재시작
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        return centroids.astype(np.float32)
+
+    def train(self, vectors: Optional[np.ndarray] = None):
+        """버퍼(또는 주어진 표본)로 셀 학습 후 버퍼의 벡터를 셀에 배정"""
+        sample = vectors if vectors is not None else np.concatenate(self._pending_vectors)
+        n_lists = self.n_lists or int(np.clip(np.sqrt(len(sample)), 1, 4096))
+        self.centroids = self._kmeans(np.asarray(sample, dtype=np.float32), min(n_lists, len(sample)))
+        self._ids = [[] for _ in range(len(self.centroids))]
+        self._vectors = [[] for _ in range(len(self.centroids))]
+        pending = list(zip(self._pending_ids, self._pending_vectors))
+        self._pending_ids, self._pending_vectors = [], []
+        for ids, vecs in pending:
+            self._assign(ids, vecs)
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if not self.is_trained:
+            self._pending_ids.append(ids)
+            self._pending_vectors.append(vectors)
+            if sum(len(chunk) for chunk in self._pending_ids) >= self.train_min:
+                self.train()
+            return
+        self._assign(ids, vectors)
+
+    def _assign(self, ids: np.ndarray, vectors: np.ndarray):
+        cells = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(cells, kind="stable")
+        cells, ids, vectors = cells[order], ids[order], vectors[order]
+        bounds = np.flatnonzero(np.diff(cells)) + 1
+        starts = np.concatenate([[0], bounds]).tolist()
+        for start, cell_ids, cell_vecs in zip(starts, np.split(ids, bounds), np.split(vectors, bounds)):
+            cell = int(cells[start])
+            self._ids[cell].append(cell_ids)
+            self._vectors[cell].append(cell_vecs)
+
+    def _cell(self, cell: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self._ids[cell]) > 1:
+            self._ids[cell] = [np.concatenate(self._ids[cell])]
+            self._vectors[cell] = [np.concatenate(self._vectors[cell])]
+        if not self._ids[cell]:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32)
+        return self._ids[cell][0], self._vectors[cell][0]
+
+    # ------------------------------------------
+    # Search
+    # ------------------------------------------
+    def search(self, query: np.ndarray, k: int = 10, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """질의 벡터(들) -> (ids [Q, k], scores [Q, k]) (결과가 k개보다 적으면 id=-1, score=-inf)"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1, self.dim)
+        result_ids = np.full((len(query), k), -1, dtype=np.int64)
+        result_scores = np.full((len(query), k), -np.inf, dtype=np.float32)
+
+        pending = ((np.concatenate(self._pending_ids), np.concatenate(self._pending_vectors))
+                   if self._pending_ids else None)
+        probes = None
+        if self.is_trained:
+            n_probe = min(n_probe or self.n_probe, len(self.centroids))
+            probes = np.argsort(-(query @ self.centroids.T), axis=1)[:, :n_probe]
+
+        for q in range(len(query)):
+            parts = [self._cell(int(c)) for c in probes[q]] if probes is not None else []
+            if pending is not None:
+                parts.append(pending)
+            if not parts:
+                continue
+            ids = np.concatenate([p[0] for p in parts])
+            vecs = np.concatenate([p[1] for p in parts])
+            if len(ids) == 0:
+                continue
+            scores = vecs @ query[q]
+            top = np.argsort(-scores)[:k] if len(scores) <= k else np.argpartition(-scores, k)[:k]
+            top = top[np.argsort(-scores[top])]
+            result_ids[q, :len(top)] = ids[top]
+            result_scores[q, :len(top)] = scores[top]
+        return result_ids, result_scores
+
+    # ------------------------------------------
+    # Persistence
+    # ------------------------------------------
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        cells = range(len(self._ids))
+        parts = [self._cell(c) for c in cells]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(p[0]) for p in parts], out=offsets[1:])
+        pending_ids = np.concatenate(self._pending_ids) if self._pending_ids else np.empty(0, dtype=np.int64)
+        pending_vecs = (np.concatenate(self._pending_vectors) if self._pending_vectors
+                        else np.empty((0, self.dim), dtype=np.float32))
+        arrays = {
+            "centroids": self.centroids if self.is_trained else np.empty((0, self.dim), dtype=np.float32),
+            "ids": np.concatenate([p[0] for p in parts] + [pending_ids]),
+            "vectors": np.concatenate([p[1] for p in parts] + [pending_vecs]),
+            "offsets": offsets,
+        }
+        # load()한 인덱스는 셀이 같은 파일을 mmap하고 있으므로 제자리에 덮어쓰지 않고
+        # 임시 파일에 쓴 뒤 os.replace로 교체 (기존 mmap은 이전 파일 내용을 계속 참조)
+        for name, array in arrays.items():
+            _atomic_write(os.path.join(directory, f"{name}.npy"), lambda f, a=array: np.save(f, a))
+        meta = {"dim": self.dim, "n_lists": self.n_lists, "n_probe": self.n_probe, "train_min": self.train_min,
+                "kmeans_iters": self.kmeans_iters, "seed": self.seed, "pending": int(len(pending_ids))}
+        _atomic_write(os.path.join(directory, "meta.json"), lambda f: f.write(json.dumps(meta).encode("utf-8")))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "IVFIndex":
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        pending = meta.pop("pending")
+        index = cls(**meta)
+        mode = "r" if mmap else None
+        centroids = np.load(os.path.join(directory, "centroids.npy"))
+        ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode=mode)
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mode)
+        offsets = np.load(os.path.join(directory, "offsets.npy"))
+        if len(centroids):
+            index.centroids = centroids
+            index._ids = [[ids[offsets[c]:offsets[c + 1]]] for c in range(len(centroids))]
+            index._vectors = [[vectors[offsets[c]:offsets[c + 1]]] for c in range(len(centroids))]
+        if pending:
+            index._pending_ids = [np.array(ids[len(ids) - pending:])]
+            index._pending_vectors = [np.array(vectors[len(vectors) - pending:])]
+        return index
+
+class EgoSubgraphIndex:
+    """
+    계좌별 ego-subgraph(반경 radius) 임베딩을 IVF 인덱스에 저장하고
+    "알려진 자금세탁 패턴과 가장 비슷한 이웃 구조" 를 검색
+    """
+    def __init__(self, service: Optional[GraphEmbeddingService] = None, index: Optional[IVFIndex] = None,
+                 radius: int = 2, batch_size: int = 2048):
+        self.service = service or GraphEmbeddingService()
+        self.index = index or IVFIndex(dim=self.service.model.lin.out_features)
+        self.radius = radius
+        self.batch_size = batch_size
+        self.accounts: List[Hashable] = []            # 인덱스 id -> 계좌
+        self._account_ids: Dict[Hashable, int] = {}
+
+    def ego_graph(self, G: nx.DiGraph, node, undirected=None) -> nx.DiGraph:
+        """
+        반경 radius 이내(방향 무시) 노드의 유도 부분 그래프
+        nx.ego_graph(undirected=True)는 호출마다 전체 그래프를 무방향으로 복사하므로 view를 재사용
+        """
+        undirected = undirected if undirected is not None else G.to_undirected(as_view=True)
+        nodes = nx.single_source_shortest_path_length(undirected, node, cutoff=self.radius)
+        return G.subgraph(nodes)
+
+    def add_accounts(self, G: nx.DiGraph, nodes: Optional[Iterable] = None) -> int:
+        """새 계좌(또는 전체)의 ego-subgraph를 임베딩하여 추가. 이미 있는 계좌는 건너뜀 -> 추가된 수"""
+        nodes = [n for n in (G.nodes() if nodes is None else nodes) if n not in self._account_ids]
+        if not nodes:
+            return 0
+        # 그래프를 CSR로 한 번만 변환 -> ego 추출 / 텐서 변환 / 배치 구성을 NumPy로 처리
+        csr = CSRGraph.from_networkx(G)
+        in_channels = self.service.in_channels
+        for start in range(0, len(nodes), self.batch_size):
+            chunk = nodes[start:start + self.batch_size]
+            egos = [csr.subgraph_edges(csr.ego_nodes(csr.node_id(n), self.radius)) for n in chunk]
+            embeddings = self.service.embed_batch(batch_edge_arrays(egos, in_channels)).numpy()
+            ids = np.arange(len(self.accounts), len(self.accounts) + len(chunk))
+            for node, i in zip(chunk, ids.tolist()):
+                self._account_ids[node] = i
+                self.accounts.append(node)
+            self.index.add(ids, embeddings)
+        return len(nodes)
+
+    def query(self, pattern: nx.Graph, k: int = 10, n_probe: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """패턴 그래프와 가장 유사한 ego-subgraph의 중심 계좌 k개 (계좌, 코사인 유사도)"""
+        embedding = self.service.embed([pattern]).numpy()
+        ids, scores = self.index.search(embedding, k, n_probe)
+        return [(self.accounts[i], float(s)) for i, s in zip(ids[0].tolist(), scores[0].tolist()) if i >= 0]
+
+    def save(self, directory: str):
+        self.index.save(directory)
+        with open(os.path.join(directory, "accounts.json"), "w", encoding="utf-8") as f:
+            json.dump({"radius": self.radius, "accounts": self.accounts}, f)
+
+    @classmethod
+    def load(cls, directory: str, service: Optional[GraphEmbeddingService] = None) -> "EgoSubgraphIndex":
+        with open(os.path.join(directory, "accounts.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        ego = cls(service, IVFIndex.load(directory), radius=meta["radius"])
+        ego.accounts = meta["accounts"]
+        ego._account_ids = {node: i for i, node in enumerate(ego.accounts)}
+        return ego
+
+if __name__ == "__main__":
+    G = generate_financial_network(num_nodes=5000, num_edges=15000)
+    ring = [100, 200, 300, 400]
+    G.add_edges_from(zip(ring, ring[1:] + ring[:1]), type="fraud")
+
+    ego_index = EgoSubgraphIndex(radius=2)
+    start = time.perf_counter()
+    ego_index.add_accounts(G)
+    print(f"✅ Indexed {len(ego_index.index)} ego-subgraphs in {time.perf_counter() - start:.2f}s")
+
+    pattern = ego_index.ego_graph(G, 100)
+    start = time.perf_counter()
+    matches = ego_index.query(pattern, k=5)
+    print(f"🔍 Top matches for account 100's neighbourhood ({(time.perf_counter() - start) * 1000:.1f}ms):")
+    for account, score in matches:
+        print(f"   account {account}: {score:.6f}")
@@ -0,0 +1,175 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+
+from .cycle_engine import CycleEngine
+from .utils import TransactionArrays, generate_transaction_arrays
+
+# 크기 단계: (계좌 수, 거래 수, 주입 고리 수)
+TIERS: Dict[str, Tuple[int, int, int]] = {
+    "small": (10_000, 50_000, 20),
+    "medium": (100_000, 500_000, 100),
+    "large": (1_000_000, 5_000_000, 500),
+}
+
+def measure(fn: Callable, *args, **kwargs) -> Tuple[object, float, float]:
+    """fn 실행 -> (결과, 경과 시간(s), tracemalloc 최대 메모리(MB))
+    NumPy/파이썬 객체 할당은 추적되지만 torch 내부 할당자는 포함되지 않음"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+# ==========================================
+# Matchers under test
+# ==========================================
+def run_exact(data: TransactionArrays, min_amount: Optional[float] = None) -> Dict:
+    """CycleEngine으로 길이 min..max(ring_sizes) 고리를 전부 찾고 주입된 고리와 비교 (고리 단위 precision/recall)"""
+    sizes = [len(r) for r in data.rings] or [3]
+    planted = {frozenset(r) for r in data.rings}
+    is_member = np.zeros(data.num_nodes, dtype=bool)
+    is_member[[n for r in data.rings for n in r]] = True
+
+    engine = CycleEngine(data.src, data.dst, data.amount)
+    detected, hits = 0, set()
+    for nodes, _ in engine.cycle_batches(k=max(sizes), min_length=min(sizes), min_amount=min_amount):
+        detected += len(nodes)
+        # 모든 노드가 주입 고리 계좌인 고리만 파이썬으로 비교
+        for row in nodes[is_member[nodes].all(axis=1)].tolist():
+            if frozenset(row) in planted:
+                hits.add(frozenset(row))
+    return {
+        "detected": detected,
+        "precision": len(hits) / detected if detected else 1.0,
+        "recall": len(hits) / len(planted) if planted else 1.0,
+    }
+
+def run_neural(data: TransactionArrays, sample: int = 5000, radius: int = 1, seed: int = 0,
+               service=None, weights_path: Optional[str] = None) -> Dict:
+    """
+    주입 고리 계좌 + 무작위 배경 계좌 sample개의 ego-subgraph를 GIN으로 임베딩하고
+    방향 고리 패턴(길이 = ring_sizes)과의 최대 코사인 유사도로 순위 -> 상위 K(= 고리 계좌 수) precision/recall
+    학습된 가중치(weights_path 또는 service)가 없으면 임의 초기화 GIN이라 순위가 우연 수준이므로
+    처리량만 측정하고 precision/recall은 보고하지 않는다.
+    """
+    # torch / torch_geometric은 neural 단계에서만 로드 (exact만 측정할 때는 import 비용 없음)
+    import torch
+    from .embedding_service import GraphEmbeddingService
+    from .tensor_convert import CSRGraph, batch_edge_arrays, nx_to_data
+
+    trained = service is not None or weights_path is not None
+    service = service or GraphEmbeddingService(weights_path=weights_path, seed=seed)
+    rng = np.random.default_rng(seed)
+    members = np.array(sorted({n for r in data.rings for n in r}), dtype=np.int64)
+    background = np.setdiff1d(rng.choice(data.num_nodes, size=min(sample, data.num_nodes), replace=False), members)
+    nodes = np.concatenate([members, background[:max(0, sample - len(members))]])
+
+    csr = CSRGraph(data.src, data.dst, data.num_nodes)
+    scores: List["torch.Tensor"] = []
+    patterns = service.embed_data([nx_to_data(nx.cycle_graph(size, create_using=nx.DiGraph))
+                                   for size in sorted({len(r) for r in data.rings} or {3})])
+    for start in range(0, len(nodes), service.batch_size):
+        egos = [csr.subgraph_edges(csr.ego_nodes(n, radius)) for n in nodes[start:start + service.batch_size].tolist()]
+        embeddings = service.embed_batch(batch_edge_arrays(egos, service.in_channels))
+        scores.append(service.similarity_matrix(embeddings, patterns).max(dim=1).values)
+    score = torch.cat(scores).numpy() if scores else np.empty(0)
+    if not trained:
+        return {"scored": len(nodes)}
+
+    k = len(members)
+    top = np.argsort(-score, kind="stable")[:k]
+    hits = int((top < len(members)).sum())
+    return {
+        "scored": len(nodes),
+        "precision": hits / k if k else 1.0,
+        "recall": hits / len(members) if len(members) else 1.0,
+    }
+
+# ==========================================
+# Harness
+# ==========================================
+def run_tier(name: str, seed: int = 0, neural_sample: int = 5000,
+             ring_amount_floor: float = 4e6, neural_weights: Optional[str] = None) -> List[Dict]:
+    num_nodes, num_edges, num_rings = TIERS[name]
+    from . import embedding_service  # noqa: F401  torch import 시간이 첫 neural 측정에 섞이지 않도록 미리 로드
+    data, gen_s, gen_mb = measure(generate_transaction_arrays, num_nodes, num_edges, num_rings, seed=seed)
+    rows = [{"tier": name, "matcher": "generate", "seconds": gen_s, "peak_mb": gen_mb, "edges": len(data.src)}]
+    for matcher, fn, kwargs in [
+        ("exact", run_exact, {}),
+        ("exact_amount", run_exact, {"min_amount": ring_amount_floor}),  # 고액 거래만 (주입 고리는 5백만 원 이상)
+        # 가중치가 없으면 "neural_untrained" (처리량 기준선, 정확도 비교에서 제외)
+        ("neural" if neural_weights else "neural_untrained", run_neural,
+         {"sample": neural_sample, "seed": seed, "weights_path": neural_weights}),
+    ]:
+        result, seconds, peak = measure(fn, data, **kwargs)
+        rows.append({"tier": name, "matcher": matcher, "seconds": seconds, "peak_mb": peak, **result})
+    return rows
+
+def check_regressions(rows: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """기준 결과 대비 시간이 tolerance배 넘게 늘었거나 precision/recall이 떨어진 항목"""
+    reference = {(r["tier"], r["matcher"]): r for r in baseline}
+    failures = []
+    for row in rows:
+        base = reference.get((row["tier"], row["matcher"]))
+        if base is None:
+            continue
+        if row["seconds"] > base["seconds"] * tolerance:
+            failures.append(f"{row['tier']}/{row['matcher']}: {row['seconds']:.2f}s > "
+                            f"{base['seconds']:.2f}s x {tolerance}")
+        for metric in ("precision", "recall"):
+            if metric in base and row.get(metric, 0.0) < base[metric] - 1e-9:
+                failures.append(f"{row['tier']}/{row['matcher']}: {metric} {row[metric]:.3f} < {base[metric]:.3f}")
+    return failures
+
+def print_table(rows: List[Dict]):
+    print(f"{'tier':<8} {'matcher':<16} {'seconds':>9} {'peak MB':>9} {'precision':>10} {'recall':>8}")
+    for row in rows:
+        precision = f"{row['precision']:.3f}" if "precision" in row else "-"
+        recall = f"{row['recall']:.3f}" if "recall" in row else "-"
+        print(f"{row['tier']:<8} {row['matcher']:<16} {row['seconds']:>9.2f} {row['peak_mb']:>9.1f} "
+              f"{precision:>10} {recall:>8}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Exact / neural matcher benchmark on planted fraud rings")
+    parser.add_argument("--tiers", nargs="+", default=["small", "medium"], choices=sorted(TIERS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--neural-sample", type=int, default=5000)
+    parser.add_argument("--neural-weights", help="학습된 GIN 가중치 (없으면 neural은 처리량만 측정)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (다음 실행의 --baseline)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="허용 시간 배수")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for tier in args.tiers:
+        rows.extend(run_tier(tier, seed=args.seed, neural_sample=args.neural_sample,
+                             neural_weights=args.neural_weights))
+    print_table(rows)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            failures = check_regressions(rows, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"🚨 Regression: {failure}")
+        if failures:
+            return 1
+        print("✅ No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
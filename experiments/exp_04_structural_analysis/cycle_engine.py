@@ -0,0 +1,215 @@
+import numpy as np
+import networkx as nx
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+class CycleMatch(NamedTuple):
+    nodes: Tuple                # 정규형: 내부 번호(입력 순서)가 가장 작은 노드에서 시작하는 회전 (A -> B -> C -> A 는 (A, B, C))
+    amounts: Optional[Tuple]    # 고리를 따라가는 간선별 거래 금액 (금액 정보가 없으면 None)
+
+class CycleEngine:
+    """
+    [Scalable Approach]
+    Rank-ordered enumeration of directed k-cycles by sparse path expansion (NumPy, CSR).
+
+    - 각 고리는 그 안에서 순위(rank)가 가장 낮은 노드를 root로 하여 정확히 한 번만 생성된다.
+      (VF2처럼 회전마다 중복 보고하지 않음)
+    - 허브(진입 x 진출 차수가 큰 노드)가 낮은 순위를 가지므로 먼저 root로 처리되고,
+      이후 경로에서는 root보다 높은 순위의 노드만 사용하여 탐색 공간을 줄인다.
+    - 경로를 배열 단위로 한 hop씩 확장하고, 마지막 hop은 "root로 돌아오는 간선" 조회(정렬 키 이진 탐색)로 닫는다.
+    - 진입/진출 차수가 0인 노드는 고리에 속할 수 없으므로 반복적으로 제거한다.
+    """
+    def __init__(self, src: np.ndarray, dst: np.ndarray, amount: Optional[np.ndarray] = None,
+                 labels: Optional[Sequence] = None, max_paths: int = 4_000_000):
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        num_nodes = len(labels) if labels is not None else int(max(src.max(initial=-1), dst.max(initial=-1)) + 1)
+        self.labels = list(labels) if labels is not None else None
+        self.num_nodes = num_nodes
+        self.max_paths = max_paths  # hop마다 한 번에 확장하는 부분 경로 수 상한 (메모리 제한)
+
+        # self-loop만 제거 (같은 u -> v 거래가 여러 건이면 금액 필터 후 cycle_batches에서 하나로 합침)
+        keep = src != dst
+        self.src, self.dst = src[keep], dst[keep]
+        self.amount = np.asarray(amount, dtype=np.float64)[keep] if amount is not None else None
+
+    @classmethod
+    def from_networkx(cls, G: nx.DiGraph, weight: Optional[str] = "amount",
+                      edge_filter: Optional[Callable[[object, object, Dict], bool]] = None,
+                      **kwargs) -> "CycleEngine":
+        """
+        NetworkX 그래프를 배열로 변환 (edge_filter(u, v, data)가 False인 간선은 제외)
+        weight 속성이 없는 간선의 금액은 NaN으로 기록
+        """
+        labels = list(G.nodes())
+        index = {node: i for i, node in enumerate(labels)}
+        src, dst, amount = [], [], []
+        for u, v, data in G.edges(data=True):
+            if edge_filter is not None and not edge_filter(u, v, data):
+                continue
+            src.append(index[u])
+            dst.append(index[v])
+            amount.append(data.get(weight, np.nan) if weight else np.nan)
+        return cls(np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64),
+                   np.array(amount, dtype=np.float64) if weight else None, labels, **kwargs)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.src)
+
+    # ------------------------------------------
+    # Preprocessing
+    # ------------------------------------------
+    def _edge_mask(self, min_amount: Optional[float], max_amount: Optional[float]) -> np.ndarray:
+        mask = np.ones(self.num_edges, dtype=bool)
+        if (min_amount is not None or max_amount is not None) and self.amount is None:
+            raise ValueError("amount filter requires edge amounts")
+        if min_amount is not None:
+            mask &= self.amount >= min_amount
+        if max_amount is not None:
+            mask &= self.amount <= max_amount
+        return mask
+
+    def _prune(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        """진입 또는 진출 차수가 0인 노드를 더 이상 없을 때까지 제거 -> 남은 간선 마스크"""
+        alive = np.ones(len(src), dtype=bool)
+        while True:
+            out_deg = np.bincount(src[alive], minlength=self.num_nodes)
+            in_deg = np.bincount(dst[alive], minlength=self.num_nodes)
+            dead = (out_deg == 0) | (in_deg == 0)
+            next_alive = alive & ~dead[src] & ~dead[dst]
+            if next_alive.sum() == alive.sum():
+                return alive
+            alive = next_alive
+
+    # ------------------------------------------
+    # Enumeration
+    # ------------------------------------------
+    def cycles(self, k: int = 3, min_length: Optional[int] = None, min_amount: Optional[float] = None,
+               max_amount: Optional[float] = None) -> Iterator[CycleMatch]:
+        """
+        길이 min_length..k 인 방향 고리를 하나씩 생성 (기본: 정확히 길이 k)
+        min_amount / max_amount: 이 범위를 벗어난 금액의 간선은 고리 구성에서 제외
+        """
+        for nodes, amounts in self.cycle_batches(k, min_length, min_amount, max_amount):
+            labels = self.labels
+            for i, row in enumerate(nodes.tolist()):
+                ring = tuple(labels[n] for n in row) if labels is not None else tuple(row)
+                ring_amounts = None
+                if amounts is not None and not np.isnan(amounts[i]).all():
+                    ring_amounts = tuple(amounts[i].tolist())
+                yield CycleMatch(ring, ring_amounts)
+
+    def cycle_batches(self, k: int = 3, min_length: Optional[int] = None, min_amount: Optional[float] = None,
+                      max_amount: Optional[float] = None) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """
+        cycles()의 배열 버전: (노드 번호 [N, L], 간선 금액 [N, L] 또는 None) 묶음을 생성
+        결과가 수백만 개일 때 파이썬 객체 생성 없이 후처리할 수 있다.
+        """
+        min_length = min_length or k
+        if not 2 <= min_length <= k:
+            raise ValueError("require 2 <= min_length <= k")
+
+        mask = self._edge_mask(min_amount, max_amount)
+        src, dst = self.src[mask], self.dst[mask]
+        amount = self.amount[mask] if self.amount is not None else None
+        n = self.num_nodes
+        # 중복 간선은 금액 조건을 만족하는 첫 번째 거래만 사용 (필터 전에 합치면 조건을 만족하는 거래가 사라짐)
+        _, first = np.unique(src * n + dst, return_index=True)
+        first.sort()
+        src, dst = src[first], dst[first]
+        amount = amount[first] if amount is not None else None
+        alive = self._prune(src, dst)
+        src, dst = src[alive], dst[alive]
+        amount = amount[alive] if amount is not None else None
+        if len(src) == 0:
+            return
+
+        # rank: 차수(진입 x 진출)가 큰 노드일수록 낮은 순위 -> 먼저 root로 처리되고 이후 경로에서 제외
+        degree = np.bincount(src, minlength=n) * np.bincount(dst, minlength=n)
+        rank = np.empty(n, dtype=np.int64)
+        rank[np.argsort(-degree, kind="stable")] = np.arange(n)
+
+        # 간선 조회용 정렬 키 (u * n + v) / 경로 확장용 CSR
+        keys = src * n + dst
+        order = np.argsort(keys)
+        keys = keys[order]
+        src, dst = src[order], dst[order]
+        amount = amount[order] if amount is not None else None
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+        def walk(paths: np.ndarray, length: int):
+            # 깊이 우선: 확장 결과를 max_paths 단위로 나눠 다음 hop으로 넘기므로 hop마다 메모리가 제한됨
+            if length >= min_length:
+                closed, positions = self._lookup(keys, paths[:, -1] * n + paths[:, 0])
+                if closed.any():
+                    yield self._canonical(paths[closed], keys, amount, positions[closed], n)
+            if length == k:
+                return
+            last = paths[:, -1]
+            for lo, hi in self._chunks(indptr[last + 1] - indptr[last]):
+                extended = self._extend(paths[lo:hi], indptr, dst, rank)
+                if len(extended):
+                    yield from walk(extended, length + 1)
+
+        # 시작 간선: root -> a (rank[a] > rank[root])
+        starts = np.flatnonzero(rank[dst] > rank[src])
+        for lo, hi in self._chunks(np.ones(len(starts), dtype=np.int64)):
+            chunk = starts[lo:hi]
+            yield from walk(np.stack([src[chunk], dst[chunk]], axis=1), 2)
+
+    def _chunks(self, counts: np.ndarray) -> Iterator[Tuple[int, int]]:
+        """counts의 구간 합이 max_paths를 넘지 않도록 나눈 [lo, hi) 구간 (한 항목이 상한보다 크면 단독 구간)"""
+        total = np.cumsum(counts)
+        lo = 0
+        while lo < len(counts):
+            base = total[lo - 1] if lo else 0
+            hi = max(int(np.searchsorted(total, base + self.max_paths, side="right")), lo + 1)
+            yield lo, hi
+            lo = hi
+
+    @staticmethod
+    def _lookup(keys: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """정렬된 간선 키에서 (존재 여부, 위치) 조회"""
+        positions = np.searchsorted(keys, query)
+        found = positions < len(keys)
+        found[found] = keys[positions[found]] == query[found]
+        return found, positions
+
+    @staticmethod
+    def _extend(paths: np.ndarray, indptr: np.ndarray, dst: np.ndarray, rank: np.ndarray) -> np.ndarray:
+        """모든 부분 경로를 한 hop씩 확장 (root보다 높은 순위 + 경로에 없는 노드만)"""
+        last = paths[:, -1]
+        begin = indptr[last]
+        counts = indptr[last + 1] - begin
+        total = int(counts.sum())
+        if total == 0:
+            return paths[:0]
+        owner = np.repeat(np.arange(len(paths)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        nxt = dst[np.repeat(begin, counts) + offsets]
+
+        prev = paths[owner]
+        keep = rank[nxt] > rank[prev[:, 0]]
+        for column in range(1, paths.shape[1]):
+            keep &= nxt != prev[:, column]
+        return np.column_stack([prev[keep], nxt[keep]])
+
+    @staticmethod
+    def _canonical(paths: np.ndarray, keys: np.ndarray, amount: Optional[np.ndarray],
+                   closing: np.ndarray, n: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """가장 작은 노드 번호에서 시작하도록 회전 + 간선 금액 정렬"""
+        rows, length = paths.shape
+        shift = (paths.argmin(axis=1)[:, None] + np.arange(length)) % length
+        rotated = np.take_along_axis(paths, shift, axis=1)
+        if amount is None:
+            return rotated, None
+
+        # i번째 간선: path[i] -> path[i+1] (마지막은 root로 돌아오는 closing 간선)
+        edge_amounts = np.empty((rows, length))
+        edge_amounts[:, :-1] = amount[np.searchsorted(keys, paths[:, :-1] * n + paths[:, 1:])]
+        edge_amounts[:, -1] = amount[closing]
+        return rotated, np.take_along_axis(edge_amounts, shift, axis=1)
+
+    def count(self, k: int = 3, **kwargs) -> int:
+        return sum(len(nodes) for nodes, _ in self.cycle_batches(k, **kwargs))
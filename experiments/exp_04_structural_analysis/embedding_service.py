@@ -0,0 +1,128 @@
+import os
+import time
+from typing import List, Optional, Sequence, Union
+
+import networkx as nx
+import torch
+import torch.nn.functional as F
+from torch_geometric.data import Batch, Data
+
+from .neural_matcher import GIN, NeuralGraphMatcher
+from .tensor_convert import ConversionCache, nx_to_data
+
+GraphLike = Union[nx.Graph, Data]
+
+class GraphEmbeddingService:
+    """
+    [Deep Learning Approach - Serving]
+    Batched GIN inference: thousands of graphs -> one embedding matrix.
+
+    - 모델은 한 번만 생성/로드하여 재사용 (seed 고정 또는 저장된 가중치 사용 -> 실행 간 임베딩이 재현됨)
+    - 그래프들을 batch_size개씩 PyG mini-batch로 묶어 inference_mode로 실행
+    - 임베딩을 L2 정규화해 두면 쌍별 코사인 유사도는 행렬곱 한 번 (similarity_matrix)
+    """
+    def __init__(self, model: Optional[torch.nn.Module] = None, weights_path: Optional[str] = None,
+                 batch_size: int = 512, num_threads: Optional[int] = None, seed: int = 0,
+                 in_channels: int = 1, hidden_channels: int = 32, out_channels: int = 16,
+                 conversion_cache: Optional[ConversionCache] = None):
+        if num_threads:
+            torch.set_num_threads(num_threads)  # CPU 추론 스레드 수 (프로세스 전역 설정)
+        if model is None:
+            torch.manual_seed(seed)
+            model = GIN(in_channels, hidden_channels, out_channels)
+        if weights_path:
+            model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+        self.model = model.eval()
+        self.batch_size = batch_size
+        self.in_channels = in_channels
+        # 같은 그래프 객체를 반복 임베딩할 때 변환 결과 재사용 (예: 조회 패턴 그래프)
+        self.conversion_cache = conversion_cache
+
+    def save(self, weights_path: str):
+        torch.save(self.model.state_dict(), weights_path)
+
+    # ------------------------------------------
+    # Conversion
+    # ------------------------------------------
+    def to_data(self, graph: GraphLike, version=None) -> Data:
+        """
+        NetworkX 그래프 또는 PyG Data -> 구조 특성(x=1)만 가진 Data
+        (간선 배열에서 직접 변환하므로 간선 속성 구성과 무관, 호출자의 그래프를 수정하지 않음)
+        """
+        if isinstance(graph, Data):
+            x = graph.x if graph.x is not None else torch.ones((graph.num_nodes, self.in_channels))
+            return Data(x=x.view(-1, self.in_channels).float(), edge_index=graph.edge_index)
+        if self.conversion_cache is not None:
+            return self.conversion_cache.get(graph, version, self.in_channels)
+        return nx_to_data(graph, self.in_channels)
+
+    # ------------------------------------------
+    # Inference
+    # ------------------------------------------
+    @torch.inference_mode()
+    def embed(self, graphs: Sequence[GraphLike], normalize: bool = True) -> torch.Tensor:
+        """그래프 N개 -> [N, out_channels] 임베딩 행렬"""
+        return self.embed_data([self.to_data(g) for g in graphs], normalize)
+
+    @torch.inference_mode()
+    def embed_batch(self, batch: Data, normalize: bool = True) -> torch.Tensor:
+        """이미 이어붙인 배치 (tensor_convert.batch_edge_arrays 결과) -> 임베딩"""
+        embeddings = self.model(batch.x, batch.edge_index, batch.batch)
+        return F.normalize(embeddings, dim=1) if normalize else embeddings
+
+    @torch.inference_mode()
+    def embed_data(self, data: Sequence[Data], normalize: bool = True) -> torch.Tensor:
+        """이미 변환된 Data 목록 -> 임베딩 (변환 비용과 추론 비용을 분리해서 측정/캐시할 때 사용)"""
+        chunks: List[torch.Tensor] = []
+        for start in range(0, len(data), self.batch_size):
+            batch = Batch.from_data_list(list(data[start:start + self.batch_size]))
+            chunks.append(self.model(batch.x, batch.edge_index, batch.batch))
+        if not chunks:
+            return torch.empty((0, self.model.lin.out_features))
+        embeddings = torch.cat(chunks)
+        return F.normalize(embeddings, dim=1) if normalize else embeddings
+
+    @staticmethod
+    def similarity_matrix(a: torch.Tensor, b: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """정규화된 임베딩 간 코사인 유사도 [len(a), len(b)] (b가 없으면 a끼리)"""
+        return a @ (a if b is None else b).T
+
+def benchmark(num_graphs: int = 2000, pairs: int = 200, num_threads: Optional[int] = None, seed: int = 0) -> dict:
+    """기존 쌍별 경로(calculate_similarity) 대비 배치 임베딩 처리량 비교 (graphs/sec)"""
+    graphs = [nx.gnm_random_graph(10 + i % 20, 20 + i % 40, directed=True, seed=seed + i) for i in range(num_graphs)]
+
+    matcher = NeuralGraphMatcher()
+    start = time.perf_counter()
+    for i in range(pairs):
+        matcher.calculate_similarity(graphs[2 * i % num_graphs], graphs[(2 * i + 1) % num_graphs])
+    per_pair = time.perf_counter() - start
+
+    service = GraphEmbeddingService(num_threads=num_threads, seed=seed)
+    start = time.perf_counter()
+    data = [service.to_data(g) for g in graphs]
+    convert_time = time.perf_counter() - start
+    start = time.perf_counter()
+    embeddings = service.embed_data(data)
+    inference_time = time.perf_counter() - start
+    start = time.perf_counter()
+    service.similarity_matrix(embeddings)
+    matmul_time = time.perf_counter() - start
+
+    return {
+        "threads": torch.get_num_threads(),
+        "per_pair_graphs_per_s": round(2 * pairs / per_pair, 1),
+        "batched_graphs_per_s": round(num_graphs / (convert_time + inference_time), 1),
+        "batched_inference_graphs_per_s": round(num_graphs / inference_time, 1),
+        "convert_s": round(convert_time, 3),
+        "inference_s": round(inference_time, 3),
+        "all_pairs_similarity_s": round(matmul_time, 4),
+        "num_pairs_scored": num_graphs * num_graphs,
+    }
+
+if __name__ == "__main__":
+    result = benchmark(num_threads=os.cpu_count())
+    print(f"🤖 Per-pair path : {result['per_pair_graphs_per_s']} graphs/s")
+    print(f"🚀 Batched embed : {result['batched_graphs_per_s']} graphs/s ({result['threads']} threads) "
+          f"| convert {result['convert_s']}s + inference {result['inference_s']}s "
+          f"({result['batched_inference_graphs_per_s']} graphs/s model-only)")
+    print(f"🧮 {result['num_pairs_scored']} pairwise similarities in {result['all_pairs_similarity_s']}s (one matmul)")
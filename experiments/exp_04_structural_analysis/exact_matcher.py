@@ -1,11 +1,11 @@
 import networkx as nx
-from networkx.algorithms import isomorphism
+from .cycle_engine import CycleEngine
 from .utils import generate_financial_network, visualize_graph
 
 class FraudPatternMatcher:
     """
     [Mathematical Approach]
-    Uses VF2 algorithm for Subgraph Isomorphism to detect exact fraud patterns.
+    Detects exact circular-trading rings with degree-ordered k-cycle enumeration (CycleEngine).
     """
     def __init__(self):
         self.market_graph = generate_financial_network(num_nodes=30, num_edges=60)
@@ -24,38 +24,32 @@ class FraudPatternMatcher:
             
         self.market_graph.add_edges_from(edges, type="fraud")
 
-    def find_fraud_patterns(self):
+    def find_fraud_patterns(self, k=3, min_length=None, min_amount=None, max_amount=None, image_path=None):
         """
-        정의된 패턴과 'Isomorphic(동형)'인 부분 그래프를 시장 전체에서 탐색
+        길이 k인 방향 순환 거래(자전 거래 고리)를 시장 전체에서 탐색
+        - 이전: VF2 DiGraphMatcher로 모든 동형 사상을 list()로 만든 뒤 출력 (고리 하나가 회전 수만큼 중복 보고)
+        - 현재: CycleEngine으로 각 고리를 정규형으로 한 번씩만 스트리밍
+        - image_path를 주면 창 대신 의심 계좌 주변만 이미지 파일로 저장 (배치 실행용)
         """
-        # 1. 찾고자 하는 패턴 정의 (삼각 순환 거래)
-        pattern = nx.DiGraph()
-        pattern.add_edges_from([(0, 1), (1, 2), (2, 0)])
-        
-        print("\n🔍 Searching for Circular Trading Patterns (Triangle)...")
-        
-        # 2. VF2 알고리즘 사용 (Subgraph Isomorphism)
-        # DiGraphMatcher(큰_그래프, 찾는_패턴)
-        matcher = isomorphism.DiGraphMatcher(self.market_graph, pattern)
-        
-        matches = list(matcher.subgraph_isomorphisms_iter())
-        
+        print(f"\n🔍 Searching for Circular Trading Patterns (length {min_length or k}..{k})...")
+
+        engine = CycleEngine.from_networkx(self.market_graph, weight="amount")
+        matches = engine.cycles(k=k, min_length=min_length, min_amount=min_amount, max_amount=max_amount)
+
         unique_suspects = set()
-        if matches:
-            print(f"🚨 FOUND {len(matches)} suspicious patterns!")
-            for i, match in enumerate(matches):
-                # match는 {패턴노드: 실제노드} 딕셔너리 반환
-                real_nodes = list(match.keys()) # NetworkX 버전에 따라 keys/values 확인 필요
-                # 매핑: {GraphNode: PatternNode} 형태임
-                
-                detected_nodes = list(match.keys())
-                print(f"   Match #{i+1}: {detected_nodes}")
-                unique_suspects.update(detected_nodes)
-                
+        found = 0
+        for found, match in enumerate(matches, start=1):
+            print(f"   Match #{found}: {' -> '.join(map(str, match.nodes))} -> {match.nodes[0]}")
+            unique_suspects.update(match.nodes)
+
+        if found:
+            print(f"🚨 FOUND {found} suspicious patterns!")
             # 시각화
-            visualize_graph(self.market_graph, title="Detected Fraud Patterns (Exact Match)", highlight_nodes=list(unique_suspects))
+            visualize_graph(self.market_graph, title="Detected Fraud Patterns (Exact Match)",
+                            highlight_nodes=list(unique_suspects), path=image_path)
         else:
             print("✅ No exact fraud patterns found.")
+        return unique_suspects
 
 if __name__ == "__main__":
     matcher = FraudPatternMatcher()
@@ -2,9 +2,10 @@ import torch
 import torch.nn.functional as F
 from torch_geometric.nn import GINConv, global_add_pool
 from torch_geometric.data import Data
-from torch_geometric.utils import from_networkx
 import networkx as nx
 
+from .tensor_convert import nx_to_data
+
 # GIN 모델 정의
 class GIN(torch.nn.Module):
     """
@@ -57,20 +58,12 @@ class NeuralGraphMatcher:
         self.model = GIN(1, 32, 16)
         self.model.eval() # Inference mode
 
-    def nx_to_pyg(self, G):
+    @staticmethod
+    def nx_to_pyg(G):
         """NetworkX 그래프를 PyTorch Geometric 데이터로 변환"""
         # 노드 피처가 없으므로 모든 노드에 상수 1 부여 (구조만 보겠다는 의미)
-        for i in G.nodes():
-            G.nodes[i]['x'] = [1.0]
-            
-        data = from_networkx(G)
-        # PyG의 x(feature) 텐서 확인 및 차원 맞춤
-        if data.x is None:
-             data.x = torch.ones((G.number_of_nodes(), 1))
-        else:
-             data.x = data.x.view(-1, 1).float()
-             
-        return data
+        # 간선 배열에서 바로 edge_index를 만들고 입력 그래프의 속성은 수정하지 않음
+        return nx_to_data(G)
 
     def calculate_similarity(self, G1, G2):
         """
@@ -0,0 +1,152 @@
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import networkx as nx
+
+from .patterns import Pattern, PatternMatch, get_pattern
+from .utils import generate_financial_network
+
+# fork된 워커가 그대로 물려받는 상태 (그래프 / 패턴의 predicate 람다를 pickle하지 않기 위함)
+_STATE: Dict = {}
+
+def partition_graph(G: nx.DiGraph, max_edges: int = 200_000, halo: int = 1,
+                    max_overlap: float = 0.5) -> List[Tuple[List, Set]]:
+    """
+    그래프를 (탐색 노드 목록, core 노드 집합) 파티션으로 분할
+    - 약 연결 요소(WCC) 단위로 나누고 작은 요소들은 max_edges까지 묶음 (요소 간 매칭은 불가능하므로 halo 불필요)
+    - max_edges보다 큰 요소는 BFS 순서로 core를 자르고 halo hop 이내 이웃을 포함 (edge-cut + halo)
+      -> 기준 노드(owner)가 core에 있는 매칭은 halo 안에 완전히 포함된다.
+    - halo로 중복되는 노드가 요소 크기의 max_overlap배를 넘으면 (hub가 많은 거래망에서는 1-hop halo도
+      요소 대부분을 덮음) 나눠도 같은 탐색을 반복할 뿐이므로 요소 전체를 하나의 파티션으로 둔다.
+    """
+    partitions = []
+    bucket_nodes, bucket_edges = [], 0
+    for component in sorted(nx.weakly_connected_components(G), key=len, reverse=True):
+        edges = sum(G.out_degree(n) for n in component)
+        if edges <= max_edges:
+            if bucket_edges + edges > max_edges and bucket_nodes:
+                partitions.append((bucket_nodes, set(bucket_nodes)))
+                bucket_nodes, bucket_edges = [], 0
+            bucket_nodes.extend(component)
+            bucket_edges += edges
+            continue
+
+        # 큰 요소: BFS 순서(지역성 유지)로 core 분할
+        undirected = G.to_undirected(as_view=True)
+        start = next(iter(component))
+        ordered = [start] + [v for _, v in nx.bfs_edges(undirected, start)]
+        pieces, core, core_edges = [], [], 0
+        for node in ordered:
+            core.append(node)
+            core_edges += G.out_degree(node)
+            if core_edges >= max_edges:
+                pieces.append(_with_halo(undirected, core, halo))
+                core, core_edges = [], 0
+        if core:
+            pieces.append(_with_halo(undirected, core, halo))
+        if sum(len(nodes) for nodes, _ in pieces) - len(component) > max_overlap * len(component):
+            pieces = [(list(component), set(component))]
+        partitions.extend(pieces)
+
+    if bucket_nodes:
+        partitions.append((bucket_nodes, set(bucket_nodes)))
+    return partitions
+
+def _with_halo(undirected, core: List, halo: int) -> Tuple[List, Set]:
+    core_set = set(core)
+    nodes, frontier = set(core), deque((n, 0) for n in core)
+    while frontier:
+        node, depth = frontier.popleft()
+        if depth == halo:
+            continue
+        for nbr in undirected[node]:
+            if nbr not in nodes:
+                nodes.add(nbr)
+                frontier.append((nbr, depth + 1))
+    return list(nodes), core_set
+
+def _owner(pattern: Pattern, match: PatternMatch, order: Dict):
+    """파티션 간 중복 방지를 위한 매칭의 기준 노드 (fan 패턴은 중심 노드, 나머지는 전역 순서가 가장 앞선 노드)"""
+    if getattr(pattern, "direction", None) is not None:
+        return match.nodes[0]
+    return min(match.nodes, key=order.__getitem__)
+
+def _match_partition(task: Tuple[int, int]) -> List[PatternMatch]:
+    group, index = task
+    G, order = _STATE["graph"], _STATE["order"]
+    patterns, partitions = _STATE["groups"][group]
+    nodes, core = partitions[index]
+    # subgraph view는 인접 조회마다 필터링하므로 VF2에서 매우 느림 -> 복사 (그래프 전체면 그대로 사용)
+    H = G if len(nodes) == len(G) else G.subgraph(nodes).copy()
+    results = []
+    for pattern in patterns:
+        for match in pattern.find(H):
+            if _owner(pattern, match, order) in core:
+                results.append(match)
+    return results
+
+class PartitionedMatcher:
+    """
+    [Parallel Approach]
+    여러 패턴을 그래프 파티션 단위로 프로세스 풀에서 병렬 매칭한 뒤 병합/중복 제거
+    - 파티션 halo = 패턴 반경 (반경이 같은 패턴끼리 묶어서 같은 파티션을 공유)
+    - fork 시작 방식에서는 그래프/패턴을 워커가 그대로 상속 (pickle 비용 없음),
+      그 외 환경이거나 max_workers=1이면 현재 프로세스에서 순차 실행
+    - halo 중복이 커서 나눌 이득이 없는 요소는 분할하지 않으므로 (max_overlap), 작업이 하나뿐이면 풀 없이 실행
+    """
+    def __init__(self, patterns: Optional[Sequence] = None, max_workers: Optional[int] = None,
+                 max_partition_edges: int = 200_000, max_overlap: float = 0.5):
+        names = patterns or ["circular", "fan_in", "fan_out", "bidirectional"]
+        self.patterns: List[Pattern] = [get_pattern(p) if isinstance(p, str) else p for p in names]
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_partition_edges = max_partition_edges
+        self.max_overlap = max_overlap
+
+    def run(self, G: nx.DiGraph) -> Dict[str, List[PatternMatch]]:
+        # 반경이 큰 패턴(긴 체인 등) 때문에 모든 패턴이 큰 halo를 갖지 않도록 반경별로 파티션
+        by_radius: Dict[int, List[Pattern]] = {}
+        for pattern in self.patterns:
+            by_radius.setdefault(pattern.radius, []).append(pattern)
+        groups = [(patterns, partition_graph(G, self.max_partition_edges, radius, self.max_overlap))
+                  for radius, patterns in sorted(by_radius.items())]
+        tasks = [(g, i) for g, (_, partitions) in enumerate(groups) for i in range(len(partitions))]
+
+        _STATE.update(graph=G, groups=groups, order={node: i for i, node in enumerate(G.nodes())})
+        try:
+            if self.max_workers > 1 and len(tasks) > 1 and "fork" in mp.get_all_start_methods():
+                with ProcessPoolExecutor(self.max_workers, mp_context=mp.get_context("fork")) as pool:
+                    chunks = list(pool.map(_match_partition, tasks))
+            else:
+                chunks = [_match_partition(task) for task in tasks]
+        finally:
+            _STATE.clear()
+        return self._merge(chunks)
+
+    def _merge(self, chunks: Iterable[List[PatternMatch]]) -> Dict[str, List[PatternMatch]]:
+        results: Dict[str, List[PatternMatch]] = {pattern.name: [] for pattern in self.patterns}
+        seen = set()
+        for chunk in chunks:
+            for match in chunk:
+                if match.key in seen:
+                    continue
+                seen.add(match.key)
+                results[match.pattern].append(match)
+        return results
+
+if __name__ == "__main__":
+    # 다수의 작은 거래망 + 하나의 큰 거래망
+    G = nx.disjoint_union_all([generate_financial_network(num_nodes=200, num_edges=600) for _ in range(50)] +
+                              [generate_financial_network(num_nodes=20_000, num_edges=60_000)])
+    print(f"✅ Market Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        matcher = PartitionedMatcher(max_workers=workers, max_partition_edges=20_000)
+        start = time.perf_counter()
+        results = matcher.run(G)
+        elapsed = time.perf_counter() - start
+        summary = ", ".join(f"{name}={len(matches)}" for name, matches in results.items())
+        print(f"🔍 workers={workers}: {summary} ({elapsed:.2f}s)")
@@ -0,0 +1,184 @@
+import numpy as np
+import networkx as nx
+from networkx.algorithms import isomorphism
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .cycle_engine import CycleEngine
+
+class PatternMatch(NamedTuple):
+    pattern: str
+    nodes: Tuple        # 매칭된 실제 노드 (패턴 노드 순서 / 고리는 정규형 회전)
+    edges: Tuple        # 매칭된 실제 간선 (u, v)
+
+    @property
+    def key(self):
+        """같은 부분 그래프(간선 집합)에 대한 중복 매칭 제거용 키 (자기동형 사상 / 파티션 간 중복)"""
+        return self.pattern, frozenset(self.edges)
+
+EdgePredicate = Callable[[object, object, Dict], bool]
+NodePredicate = Callable[[object, Dict], bool]
+
+# ==========================================
+# Pattern Types
+# ==========================================
+class Pattern:
+    """
+    탐지 패턴의 공통 인터페이스
+    - find(G): 매칭 결과를 스트리밍
+    - radius: 매칭된 노드들이 기준 노드(owner)로부터 떨어질 수 있는 최대 무방향 hop 수
+      (파티션 halo 크기로 사용)
+    """
+    name: str = "pattern"
+    radius: int = 1
+
+    def find(self, G: nx.DiGraph) -> Iterator[PatternMatch]:
+        raise NotImplementedError
+
+class SubgraphPattern(Pattern):
+    """
+    [Mathematical Approach]
+    임의의 작은 DiGraph 패턴 (VF2 subgraph monomorphism, 노드/간선 속성 조건 지원)
+    패턴 그래프의 노드/간선 속성 대신 predicate(실제 노드/간선 속성 -> bool)로 조건을 준다.
+    """
+    def __init__(self, name: str, graph: nx.DiGraph, node_predicates: Optional[Dict[object, NodePredicate]] = None,
+                 edge_predicate: Optional[EdgePredicate] = None):
+        if len(graph) == 0 or not nx.is_weakly_connected(graph):
+            # 연결되지 않은 패턴은 요소끼리 그래프 어디에든 떨어져 매칭될 수 있어 반경(halo)을 정의할 수 없음
+            raise ValueError(f"pattern '{name}' must be a non-empty weakly connected graph "
+                             f"(register each connected component as its own pattern)")
+        self.name = name
+        self.graph = graph
+        self.node_predicates = node_predicates or {}
+        self.edge_predicate = edge_predicate
+        self.radius = max(1, nx.diameter(graph.to_undirected())) if len(graph) > 1 else 1
+
+    def find(self, G: nx.DiGraph) -> Iterator[PatternMatch]:
+        matcher = isomorphism.DiGraphMatcher(G, self.graph)
+        seen = set()
+        # 반복자를 그대로 소비 (list()로 전부 만들지 않음)
+        for mapping in matcher.subgraph_monomorphisms_iter():
+            inverse = {p: g for g, p in mapping.items()}
+            if any(not pred(inverse[p], G.nodes[inverse[p]]) for p, pred in self.node_predicates.items()):
+                continue
+            edges = tuple((inverse[a], inverse[b]) for a, b in self.graph.edges())
+            if self.edge_predicate is not None and not all(self.edge_predicate(u, v, G[u][v]) for u, v in edges):
+                continue
+            match = PatternMatch(self.name, tuple(inverse[p] for p in self.graph.nodes()), edges)
+            if match.key in seen:
+                continue  # 패턴의 자기동형 사상(회전 등)으로 인한 중복
+            seen.add(match.key)
+            yield match
+
+class FanPattern(Pattern):
+    """
+    Smurfing 패턴: 한 계좌로 min_degree개 이상이 모이거나(fan_in) 흩어지는(fan_out) 구조
+    조합(min_degree개 선택)을 나열하지 않고 조건을 만족하는 이웃 전체를 하나의 매칭으로 보고한다.
+    """
+    def __init__(self, name: str, direction: str = "in", min_degree: int = 5,
+                 edge_predicate: Optional[EdgePredicate] = None):
+        if direction not in ("in", "out"):
+            raise ValueError("direction must be 'in' or 'out'")
+        self.name = name
+        self.direction = direction
+        self.min_degree = min_degree
+        self.edge_predicate = edge_predicate
+        self.radius = 1
+
+    def find(self, G: nx.DiGraph) -> Iterator[PatternMatch]:
+        edges_of = G.in_edges if self.direction == "in" else G.out_edges
+        for center in G.nodes():
+            edges = [(u, v) for u, v, data in edges_of(center, data=True)
+                     if self.edge_predicate is None or self.edge_predicate(u, v, data)]
+            if len(edges) < self.min_degree:
+                continue
+            others = tuple(u if self.direction == "in" else v for u, v in edges)
+            yield PatternMatch(self.name, (center,) + others, tuple(edges))
+
+class CyclePattern(Pattern):
+    """길이 min_length..k 방향 고리 (CycleEngine 사용, 금액 범위 필터 지원)"""
+    def __init__(self, name: str, k: int = 3, min_length: Optional[int] = None,
+                 min_amount: Optional[float] = None, max_amount: Optional[float] = None,
+                 weight: str = "amount"):
+        self.name = name
+        self.k = k
+        self.min_length = min_length
+        self.min_amount, self.max_amount = min_amount, max_amount
+        self.weight = weight
+        self.radius = k // 2
+
+    def find(self, G: nx.DiGraph) -> Iterator[PatternMatch]:
+        has_amount = self.min_amount is not None or self.max_amount is not None
+        engine = CycleEngine.from_networkx(G, weight=self.weight if has_amount else None)
+        for ring in engine.cycles(self.k, self.min_length, self.min_amount, self.max_amount):
+            nodes = ring.nodes
+            yield PatternMatch(self.name, nodes, tuple(zip(nodes, nodes[1:] + nodes[:1])))
+
+class ChainPattern(Pattern):
+    """
+    Layering 패턴: 길이 length의 단순 송금 경로 A -> B -> ... (서로 다른 계좌)
+    VF2 대신 간선 배열을 한 hop씩 확장 (경로 수가 많은 그래프에서도 NumPy 연산으로 처리)
+    """
+    def __init__(self, name: str, length: int = 4, edge_predicate: Optional[EdgePredicate] = None,
+                 max_paths: int = 2_000_000):
+        self.name = name
+        self.length = length
+        self.edge_predicate = edge_predicate
+        self.max_paths = max_paths
+        self.radius = length
+
+    def find(self, G: nx.DiGraph) -> Iterator[PatternMatch]:
+        labels = list(G.nodes())
+        index = {node: i for i, node in enumerate(labels)}
+        pairs = [(index[u], index[v]) for u, v, data in G.edges(data=True)
+                 if self.edge_predicate is None or self.edge_predicate(u, v, data)]
+        if not pairs:
+            return
+        edges = np.array(pairs, dtype=np.int64)
+        edges = edges[np.argsort(edges[:, 0], kind="stable")]
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edges[:, 0], minlength=len(labels)), out=indptr[1:])
+        dst = edges[:, 1]
+
+        step = max(1, self.max_paths // max(1, int(np.diff(indptr).mean() ** (self.length - 1))))
+        for lo in range(0, len(edges), step):
+            paths = edges[lo:lo + step]
+            for _ in range(self.length - 1):
+                last = paths[:, -1]
+                counts = indptr[last + 1] - indptr[last]
+                owner = np.repeat(np.arange(len(paths)), counts)
+                offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+                nxt = dst[np.repeat(indptr[last], counts) + offsets]
+                prev = paths[owner]
+                keep = (prev != nxt[:, None]).all(axis=1)
+                paths = np.column_stack([prev[keep], nxt[keep]])
+            for row in paths.tolist():
+                nodes = tuple(labels[i] for i in row)
+                yield PatternMatch(self.name, nodes, tuple(zip(nodes[:-1], nodes[1:])))
+
+# ==========================================
+# Pattern Registry
+# ==========================================
+PATTERN_REGISTRY: Dict[str, Pattern] = {}
+
+def register_pattern(pattern: Pattern, replace: bool = False) -> Pattern:
+    """사용자 정의 패턴 등록 (예: SubgraphPattern("my_pattern", graph, edge_predicate=...))"""
+    if pattern.name in PATTERN_REGISTRY and not replace:
+        raise ValueError(f"pattern already registered: {pattern.name}")
+    PATTERN_REGISTRY[pattern.name] = pattern
+    return pattern
+
+def get_pattern(name: str) -> Pattern:
+    try:
+        return PATTERN_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"unknown pattern: {name} (available: {', '.join(sorted(PATTERN_REGISTRY))})") from None
+
+def list_patterns() -> List[str]:
+    return sorted(PATTERN_REGISTRY)
+
+register_pattern(CyclePattern("circular", k=3))                       # 기존 삼각 순환 거래
+register_pattern(CyclePattern("k_cycle", k=5, min_length=3))          # 길이 3~5 자전 거래 고리
+register_pattern(FanPattern("fan_in", direction="in", min_degree=5))  # 여러 계좌 -> 한 계좌 (smurfing 집금)
+register_pattern(FanPattern("fan_out", direction="out", min_degree=5))  # 한 계좌 -> 여러 계좌 (분산 송금)
+register_pattern(ChainPattern("layering_chain", length=4))           # A -> B -> C -> D -> E (layering)
+register_pattern(CyclePattern("bidirectional", k=2))                  # A <-> B 양방향 송금
@@ -0,0 +1,182 @@
+import heapq
+import random
+import time
+from itertools import islice
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .cycle_engine import CycleMatch
+
+class StreamingCycleDetector:
+    """
+    [Streaming Approach]
+    Incremental detection of circular-trading rings on a live transaction feed.
+
+    - 간선이 들어올 때마다 그 간선을 포함하여 "새로 닫힌" 길이 min_length..k 고리만 국소 탐색
+      (v에서 출발해 u로 돌아오는 경로 탐색, u 기준 역방향 거리로 가지치기)
+    - window_seconds보다 오래된 간선은 만료 (heap 기반, 간선당 O(log E))
+    - max_fanout: 노드당 최근 간선 max_fanout개만 탐색 -> 간선당 작업량 상한 = max_fanout^(k-1)
+      max_paths: 간선당 확장 경로 수 상한 (초과하면 해당 간선의 탐색을 중단하고 truncated로 집계)
+      => 지연 시간은 전체 그래프 크기가 아니라 이 상한들에만 의존한다.
+    """
+    def __init__(self, k: int = 3, min_length: Optional[int] = None, window_seconds: float = 3600.0,
+                 max_fanout: int = 64, max_paths: int = 10_000, min_amount: Optional[float] = None,
+                 max_amount: Optional[float] = None, ordered: bool = False):
+        self.k = k
+        self.min_length = min_length or k
+        if not 2 <= self.min_length <= k:
+            raise ValueError("require 2 <= min_length <= k")
+        self.window_seconds = window_seconds
+        self.max_fanout = max_fanout
+        self.max_paths = max_paths
+        self.min_amount, self.max_amount = min_amount, max_amount
+        self.ordered = ordered  # True면 고리 간선의 시각이 순서대로 증가해야 함 (자금이 실제로 한 바퀴 돈 경우)
+
+        # node -> {neighbor: (timestamp, amount)} (dict 삽입 순서 = 최근 순서)
+        self.out_edges: Dict[Hashable, Dict[Hashable, Tuple[float, Optional[float]]]] = {}
+        self.in_edges: Dict[Hashable, Dict[Hashable, Tuple[float, Optional[float]]]] = {}
+        self._expiry: List[Tuple[float, int, Hashable, Hashable]] = []
+        self._seq = 0
+        self._node_ids: Dict[Hashable, int] = {}  # 정규형 회전 기준 (최초 등장 순서)
+        self.stats = {"edges": 0, "expired": 0, "cycles": 0, "truncated": 0}
+
+    @property
+    def num_edges(self) -> int:
+        return sum(len(nbrs) for nbrs in self.out_edges.values())
+
+    # ------------------------------------------
+    # Window Maintenance
+    # ------------------------------------------
+    def expire(self, now: float):
+        """now - window_seconds 이전 간선 제거"""
+        cutoff = now - self.window_seconds
+        while self._expiry and self._expiry[0][0] < cutoff:
+            ts, _, u, v = heapq.heappop(self._expiry)
+            current = self.out_edges.get(u, {}).get(v)
+            if current is None or current[0] != ts:
+                continue  # 이후에 같은 간선이 갱신됨 (오래된 heap 항목)
+            self._remove(u, v)
+            self.stats["expired"] += 1
+
+    def _remove(self, u, v):
+        del self.out_edges[u][v]
+        if not self.out_edges[u]:
+            del self.out_edges[u]
+        del self.in_edges[v][u]
+        if not self.in_edges[v]:
+            del self.in_edges[v]
+
+    def _recent(self, adjacency: Dict, node) -> List:
+        nbrs = adjacency.get(node)
+        if not nbrs:
+            return []
+        if len(nbrs) <= self.max_fanout:
+            return list(nbrs.items())
+        return list(islice(reversed(nbrs.items()), self.max_fanout))
+
+    # ------------------------------------------
+    # Ingest
+    # ------------------------------------------
+    def add_edge(self, u: Hashable, v: Hashable, timestamp: Optional[float] = None,
+                 amount: Optional[float] = None) -> List[CycleMatch]:
+        """
+        거래 간선 u -> v 추가 후 이 간선으로 새로 닫힌 고리 목록 반환
+        이미 윈도우 안에 있는 간선이 다시 들어오면 시각만 갱신한다. (기존 고리를 다시 보고하지 않음)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        self.expire(timestamp)
+        if u == v:
+            return []
+        if amount is not None and ((self.min_amount is not None and amount < self.min_amount) or
+                                   (self.max_amount is not None and amount > self.max_amount)):
+            return []
+        for node in (u, v):
+            self._node_ids.setdefault(node, len(self._node_ids))
+
+        existed = v in self.out_edges.get(u, {})
+        if existed:
+            self._remove(u, v)  # 재삽입하여 최근 순서 갱신
+        self.out_edges.setdefault(u, {})[v] = (timestamp, amount)
+        self.in_edges.setdefault(v, {})[u] = (timestamp, amount)
+        heapq.heappush(self._expiry, (timestamp, self._seq, u, v))
+        self._seq += 1
+        self.stats["edges"] += 1
+        if existed:
+            return []
+
+        matches = self._close(u, v, timestamp, amount)
+        self.stats["cycles"] += len(matches)
+        return matches
+
+    def _distance_to(self, target, max_depth: int) -> Dict[Hashable, int]:
+        """target으로 들어오는 역방향 BFS (max_depth hop까지)"""
+        dist = {target: 0}
+        frontier = [target]
+        for depth in range(1, max_depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for prev, _ in self._recent(self.in_edges, node):
+                    if prev not in dist:
+                        dist[prev] = depth
+                        next_frontier.append(prev)
+            frontier = next_frontier
+        return dist
+
+    def _close(self, u, v, timestamp: float, amount: Optional[float]) -> List[CycleMatch]:
+        """v에서 u로 돌아오는 길이 <= k-1 단순 경로 탐색 -> (u -> v -> ... -> u) 고리"""
+        back = self._distance_to(u, self.k - 2)
+        matches = []
+        expanded = 0
+        # stack: (node, 경로 노드, 경로 금액, 직전 간선 시각)
+        stack = [(v, [v], [], float("-inf"))]
+        while stack:
+            node, path, amounts, last_ts = stack.pop()
+            for nxt, (ts, amt) in self._recent(self.out_edges, node):
+                if self.ordered and not last_ts < ts < timestamp:
+                    continue
+                if nxt == u:
+                    if len(path) + 1 >= self.min_length:
+                        matches.append(self._canonical([u] + path, [amount] + amounts + [amt]))
+                    continue
+                # 고리 길이 = 1(u->v) + len(path)(..->nxt) + back[nxt](nxt->..->u)
+                if nxt in path or len(path) + 1 + back.get(nxt, self.k) > self.k:
+                    continue
+                expanded += 1
+                if expanded > self.max_paths:
+                    self.stats["truncated"] += 1
+                    return matches
+                stack.append((nxt, path + [nxt], amounts + [amt], ts))
+        return matches
+
+    def _canonical(self, ring: List, amounts: List[Optional[float]]) -> CycleMatch:
+        ids = [self._node_ids[node] for node in ring]
+        start = ids.index(min(ids))
+        ring = ring[start:] + ring[:start]
+        amounts = amounts[start:] + amounts[:start]
+        return CycleMatch(tuple(ring), tuple(amounts) if any(a is not None for a in amounts) else None)
+
+if __name__ == "__main__":
+    # 무작위 거래 피드 + 주기적으로 삽입되는 자전 거래 고리
+    detector = StreamingCycleDetector(k=4, min_length=3, window_seconds=600, ordered=True)
+    rng = random.Random(42)
+    latencies = []
+    now = 0.0
+    for i in range(200_000):
+        now += rng.expovariate(50.0)  # 초당 약 50건
+        if i % 20_000 == 0:
+            ring = rng.sample(range(100_000), 3)
+            for j in range(3):
+                start = time.perf_counter()
+                found = detector.add_edge(ring[j], ring[(j + 1) % 3], now + j, rng.randint(1000, 1000000))
+                latencies.append(time.perf_counter() - start)
+                for match in found:
+                    print(f"🚨 t={now:.0f}s ring: {' -> '.join(map(str, match.nodes))}")
+            continue
+        u, v = rng.sample(range(100_000), 2)
+        start = time.perf_counter()
+        detector.add_edge(u, v, now, rng.randint(1000, 1000000))
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    print(f"✅ {detector.stats} | window edges: {detector.num_edges}")
+    print(f"⏱️ per-edge latency p50={latencies[len(latencies) // 2] * 1e6:.1f}us "
+          f"p99={latencies[int(len(latencies) * 0.99)] * 1e6:.1f}us max={latencies[-1] * 1e6:.1f}us")
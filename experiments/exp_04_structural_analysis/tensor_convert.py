@@ -0,0 +1,186 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+from itertools import chain
+from typing import Hashable, Optional, Tuple
+
+import numpy as np
+import networkx as nx
+import torch
+from torch_geometric.data import Data
+
+# ==========================================
+# Array -> PyG Data
+# ==========================================
+def edges_to_data(src: np.ndarray, dst: np.ndarray, num_nodes: int, in_channels: int = 1) -> Data:
+    """간선 배열 -> 구조 특성(x=1)만 가진 Data (노드별 파이썬 작업 없음)"""
+    edge_index = torch.from_numpy(np.stack([np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)]))
+    return Data(x=torch.ones((num_nodes, in_channels)), edge_index=edge_index, num_nodes=num_nodes)
+
+def csr_to_data(indptr: np.ndarray, indices: np.ndarray, in_channels: int = 1) -> Data:
+    """CSR 인접 구조 (indptr, indices) -> Data"""
+    indptr = np.asarray(indptr, dtype=np.int64)
+    num_nodes = len(indptr) - 1
+    src = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(indptr))
+    return edges_to_data(src, indices, num_nodes, in_channels)
+
+def snapshot_to_data(snapshot, in_channels: int = 1) -> Data:
+    """
+    GraphSnapshot(modules/graph_snapshot.py, mmap CSR) -> Data
+    스냅샷은 양방향(direction=+1/-1)으로 저장되어 있으므로 원래 방향(OUT) 간선만 사용
+    """
+    out = np.asarray(snapshot.direction) == 1
+    src = np.repeat(np.arange(snapshot.num_nodes, dtype=np.int64), np.diff(np.asarray(snapshot.indptr)))
+    return edges_to_data(src[out], np.asarray(snapshot.indices)[out], snapshot.num_nodes, in_channels)
+
+def nx_edge_arrays(G: nx.Graph) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    NetworkX 그래프 -> (src, dst, num_nodes) (노드 번호 = G.nodes() 순서)
+    무방향 그래프는 from_networkx와 같이 양방향 간선으로 변환한다.
+    """
+    num_nodes = G.number_of_nodes()
+    num_edges = G.number_of_edges()
+    if num_edges == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, num_nodes
+    try:
+        # 정수 라벨: 정렬 + searchsorted로 번호 매핑 (노드별 dict 조회 없음)
+        if not isinstance(next(iter(G)), (int, np.integer)):
+            raise TypeError
+        nodes = np.fromiter(G.nodes(), dtype=np.int64, count=num_nodes)
+        pairs = np.fromiter(chain.from_iterable(G.edges()), dtype=np.int64, count=2 * num_edges).reshape(-1, 2)
+        order = np.argsort(nodes, kind="stable")
+        pairs = order[np.searchsorted(nodes, pairs, sorter=order)]
+    except (TypeError, ValueError, OverflowError):
+        index = {node: i for i, node in enumerate(G.nodes())}
+        pairs = np.fromiter((index[n] for n in chain.from_iterable(G.edges())), dtype=np.int64,
+                            count=2 * num_edges).reshape(-1, 2)
+    src, dst = pairs[:, 0], pairs[:, 1]
+    if not G.is_directed():
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+    return src, dst, num_nodes
+
+def nx_to_data(G: nx.Graph, in_channels: int = 1) -> Data:
+    """NetworkX 그래프 -> Data (입력 그래프의 노드/간선 속성을 수정하지 않음)"""
+    src, dst, num_nodes = nx_edge_arrays(G)
+    return edges_to_data(src, dst, num_nodes, in_channels)
+
+def batch_edge_arrays(graphs, in_channels: int = 1) -> Data:
+    """
+    여러 그래프의 (src, dst, num_nodes)를 노드 번호 오프셋으로 이어붙여 하나의 배치 Data로 변환
+    (Batch.from_data_list의 그래프별 Data 생성/collate 비용 없이 batch 벡터까지 구성)
+    """
+    sizes = np.array([n for _, _, n in graphs], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    edge_counts = np.array([len(s) for s, _, _ in graphs], dtype=np.int64)
+    shift = np.repeat(offsets, edge_counts)
+    src = np.concatenate([np.asarray(s, dtype=np.int64) for s, _, _ in graphs] or [np.empty(0, np.int64)]) + shift
+    dst = np.concatenate([np.asarray(d, dtype=np.int64) for _, d, _ in graphs] or [np.empty(0, np.int64)]) + shift
+    data = edges_to_data(src, dst, int(sizes.sum()), in_channels)
+    data.batch = torch.from_numpy(np.repeat(np.arange(len(graphs), dtype=np.int64), sizes))
+    data.num_graphs = len(graphs)
+    return data
+
+# ==========================================
+# Subgraph Extraction on CSR
+# ==========================================
+def _gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """rows 각각의 CSR 이웃을 한 번에 모음 -> (각 이웃의 rows 내 위치, 이웃 번호)"""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    owner = np.repeat(np.arange(len(rows), dtype=np.int64), counts)
+    offsets = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, indices[np.repeat(starts, counts) + offsets]
+
+class CSRGraph:
+    """
+    ego-subgraph를 반복 추출하기 위한 CSR 표현 (방향 간선 + 무방향 이웃)
+    NetworkX 그래프를 한 번만 배열로 바꾸고 이후 추출/변환은 NumPy로 처리
+    """
+    def __init__(self, src: np.ndarray, dst: np.ndarray, num_nodes: int, labels=None):
+        self.num_nodes = num_nodes
+        self.labels = list(labels) if labels is not None else None
+        self.out_ptr, self.out_idx = self._csr(src, dst, num_nodes)
+        self.und_ptr, self.und_idx = self._csr(np.concatenate([src, dst]), np.concatenate([dst, src]), num_nodes)
+        self._index = {label: i for i, label in enumerate(self.labels)} if self.labels is not None else None
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph) -> "CSRGraph":
+        src, dst, num_nodes = nx_edge_arrays(G)
+        return cls(src, dst, num_nodes, labels=G.nodes())
+
+    @staticmethod
+    def _csr(owner: np.ndarray, other: np.ndarray, num_nodes: int):
+        order = np.argsort(owner, kind="stable")
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner, minlength=num_nodes), out=indptr[1:])
+        return indptr, np.asarray(other, dtype=np.int64)[order]
+
+    def node_id(self, label: Hashable) -> int:
+        return self._index[label] if self._index is not None else int(label)
+
+    def ego_nodes(self, node: int, radius: int) -> np.ndarray:
+        """무방향 radius-hop 이내 노드 번호 (BFS, 중심 노드 먼저)"""
+        visited = np.array([node], dtype=np.int64)
+        frontier = visited
+        for _ in range(radius):
+            _, neighbors = _gather(self.und_ptr, self.und_idx, frontier)
+            neighbors = np.unique(neighbors)
+            frontier = neighbors[~np.isin(neighbors, visited)]
+            if len(frontier) == 0:
+                break
+            visited = np.concatenate([visited, frontier])
+        return visited
+
+    def subgraph_edges(self, nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """노드 번호 집합의 유도 부분 그래프 -> (src, dst, num_nodes) (노드 번호는 nodes 순서로 재부여)"""
+        local_src, targets = _gather(self.out_ptr, self.out_idx, nodes)
+        order = np.argsort(nodes)
+        pos = order[np.minimum(np.searchsorted(nodes, targets, sorter=order), len(nodes) - 1)]
+        inside = nodes[pos] == targets
+        return local_src[inside], pos[inside], len(nodes)
+
+    def subgraph_to_data(self, nodes: np.ndarray, in_channels: int = 1) -> Data:
+        return edges_to_data(*self.subgraph_edges(nodes), in_channels)
+
+# ==========================================
+# Conversion Cache
+# ==========================================
+class ConversionCache:
+    """
+    변환된 Data를 그래프 객체(identity) + 버전 기준으로 LRU 캐시
+    - version을 주지 않으면 간선 배열 내용의 해시를 버전으로 사용 (노드/간선 수가 같은 재배선도 감지)
+      해시 계산에도 간선 배열 추출이 필요하므로, 변경 시점을 아는 호출자는 version을 명시하는 편이 빠르다.
+    - 그래프 객체가 사라지면 해당 항목도 제거 (id 재사용으로 인한 오염 방지)
+    """
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Data]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, G: nx.Graph, version: Optional[Hashable] = None, in_channels: int = 1) -> Data:
+        arrays = None
+        if version is None:
+            arrays = nx_edge_arrays(G)
+            src, dst, num_nodes = arrays
+            version = (num_nodes, hashlib.blake2b(src.tobytes() + b"|" + dst.tobytes(), digest_size=16).digest())
+        key = (id(G), version, in_channels)
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+        self.misses += 1
+        data = edges_to_data(*arrays, in_channels) if arrays is not None else nx_to_data(G, in_channels)
+        if not any(k[0] == id(G) for k in self._entries):
+            weakref.finalize(G, self._drop, id(G))
+        self._entries[key] = data
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return data
+
+    def _drop(self, graph_id: int):
+        for key in [k for k in self._entries if k[0] == graph_id]:
+            del self._entries[key]
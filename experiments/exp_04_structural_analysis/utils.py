@@ -1,11 +1,17 @@
-import networkx as nx
-import matplotlib.pyplot as plt
+import io
 import random
+from collections import OrderedDict
+
+import networkx as nx
+import numpy as np
+from typing import List, NamedTuple, Optional, Sequence
 
-def generate_financial_network(num_nodes=50, num_edges=100):
+def generate_financial_network(num_nodes=50, num_edges=100, seed=None):
     """
     랜덤한 금융 거래 네트워크 생성 (Erdos-Renyi 변형)
+    seed를 주면 전역 random 상태와 무관하게 같은 그래프가 생성됨
     """
+    rng = random.Random(seed)
     G = nx.DiGraph() # 방향 그래프 (송금: A -> B)
     
     # 노드 추가 (계좌)
@@ -13,16 +19,223 @@ def generate_financial_network(num_nodes=50, num_edges=100):
     
     # 엣지 추가 (거래)
     for _ in range(num_edges):
-        u, v = random.sample(range(num_nodes), 2)
-        amount = random.randint(1000, 1000000)
+        u, v = rng.sample(range(num_nodes), 2)
+        amount = rng.randint(1000, 1000000)
         G.add_edge(u, v, amount=amount, type="transfer")
         
     return G
 
-def visualize_graph(G, title="Financial Graph", highlight_nodes=None):
+class TransactionArrays(NamedTuple):
+    """간선 배열 형태의 거래 그래프 (CycleEngine / tensor_convert에 그대로 입력 가능)"""
+    num_nodes: int
+    src: np.ndarray          # int64 송금 계좌
+    dst: np.ndarray          # int64 수취 계좌
+    amount: np.ndarray       # float64 거래 금액
+    timestamp: np.ndarray    # int64 거래 시각 (epoch seconds)
+    is_fraud: np.ndarray     # bool 주입된 고리 간선 여부
+    rings: List[tuple]       # 주입된 자전 거래 고리 (노드 순서 = 송금 순서)
+
+def generate_transaction_arrays(num_nodes: int = 100_000, num_edges: int = 500_000, num_rings: int = 100,
+                                ring_sizes: Sequence[int] = (3, 4, 5), exponent: float = 2.1,
+                                start_time: int = 1_700_000_000, span_seconds: int = 30 * 86400,
+                                seed: Optional[int] = 0) -> TransactionArrays:
+    """
+    [Vectorized Generator]
+    멱법칙(power-law) 차수 분포의 대규모 거래 그래프 + 주입된 자전 거래 고리 (NumPy, seed 고정 시 재현 가능)
+
+    - 계좌별 송금/수취 가중치 ~ rank^(-1/(exponent-1)) (Chung-Lu 방식, exponent > 2) -> 소수 허브 계좌에 거래 집중
+    - 금액: 로그정규 분포 (1천 ~ 수억 원), 시각: 관측 구간 내 균등
+    - 고리: 서로 겹치지 않는 계좌 num_rings개 묶음 (크기는 ring_sizes를 순환),
+      비슷한 금액이 수수료만큼 줄어들며 짧은 시간 안에 한 바퀴 돈다.
+    - self-loop와 중복 (송금, 수취) 쌍은 만들지 않음 (CycleEngine의 간선 정규화와 같은 가정)
+    """
+    rng = np.random.default_rng(seed)
+
+    # 1. 자전 거래 고리
+    sizes = np.resize(np.asarray(ring_sizes, dtype=np.int64), num_rings)
+    members = rng.choice(num_nodes, size=int(sizes.sum()), replace=False)
+    rings, src, dst, amount, timestamp = [], [], [], [], []
+    for nodes in (np.split(members, np.cumsum(sizes)[:-1]) if num_rings else []):
+        size = len(nodes)
+        rings.append(tuple(nodes.tolist()))
+        src.append(nodes)
+        dst.append(np.roll(nodes, -1))
+        base = rng.uniform(5e6, 5e7)
+        amount.append(np.round(base * (1 - rng.uniform(0.001, 0.02)) ** np.arange(size), -2))
+        timestamp.append(start_time + rng.integers(0, span_seconds) + np.cumsum(rng.integers(60, 3600, size=size)))
+    num_fraud = len(members) if num_rings else 0
+
+    # 2. 배경 거래: 순위 r(1..N)의 가중치 ~ r^(-a) -> 연속 근사 역변환으로 순위 샘플링, 순위 -> 계좌는 무작위 순열
+    #    self-loop / 중복 쌍(고리 간선 포함)은 버리고 num_edges개가 찰 때까지 추가로 샘플링
+    a = 1.0 / (exponent - 1.0)
+    top = (num_nodes + 1.0) ** (1.0 - a) - 1.0
+    out_perm, in_perm = rng.permutation(num_nodes), rng.permutation(num_nodes)
+    def sample(perm, size):
+        ranks = ((1.0 + rng.random(size) * top) ** (1.0 / (1.0 - a))).astype(np.int64) - 1
+        return perm[np.clip(ranks, 0, num_nodes - 1)]
+
+    keys = np.concatenate(src) * num_nodes + np.concatenate(dst) if num_rings else np.empty(0, dtype=np.int64)
+    missing = num_edges
+    for _ in range(16):
+        if missing <= 0:
+            break
+        draw = int(missing * 1.3) + 16
+        u, v = sample(out_perm, draw), sample(in_perm, draw)
+        candidate = u * num_nodes + v
+        _, first = np.unique(candidate, return_index=True)
+        first = np.sort(first)
+        first = first[(u[first] != v[first]) & ~np.isin(candidate[first], keys)][:missing]
+        src.append(u[first])
+        dst.append(v[first])
+        amount.append(np.round(rng.lognormal(mean=12.0, sigma=1.5, size=len(first)), -2).clip(1000, None))
+        timestamp.append(start_time + rng.integers(0, span_seconds, size=len(first)))
+        keys = np.concatenate([keys, candidate[first]])
+        missing -= len(first)
+
+    src, dst = np.concatenate(src).astype(np.int64), np.concatenate(dst).astype(np.int64)
+    amount, timestamp = np.concatenate(amount).astype(np.float64), np.concatenate(timestamp).astype(np.int64)
+    is_fraud = np.arange(len(src)) < num_fraud
+
+    # 3. 시간순 정렬 (스트리밍 탐지기 재생용)
+    order = np.argsort(timestamp, kind="stable")
+    return TransactionArrays(num_nodes, src[order], dst[order], amount[order], timestamp[order],
+                             is_fraud[order], rings)
+
+def arrays_to_networkx(arrays: TransactionArrays) -> nx.DiGraph:
+    """TransactionArrays -> NetworkX DiGraph (amount/timestamp/type 속성, 기존 matcher 입력용)"""
+    G = nx.DiGraph()
+    G.add_nodes_from(range(arrays.num_nodes))
+    kinds = np.where(arrays.is_fraud, "fraud", "transfer")
+    G.add_edges_from(
+        (u, v, {"amount": a, "timestamp": t, "type": k})
+        for u, v, a, t, k in zip(arrays.src.tolist(), arrays.dst.tolist(), arrays.amount.tolist(),
+                                 arrays.timestamp.tolist(), kinds.tolist())
+    )
+    return G
+
+# ==========================================
+# Headless Suspect Rendering
+# ==========================================
+OTHERS = "__others__"  # 그리지 않은 나머지 계좌를 대표하는 집계 노드
+
+def suspect_neighbourhood(G, suspects: Sequence, hops: int = 1, max_nodes: int = 300) -> List:
+    """
+    의심 계좌로부터 방향 무시 hops 이내 계좌 (BFS 순서, 최대 max_nodes개)
+    허브 계좌가 있어도 max_nodes에 도달하면 즉시 멈추므로 전체 그래프 크기와 무관
+    """
+    seen = dict.fromkeys(n for n in suspects if n in G)
+    frontier = list(seen)
+    for _ in range(hops):
+        nxt = []
+        for node in frontier:
+            neighbors = (G.successors(node), G.predecessors(node)) if G.is_directed() else (G.neighbors(node),)
+            for nbr in (n for it in neighbors for n in it):
+                if len(seen) >= max_nodes:
+                    return list(seen)
+                if nbr not in seen:
+                    seen[nbr] = None
+                    nxt.append(nbr)
+        frontier = nxt
+    return list(seen)
+
+class LayoutCache:
+    """
+    (그래프 버전, 그린 노드 집합) -> 노드 좌표 LRU 캐시
+    같은 의심 고리를 여러 리포트/포맷으로 그릴 때 spring_layout을 다시 계산하지 않음
+    """
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def get(self, key, compute):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        value = self._entries[key] = compute()
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+_LAYOUTS = LayoutCache()
+
+def render_suspect_graph(G, suspects: Sequence, path: Optional[str] = None, title: str = "Detected Fraud Patterns",
+                         hops: int = 1, max_nodes: int = 300, fmt: Optional[str] = None, dpi: int = 100,
+                         figsize=(10, 8), version=None, layout_cache: Optional[LayoutCache] = None) -> bytes:
+    """
+    [Headless Approach]
+    의심 계좌의 k-hop 이웃만 Agg 캔버스에 그려 이미지 바이트를 반환 (path를 주면 파일로도 저장)
+
+    - pyplot 전역 상태 / plt.show()를 쓰지 않으므로 배치 실행이나 스레드에서 안전
+    - 잘려 나간 나머지 계좌는 하나의 집계 노드("+N others")로 표시 (경계 계좌와 연결)
+    - 레이아웃은 (version, 노드 집합) 기준으로 캐시 (version 미지정 시 그래프 id + 노드/간선 수)
+    """
+    fmt = (fmt or (path.rsplit(".", 1)[-1] if path and "." in path else "png")).lower()
+    nodes = suspect_neighbourhood(G, suspects, hops, max_nodes)
+    H = nx.DiGraph(G.subgraph(nodes)) if G.is_directed() else nx.Graph(G.subgraph(nodes))
+    # 화면 밖 이웃이 있는 경계 계좌 -> 집계 노드
+    boundary = [n for n in nodes if G.degree(n) > H.degree(n)]
+    hidden = G.number_of_nodes() - len(nodes)
+    if boundary and hidden:
+        H.add_edges_from((n, OTHERS) for n in boundary)
+
+    version = version if version is not None else (id(G), G.number_of_nodes(), G.number_of_edges())
+    cache = layout_cache or _LAYOUTS
+    pos = cache.get((version, hops, frozenset(H.nodes())),
+                    lambda: nx.spring_layout(H, seed=42, iterations=30 if len(H) > 100 else 50))
+
+    # matplotlib은 그림을 그릴 때만 로드 (탐지만 하는 실행에서는 import 비용 없음)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    regular = [n for n in H.nodes() if n != OTHERS]
+    highlight = [n for n in suspects if n in H]
+    # 화살표 패치(FancyArrowPatch)는 간선마다 비용이 크므로 배경 간선은 LineCollection, 의심 계좌 간 간선만 화살표
+    marked = set(highlight)
+    inner = [(u, v) for u, v in H.edges() if u in marked and v in marked]
+    nx.draw_networkx_edges(H, pos, ax=ax, edge_color='gray', arrows=False, alpha=0.5,
+                           edgelist=[(u, v) for u, v in H.edges() if OTHERS not in (u, v) and not (u in marked and v in marked)])
+    if inner:
+        nx.draw_networkx_edges(H, pos, ax=ax, edgelist=inner, edge_color='red', width=2.0,
+                               arrows=G.is_directed(), node_size=500)
+    nx.draw_networkx_nodes(H, pos, ax=ax, nodelist=regular, node_color='lightblue',
+                           node_size=300 if len(H) <= 100 else 60, alpha=0.8)
+    if highlight:
+        nx.draw_networkx_nodes(H, pos, ax=ax, nodelist=highlight, node_color='red', node_size=500)
+    if OTHERS in H:
+        nx.draw_networkx_edges(H, pos, ax=ax, edgelist=list(H.in_edges(OTHERS) if H.is_directed() else H.edges(OTHERS)),
+                               edge_color='lightgray', style='dashed', arrows=False, alpha=0.4)
+        nx.draw_networkx_nodes(H, pos, ax=ax, nodelist=[OTHERS], node_color='lightgray', node_size=900)
+    if len(H) <= 100:  # 라벨은 작은 그림에서만 (글자 렌더링 비용)
+        labels = {n: str(n) for n in regular}
+        if OTHERS in H:
+            labels[OTHERS] = f"+{hidden} others"
+        nx.draw_networkx_labels(H, pos, labels=labels, ax=ax, font_size=10)
+    ax.set_title(f"{title} ({len(regular)} of {G.number_of_nodes()} accounts, {hops}-hop)")
+    ax.axis('off')
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi)
+    image = buffer.getvalue()
+    if path:
+        with open(path, "wb") as f:
+            f.write(image)
+    return image
+
+def visualize_graph(G, title="Financial Graph", highlight_nodes=None, path=None, hops=1, max_nodes=300):
     """
     그래프 시각화 (하이라이트 기능 포함)
+    - path를 주면 창을 띄우지 않고 의심 계좌의 hops 이웃만 파일로 저장 (render_suspect_graph)
+    - 그래프가 max_nodes보다 크면 의심 계좌의 hops 이웃만 표시
     """
+    if path is not None:
+        return render_suspect_graph(G, highlight_nodes or [], path=path, title=title, hops=hops, max_nodes=max_nodes)
+    if highlight_nodes and G.number_of_nodes() > max_nodes:
+        G = G.subgraph(suspect_neighbourhood(G, highlight_nodes, hops, max_nodes))
+
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 8))
     pos = nx.spring_layout(G, seed=42)
     
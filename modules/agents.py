@@ -1,94 +1,195 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import os
-import operator
-from typing import TypedDict, Annotated, List, Dict, Union
+import threading
+from datetime import date
+from typing import TypedDict, Annotated, Any, List, Dict, Tuple, Union
 
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
 
 # 내부 모듈 임포트 (기존 구조 유지)
 from .tools import MarketDataManager
+from .price_cache import get_price_cache, period_to_start
 from .multimodal import VisionAnalyst
-from .graph_rag import GraphRAGEngine
+from .graph_rag import GraphRAGEngine, CachedGraphEngine
+from .graph_snapshot import LocalGraphEngine
+from .limits import backend_slot
+from .llm_gateway import LLMGateway, get_gateway
+from .cache import DiskCache
+from .charts import render_expert_chart, resample_ohlcv
+from .quant import compute_universe_metrics, UniverseMetrics
+from .summaries import (SummaryLimits, build_supervisor_prompt, summarize_chart, summarize_knowledge,
+                        summarize_quant)
 
 # ==========================================
 # 1. State Definition (에이전트 공유 메모리)
 # ==========================================
+def merge_dicts(left: Dict, right: Dict) -> Dict:
+    """병렬 노드가 같은 dict 키에 동시에 쓸 때 병합하는 Reducer"""
+    return {**(left or {}), **(right or {})}
+
 class AgentState(TypedDict):
     stock_symbol: str
-    messages: Annotated[List[BaseMessage], operator.add]
-    
+
     # 각 전문가 에이전트의 분석 결과 저장소
     chart_data: Dict[str, str]    # VLM 분석 결과
     quant_data: Dict[str, float]  # 수치적 지표 (RSI, Volatility 등)
     knowledge_data: str           # GraphRAG 리포트
-    
+    # Supervisor 입력용 정형 요약 (분석가 이름 -> 필드, 크기 제한은 modules/summaries.py)
+    summaries: Annotated[Dict[str, Dict[str, Any]], merge_dicts]
+
     final_decision: str           # Supervisor의 최종 판단
+    node_timings: Annotated[Dict[str, float], merge_dicts]  # 노드별 실행 시간(초)
+
+# ==========================================
+# 1-1. Shared Resources (실행 단위 공용 클라이언트)
+# ==========================================
+class SharedResources:
+    """
+    [New] 에이전트들이 공유하는 외부 클라이언트 모음 (최초 사용 시 1회만 생성)
+    하나의 그래프/배치 실행 전체에서 MarketDataManager, LLM 게이트웨이, Neo4j 드라이버를 재사용한다.
+    """
+    def __init__(self, config):
+        self.config = config
+        self._instances = {}
+        self._lock = threading.RLock()  # factory 안에서 다른 공용 자원을 참조할 수 있도록 재진입 허용
+
+    def _get(self, key, factory):
+        with self._lock:
+            if key not in self._instances:
+                self._instances[key] = factory()
+            return self._instances[key]
+
+    @property
+    def data_manager(self) -> MarketDataManager:
+        return self._get("data_manager", lambda: MarketDataManager(
+            cache=get_price_cache(self.config),
+            indicators=self.config.get('parameters', {}).get('indicators'),
+        ))
+
+    @property
+    def vision_analyst(self) -> VisionAnalyst:
+        def factory():
+            cache_cfg = self.config.get('cache') or {}
+            cache = None
+            if cache_cfg.get('vision_dir'):
+                cache = DiskCache(
+                    cache_cfg['vision_dir'],
+                    max_bytes=int(cache_cfg.get('vision_max_mb', 512) * 1024 * 1024),
+                    max_age_seconds=cache_cfg.get('vision_max_age_hours', 24) * 3600,
+                )
+            vision_cfg = self.config.get('vision') or {}
+            return VisionAnalyst(
+                model_name=self.config['models']['vision'],
+                cache=cache,
+                image_token_budget=vision_cfg.get('image_token_budget'),
+                upload_format=vision_cfg.get('upload_format', 'jpeg'),
+                upload_quality=vision_cfg.get('upload_quality', 80),
+                gateway=self.llm_gateway,
+            )
+        return self._get("vision_analyst", factory)
+
+    @property
+    def llm_gateway(self) -> LLMGateway:
+        return self._get("llm_gateway", lambda: get_gateway(self.config))
+
+    @property
+    def graph_engine(self):
+        def factory():
+            # backend: neo4j | snapshot (로컬 CSR 스냅샷, DB 연결 불필요)
+            # 실제 연결이 없으면 None -> KnowledgeAgent가 Mock 모드로 동작
+            try:
+                if (self.config.get('graph') or {}).get('backend') == 'snapshot':
+                    engine = LocalGraphEngine.from_config(self.config)
+                else:
+                    engine = GraphRAGEngine.from_config(self.config)
+            except Exception:
+                return None
+
+            # 관계 정보는 자주 바뀌지 않으므로 entity context를 디스크 캐시 (프로세스 간 공유)
+            cache_cfg = self.config.get('cache') or {}
+            if not cache_cfg.get('graph_dir'):
+                return engine
+            cache = DiskCache(cache_cfg['graph_dir'],
+                              max_age_seconds=cache_cfg.get('graph_max_age_hours', 24) * 3600)
+            return CachedGraphEngine(engine, cache)
+        return self._get("graph_engine", factory)
 
 # ==========================================
 # 2. Chart Analyst (Vision + Technical)
 # ==========================================
+# 멀티 타임프레임 패널 (rule: pandas 리샘플 규칙, period: 표시 구간)
+DEFAULT_TIMEFRAMES = [
+    {"name": "Daily", "rule": None, "period": "1y"},
+    {"name": "Weekly", "rule": "W-FRI", "period": "2y"},
+    {"name": "Monthly", "rule": "ME", "period": "5y"},
+]
+
 class ChartAgent:
-    def __init__(self, config):
-        self.data_manager = MarketDataManager()
-        self.vision_analyst = VisionAnalyst(model_name=config['models']['vision'])
+    # 체크포인트 입력 해시에 포함되는 config 항목 (modules/checkpoint.py)
+    CONFIG_INPUTS = ("models.vision", "chart", "vision", "parameters.indicators", "summaries")
+    STATE_INPUTS = ()
+
+    def __init__(self, config, resources: SharedResources = None):
+        resources = resources or SharedResources(config)
+        self.data_manager = resources.data_manager
+        self.vision_analyst = resources.vision_analyst
+        self.limits = SummaryLimits.from_config(config)
         self.chart_dir = config['paths']['chart_save_dir']
-        os.makedirs(self.chart_dir, exist_ok=True)
+        chart_cfg = config.get('chart') or {}
+        self.image_format = chart_cfg.get('format', 'png')
+        self.dpi = chart_cfg.get('dpi', 100)
+        self.figsize = tuple(chart_cfg.get('figsize', (10, 8)))
+        self.timeframes = chart_cfg.get('timeframes') or DEFAULT_TIMEFRAMES
+        self.persist = chart_cfg.get('persist', False)  # True일 때만 디스크에 저장
+        if self.persist:
+            os.makedirs(self.chart_dir, exist_ok=True)
 
-    def _generate_expert_chart(self, symbol: str) -> str:
+    def _generate_expert_charts(self, symbol: str) -> List[Tuple[str, bytes]]:
         """
-        [Upgrade] 단순 주가가 아닌 Bollinger Bands, Volume, RSI를 포함한 멀티 플롯 차트 생성
+        [Upgrade] 일봉/주봉/월봉 멀티 타임프레임 차트(Bollinger Bands, Volume, RSI 포함)를
+        메모리 버퍼에 렌더링하여 (타임프레임 이름, 이미지 바이트) 리스트로 반환
         """
-        df = self.data_manager.get_price_history(symbol)
-        df = self.data_manager.add_technical_indicators(df) # RSI, SMA 등 계산 가정
-        
-        # 캔버스 설정 (3분할: 가격 / 거래량 / RSI)
-        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10), gridspec_kw={'height_ratios': [3, 1, 1]})
-        
-        # 1. Price & Bollinger Bands
-        ax1.plot(df.index, df['Close'], label='Price', color='black')
-        ax1.plot(df.index, df['SMA_20'], label='SMA 20', color='blue', alpha=0.7)
-        if 'Upper_Band' in df.columns:
-            ax1.fill_between(df.index, df['Upper_Band'], df['Lower_Band'], color='gray', alpha=0.2, label='Bollinger Band')
-        ax1.set_title(f"Technical Analysis: {symbol}")
-        ax1.legend(loc='upper left')
-        ax1.grid(True)
-        
-        # 2. Volume
-        colors = ['red' if r < 0 else 'green' for r in df['Close'].diff()]
-        ax2.bar(df.index, df['Volume'], color=colors, alpha=0.5)
-        ax2.set_ylabel('Volume')
-        ax2.grid(True)
-        
-        # 3. RSI
-        if 'RSI' in df.columns:
-            ax3.plot(df.index, df['RSI'], label='RSI', color='purple')
-            ax3.axhline(70, linestyle='--', color='red', alpha=0.5)
-            ax3.axhline(30, linestyle='--', color='green', alpha=0.5)
-            ax3.set_ylabel('RSI')
-            ax3.grid(True)
-        
-        plt.tight_layout()
-        save_path = os.path.join(self.chart_dir, f"{symbol}_expert_chart.png")
-        plt.savefig(save_path)
-        plt.close()
+        # 가장 긴 표시 구간으로 한 번만 조회한 뒤 타임프레임별로 리샘플링
+        longest = min(self.timeframes, key=lambda tf: period_to_start(tf['period']) or date.min)['period']
+        daily = self.data_manager.get_price_history(symbol, period=longest)
+
+        charts = []
+        for tf in self.timeframes:
+            df = resample_ohlcv(daily, tf.get('rule'))
+            df = self.data_manager.add_technical_indicators(df) # SMA, RSI, Bollinger Bands 등
+            # 지표 워밍업 구간을 포함해 계산한 뒤 표시 구간만 자름
+            start = period_to_start(tf['period'])
+            if start is not None:
+                df = df.loc[df.index >= pd.Timestamp(start, tz=df.index.tz)]
+            image = render_expert_chart(df, symbol, fmt=self.image_format, dpi=self.dpi, figsize=self.figsize,
+                                        title=f"Technical Analysis: {symbol} ({tf['name']})")
+            charts.append((tf['name'], image))
+        return charts
+
+    def _save_chart(self, symbol: str, name: str, image: bytes) -> str:
+        save_path = os.path.join(self.chart_dir, f"{symbol}_{name.lower()}_chart.{self.image_format}")
+        with open(save_path, "wb") as f:
+            f.write(image)
         return save_path
 
     def analyze(self, state: AgentState):
         symbol = state['stock_symbol']
         print(f"👁️ [ChartAgent] Visualizing market data for {symbol}...")
         
-        # 차트 생성
-        image_path = self._generate_expert_chart(symbol)
+        # 차트 생성 (메모리 버퍼, 파일 I/O 없음)
+        with backend_slot("render"):
+            charts = self._generate_expert_charts(symbol)
+        paths = [self._save_chart(symbol, name, image) for name, image in charts] if self.persist else []
         
-        # VLM 분석 요청 (Prompt Engineering 강화)
+        # VLM 분석 요청 (Prompt Engineering 강화) - 멀티 타임프레임 이미지를 한 번에 전달
         context = "Focus on candle patterns, support/resistance levels, and divergence in RSI."
-        analysis = self.vision_analyst.analyze_chart(image_path, context=context)
+        analysis = self.vision_analyst.analyze_chart(
+            [image for _, image in charts], context=context, labels=[f"{name} Chart" for name, _ in charts]
+        )
         
         return {
-            "chart_data": {"path": image_path, "analysis": analysis},
-            "messages": [HumanMessage(content=f"📊 Chart Analyst: \n{analysis}")]
+            "chart_data": {"paths": paths, "analysis": analysis},
+            "summaries": {"chart": summarize_chart(analysis, self.limits)},
         }
 
 # ==========================================
@@ -98,34 +199,39 @@ class QuantAgent:
     """
     [New] 수치적 데이터를 바탕으로 통계적 리스크와 모멘텀을 계산하는 에이전트
     """
-    def __init__(self, config):
-        self.data_manager = MarketDataManager()
+    CONFIG_INPUTS = ("parameters.lookback_period",)
+    STATE_INPUTS = ()
+
+    def __init__(self, config, resources: SharedResources = None):
+        resources = resources or SharedResources(config)
+        self.data_manager = resources.data_manager
+        self.period = (config.get('parameters') or {}).get('lookback_period', "1y")
         
     def analyze(self, state: AgentState):
         symbol = state['stock_symbol']
         print(f"🧮 [QuantAgent] Calculating statistical metrics for {symbol}...")
         
-        df = self.data_manager.get_price_history(symbol)
-        
-        # 간단한 퀀트 지표 계산 (실제로는 더 복잡한 로직 가능)
-        returns = df['Close'].pct_change().dropna()
-        volatility = returns.std() * (252 ** 0.5) # 연환산 변동성
-        recent_return = (df['Close'].iloc[-1] / df['Close'].iloc[-20] - 1) * 100 # 1달 수익률
-        max_drawdown = (df['Close'] / df['Close'].cummax() - 1).min() * 100
-        
-        metrics = {
-            "volatility_annual": f"{volatility:.2%}",
-            "1m_return": f"{recent_return:.2f}%",
-            "max_drawdown": f"{max_drawdown:.2f}%"
-        }
-        
-        report = f"Volatility: {metrics['volatility_annual']}, MDD: {metrics['max_drawdown']}"
+        df = self.data_manager.get_price_history(symbol, period=self.period)
+
+        # Universe 계산의 단일 종목 View (raw float 지표)
+        prices = df[['Close']].rename(columns={'Close': symbol})
+        metrics = compute_universe_metrics(prices)["metrics"].loc[symbol].to_dict()
         
+        # 문자열 포맷은 리포트 경계(요약)에서만 수행
         return {
             "quant_data": metrics,
-            "messages": [HumanMessage(content=f"🧮 Quant Analyst: \n{report}")]
+            "summaries": {"quant": summarize_quant(metrics)},
         }
 
+    def analyze_universe(self, symbols: List[str], benchmark: str = None) -> UniverseMetrics:
+        """
+        [New] 여러 종목의 종가 행렬을 만들어 지표/rolling/beta/상관계수를 한 번에 계산
+        """
+        closes = {symbol: self.data_manager.get_price_history(symbol, period=self.period)['Close'] for symbol in symbols}
+        prices = pd.concat(closes, axis=1)
+        bench = self.data_manager.get_price_history(benchmark, period=self.period)['Close'] if benchmark else None
+        return compute_universe_metrics(prices, benchmark=bench)
+
 # ==========================================
 # 4. Knowledge Analyst (GraphRAG)
 # ==========================================
@@ -133,57 +239,60 @@ class KnowledgeAgent:
     """
     [New] Neo4j 지식 그래프를 탐색하여 공급망/지배구조 리스크를 파악하는 에이전트
     """
-    def __init__(self, config):
+    CONFIG_INPUTS = ("graph", "summaries")
+    STATE_INPUTS = ()
+
+    def __init__(self, config, resources: SharedResources = None):
         # 실제 연결이 없으면 Mock 모드로 동작하도록 처리 가능
-        try:
-            self.engine = GraphRAGEngine()
-        except:
-            self.engine = None
+        resources = resources or SharedResources(config)
+        self.engine = resources.graph_engine
+        self.limits = SummaryLimits.from_config(config)
+
+    def cache_stats(self) -> Dict[str, float]:
+        """entity context 캐시 hit/miss (캐시를 사용하지 않으면 빈 dict)"""
+        stats = getattr(self.engine, "stats", None)
+        return stats() if callable(stats) else {}
 
     def analyze(self, state: AgentState):
         symbol = state['stock_symbol']
         print(f"🕸️ [KnowledgeAgent] Querying Knowledge Graph for {symbol}...")
         
-        if self.engine:
-            # 실제 그래프 쿼리 (예: 공급망 리스크 탐색)
-            context = self.engine.get_entity_context(symbol)
-            insight = f"Analyzed supply chain connections for {symbol}. \nContext: {context[:200]}..."
-        else:
-            insight = "GraphDB connection not available. (Mocking: No major governance risks found.)"
-            
+        if not self.engine:
+            # Mock 결과는 error 표시 -> 체크포인트에 저장되지 않고 (has_error) 그래프 연결이 복구되면 다시 조회
+            return {
+                "knowledge_data": "GraphDB connection not available. (Mocking: No major governance risks found.)",
+                "summaries": {"knowledge": {"status": "unavailable", "error": "GraphDB connection not available"}},
+            }
+
+        # 실제 그래프 쿼리 (예: 공급망 리스크 탐색) - 원문은 state에, Supervisor에는 관계 단위 요약만 전달
+        insight = self.engine.get_entity_context(symbol)
         return {
             "knowledge_data": insight,
-            "messages": [HumanMessage(content=f"🕸️ Knowledge Analyst: \n{insight}")]
+            "summaries": {"knowledge": summarize_knowledge(insight, self.limits)},
         }
 
 # ==========================================
 # 5. Supervisor (Decision Maker)
 # ==========================================
 class SupervisorAgent:
-    def __init__(self, config):
-        self.llm = ChatOpenAI(model=config['models']['supervisor'], temperature=0)
-        
+    # 분석가 출력이 바뀌면 다시 종합 (모두 재사용되면 Supervisor 호출도 생략)
+    CONFIG_INPUTS = ("models.supervisor", "summaries")
+    STATE_INPUTS = ("summaries",)
+
+    def __init__(self, config, resources: SharedResources = None):
+        resources = resources or SharedResources(config)
+        self.gateway = resources.llm_gateway
+        self.model_name = config['models']['supervisor']
+        self.limits = SummaryLimits.from_config(config)
+
     def summarize(self, state: AgentState):
         print("🕵️ [Supervisor] Synthesizing all reports...")
         
-        # 이전 에이전트들의 결과를 종합
-        prompt = f"""
-        You are the Chief Investment Officer (CIO) of Neural Fusion Lab.
-        Synthesize the following reports to make a final investment decision for '{state['stock_symbol']}'.
-        
-        1. [Visual Analysis]: {state.get('chart_data', {}).get('analysis')}
-        2. [Quant Metrics]: {state.get('quant_data')}
-        3. [Knowledge Graph]: {state.get('knowledge_data')}
-        
-        output format:
-        - Decision: [BUY / SELL / HOLD]
-        - Confidence Score: [1-10]
-        - Key Rationale: (Summarize within 3 sentences)
-        """
-        
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        
-        return {
-            "final_decision": response.content,
-            "messages": [HumanMessage(content=response.content)]
-        }
+        # 분석가 원문 대신 정형 요약만 토큰 예산 내로 조립
+        prompt = build_supervisor_prompt(state['stock_symbol'], state.get('summaries') or {}, self.limits)
+
+        with backend_slot("llm"):
+            response = self.gateway.invoke([HumanMessage(content=prompt)], model=self.model_name, temperature=0,
+                                           max_tokens=self.limits.output_tokens)
+
+        return {"final_decision": response.content}
@@ -0,0 +1,156 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from modules.agents import SharedResources
+from modules.checkpoint import CheckpointStore
+from modules.limits import configure_limits
+from modules.main import build_graph, load_config, CONFIG_PATH
+from modules.screen import Screener
+from modules.tracing import configure_tracing, format_summary, span
+
+class BatchRunner:
+    """
+    [New] 다수 종목(Watchlist)을 한 번에 분석하는 배치 실행기
+    - 그래프/에이전트/외부 클라이언트는 실행 전체에서 1세트만 생성하여 재사용
+    - 종목 단위 동시성 + backend(price, llm, vision, neo4j)별 동시 호출 제한
+    - 종목별 결과를 완료되는 순서대로 스트리밍 반환
+    - 규칙 기반 Pre-screen: 전 종목을 한 번에 평가하여 규칙을 만족한 종목만 LLM 그래프 실행 (screen=False면 전부)
+    - 노드 출력 체크포인트: 중단 후 재실행하면 완료된 노드는 저장된 출력 재사용 (resume=False면 모두 재계산)
+    """
+    def __init__(self, config: dict, max_workers: Optional[int] = None, resume: bool = True, screen: bool = True):
+        self.config = config
+        limits = dict(config.get('concurrency') or {})
+        self.max_workers = max_workers or limits.pop('symbols', None) or 4
+        configure_limits(limits)
+        self.tracer = configure_tracing(config)  # paths.log_dir/trace-{run_id}.jsonl
+
+        self.resources = SharedResources(config)
+        self.checkpoints = CheckpointStore.from_config(config, reuse=resume)
+        self.app = build_graph(config, self.resources, checkpoints=self.checkpoints)
+        self.screener = Screener.from_config(config) if screen else None
+
+    def run_symbol(self, symbol: str, screen_hits: Optional[List[str]] = None) -> Dict:
+        start = time.perf_counter()
+        initial_state = {"stock_symbol": symbol}
+        if screen_hits:
+            # 어떤 규칙으로 선별되었는지 Supervisor에도 전달
+            initial_state["summaries"] = {"screen": {"triggered": screen_hits}}
+        try:
+            with span("symbol", kind="run", symbol=symbol):
+                state = self.app.invoke(initial_state)
+        except Exception as e:
+            return {"symbol": symbol, "status": "error", "error": f"{type(e).__name__}: {e}",
+                    "elapsed": time.perf_counter() - start}
+
+        return {
+            "symbol": symbol,
+            "status": "ok",
+            "screen": screen_hits,
+            "final_decision": state.get("final_decision"),
+            "chart": (state.get("chart_data") or {}).get("analysis"),
+            "quant": state.get("quant_data"),
+            "knowledge": state.get("knowledge_data"),
+            "node_timings": state.get("node_timings", {}),
+            "elapsed": time.perf_counter() - start,
+        }
+
+    def prefetch_knowledge(self, symbols: List[str]):
+        """지식 그래프 관계를 UNWIND 배치 쿼리로 미리 조회 (종목별 왕복 제거)"""
+        analysts = self.config.get('workflow', {}).get('analysts', [])
+        engine = self.resources.graph_engine
+        if engine is None or 'knowledge_miner' not in analysts:
+            return
+        try:
+            engine.prefetch(symbols)
+        except Exception as e:
+            print(f"⚠️ [BatchRunner] Knowledge graph prefetch failed, falling back to per-symbol queries: {e}", file=sys.stderr)
+
+    def release_knowledge(self):
+        """prefetch 결과는 이번 배치에서만 유효 (공유 엔진이 다음 배치에 오래된 관계를 주지 않도록 비움)"""
+        clear_prefetched = getattr(self.resources.graph_engine, "clear_prefetched", None)
+        if callable(clear_prefetched):
+            clear_prefetched()
+
+    def prescreen(self, symbols: List[str]) -> Iterator[Dict]:
+        """
+        규칙을 만족하지 못한 종목은 status="screened_out"(피처 포함), 가격이 없는 종목은 status="error"로 바로 yield
+        실행 후 self.screen_hits = {선별된 종목: 만족한 규칙}
+        """
+        result = self.screener.screen(self.resources.data_manager, symbols)
+        self.screen_hits = result.hits
+        for symbol in result.missing:
+            yield {"symbol": symbol, "status": "error", "error": "price history unavailable (pre-screen)"}
+        features = result.features.astype(object).where(result.features.notna(), None)
+        for symbol in features.index.difference(result.selected, sort=False):
+            yield {"symbol": symbol, "status": "screened_out", "features": features.loc[symbol].to_dict()}
+        print(f"ℹ️ [BatchRunner] Pre-screen: {len(result.selected)}/{len(symbols)} symbols routed to the LLM graph",
+              file=sys.stderr)
+
+    def run(self, symbols: Iterable[str]) -> Iterator[Dict]:
+        """완료된 종목부터 결과 dict를 yield (입력 순서와 다를 수 있음)"""
+        symbols = list(symbols)
+        self.screen_hits: Dict[str, List[str]] = {}
+        if self.screener is not None:
+            yield from self.prescreen(symbols)
+            symbols = [symbol for symbol in symbols if symbol in self.screen_hits]
+        self.prefetch_knowledge(symbols)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(self.run_symbol, symbol, self.screen_hits.get(symbol)) for symbol in symbols]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            self.release_knowledge()
+
+        stats = getattr(self.resources.graph_engine, "stats", None)
+        if callable(stats):
+            print(f"ℹ️ [BatchRunner] Entity context cache: {stats()}", file=sys.stderr)
+        if self.checkpoints is not None:
+            print(f"ℹ️ [BatchRunner] Node checkpoints: {self.checkpoints.stats()}", file=sys.stderr)
+        self.tracer.flush()
+        if self.tracer.enabled:
+            print(format_summary(self.tracer.summary()), file=sys.stderr)
+
+def write_jsonl(results: Iterable[Dict], out: TextIO):
+    """결과를 한 줄씩 즉시 기록 (중간에 중단되어도 완료분은 남음)"""
+    for result in results:
+        out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+        out.flush()
+
+def read_watchlist(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line.upper() for line in lines if line and not line.startswith("#")]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neural Fusion Lab batch runner (JSONL output)")
+    parser.add_argument("symbols", nargs="*", help="Ticker symbols (e.g. NVDA AAPL MSFT)")
+    parser.add_argument("--watchlist", help="Text file with one symbol per line")
+    parser.add_argument("--out", help="Output JSONL path (default: stdout)")
+    parser.add_argument("--workers", type=int, help="Concurrent symbols (default: concurrency.symbols)")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--no-screen", action="store_true", help="Run every symbol through the graph (skip the rule pre-screen)")
+    parser.add_argument("--fresh", action="store_true", help="Ignore saved node checkpoints (outputs are still recorded)")
+    args = parser.parse_args(argv)
+
+    symbols = [s.upper() for s in args.symbols]
+    if args.watchlist:
+        symbols += read_watchlist(args.watchlist)
+    symbols = list(dict.fromkeys(symbols))  # 중복 제거 (순서 유지)
+    if not symbols:
+        parser.error("no symbols given")
+
+    runner = BatchRunner(load_config(args.config), max_workers=args.workers, resume=not args.fresh,
+                         screen=not args.no_screen)
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as out:
+            write_jsonl(runner.run(symbols), out)
+    else:
+        write_jsonl(runner.run(symbols), sys.stdout)
+
+if __name__ == "__main__":
+    main()
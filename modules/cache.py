@@ -0,0 +1,180 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Union
+
+from .tracing import current_span
+
+# ==========================================
+# Content-addressed Disk Cache
+# ==========================================
+class DiskCache:
+    """
+    [New] sha256 키 -> JSON 값을 파일로 저장하는 로컬 캐시
+    - 파일 단위 원자적 쓰기로 여러 프로세스가 같은 디렉터리를 공유 가능
+    - max_age_seconds: 오래된 항목은 조회 시 만료 처리
+    - max_bytes: 총 용량 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+    """
+    def __init__(self, root: str, max_bytes: Optional[int] = None, max_age_seconds: Optional[float] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(self.root, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = self._scan_size()
+
+    @staticmethod
+    def make_key(*parts: Union[str, bytes, int, float, None]) -> str:
+        """여러 입력(이미지 바이트, 프롬프트, 모델명 등)을 하나의 sha256 키로 결합"""
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part if isinstance(part, bytes) else repr(part).encode("utf-8")
+            digest.update(len(data).to_bytes(8, "little"))  # 길이 prefix로 경계 모호성 제거
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if self.max_age_seconds is not None and time.time() - stat.st_mtime > self.max_age_seconds:
+                self._remove(path, stat.st_size)
+                raise FileNotFoundError(path)
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)["value"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            current_span().add(cache_miss=1)
+            return None
+
+        # 접근 시각 갱신 (크기 기반 eviction 순서에 사용)
+        try:
+            os.utime(path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        current_span().add(cache_hit=1)
+        return value
+
+    def set(self, key: str, value: Any):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"value": value, "created_at": time.time()}, f, ensure_ascii=False)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+        with self._lock:
+            self._size += os.path.getsize(path) - previous
+        if self.max_bytes is not None and self._size > self.max_bytes:
+            self._evict()
+
+    def __contains__(self, key: str) -> bool:
+        """hit/miss 카운터와 접근 시각을 건드리지 않는 존재 여부 확인 (TTL 반영)"""
+        try:
+            mtime = os.path.getmtime(self._path(key))
+        except OSError:
+            return False
+        return self.max_age_seconds is None or time.time() - mtime <= self.max_age_seconds
+
+    def delete(self, key: str):
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._remove(path, size)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0, "bytes": self._size}
+
+    def _entries(self):
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".json"):
+                    yield os.path.join(shard_dir, name)
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self._entries():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _remove(self, path: str, size: int):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._size -= size
+
+    def _evict(self):
+        """max_bytes의 90%까지 오래 사용되지 않은(atime) 항목부터 삭제"""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        entries.sort()
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            self._remove(path, size)
+
+# ==========================================
+# In-flight Request Deduplication
+# ==========================================
+class InflightDeduper:
+    """
+    [New] 같은 키의 요청이 동시에 들어오면 첫 요청만 실제로 실행하고
+    나머지 스레드는 그 결과(또는 예외)를 공유한다.
+    결과는 읽기 전용으로 취급한다. 다만 한 호출자의 수정이 다른 호출자에게 보이지 않도록
+    대기하던 스레드에는 deepcopy를 돌려준다 (원본은 첫 요청자에게).
+    """
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            return copy.deepcopy(future.result())
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
@@ -0,0 +1,85 @@
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, Optional
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# ==========================================
+# In-memory Chart Renderer (Agg, pyplot 전역 상태 미사용)
+# ==========================================
+def resample_ohlcv(df: pd.DataFrame, rule: Optional[str]) -> pd.DataFrame:
+    """일봉 OHLCV를 주봉("W-FRI") / 월봉("ME") 등으로 변환 (rule이 None이면 그대로)"""
+    if not rule:
+        return df
+    agg = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    return df.resample(rule).agg({col: how for col, how in agg.items() if col in df.columns}).dropna(subset=["Close"])
+
+def render_expert_chart(df: pd.DataFrame, symbol: str, fmt: str = "png", dpi: int = 100,
+                        figsize=(12, 10), quality: int = 85, title: Optional[str] = None) -> bytes:
+    """
+    [New] 가격/Bollinger, 거래량, RSI 3분할 차트를 메모리 버퍼에 렌더링하여 이미지 바이트 반환
+    Figure를 직접 생성하므로 스레드/프로세스 병렬 렌더링에 안전하다.
+
+    Args:
+        df: add_technical_indicators를 거친 OHLCV DataFrame
+        fmt: "png" | "jpeg" | "webp"
+        dpi: 해상도 (figsize x dpi = 픽셀 크기)
+        quality: jpeg/webp 압축 품질
+        title: 차트 제목 (기본: "Technical Analysis: {symbol}")
+    """
+    # matplotlib은 첫 렌더링 시점에 로드 (차트를 그리지 않는 실행에서는 import 비용 없음)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    # 캔버스 설정 (3분할: 가격 / 거래량 / RSI)
+    ax1, ax2, ax3 = fig.subplots(3, 1, gridspec_kw={'height_ratios': [3, 1, 1]})
+
+    # 1. Price & Bollinger Bands
+    ax1.plot(df.index, df['Close'], label='Price', color='black')
+    if 'SMA_20' in df.columns:
+        ax1.plot(df.index, df['SMA_20'], label='SMA 20', color='blue', alpha=0.7)
+    if 'Upper_Band' in df.columns:
+        ax1.fill_between(df.index, df['Upper_Band'], df['Lower_Band'], color='gray', alpha=0.2, label='Bollinger Band')
+    ax1.set_title(title or f"Technical Analysis: {symbol}")
+    ax1.legend(loc='upper left')
+    ax1.grid(True)
+
+    # 2. Volume
+    colors = ['red' if r < 0 else 'green' for r in df['Close'].diff()]
+    ax2.bar(df.index, df['Volume'], color=colors, alpha=0.5)
+    ax2.set_ylabel('Volume')
+    ax2.grid(True)
+
+    # 3. RSI
+    if 'RSI' in df.columns:
+        ax3.plot(df.index, df['RSI'], label='RSI', color='purple')
+        ax3.axhline(70, linestyle='--', color='red', alpha=0.5)
+        ax3.axhline(30, linestyle='--', color='green', alpha=0.5)
+        ax3.set_ylabel('RSI')
+        ax3.grid(True)
+
+    fig.tight_layout()
+    return figure_to_bytes(fig, fmt=fmt, dpi=dpi, quality=quality)
+
+def figure_to_bytes(fig: "Figure", fmt: str = "png", dpi: int = 100, quality: int = 85) -> bytes:
+    """Figure를 디스크를 거치지 않고 이미지 바이트로 인코딩"""
+    fmt = fmt.lower()
+    options = {"pil_kwargs": {"quality": quality}} if fmt in ("jpeg", "jpg", "webp") else {}
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi, **options)
+    return buffer.getvalue()
+
+def _render_job(args):
+    symbol, df, options = args
+    return symbol, render_expert_chart(df, symbol, **options)
+
+def render_many(frames: Dict[str, pd.DataFrame], max_workers: Optional[int] = None, **options) -> Dict[str, bytes]:
+    """여러 종목 차트를 프로세스 풀에서 병렬 렌더링 (symbol -> 이미지 바이트)"""
+    jobs = [(symbol, df, options) for symbol, df in frames.items()]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return dict(pool.map(_render_job, jobs))
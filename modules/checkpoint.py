@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cache import DiskCache
+from .tracing import current_span
+
+# ==========================================
+# Node Output Checkpoint Store (SQLite)
+# ==========================================
+class CheckpointStore:
+    """
+    [New] 그래프 노드 출력(AgentState 업데이트)을 (종목, 거래일, 노드, 입력 해시) 단위로 저장하는 SQLite 저장소
+    - 중단된 배치를 다시 실행하면 완료된 노드는 저장된 출력을 그대로 사용하고 남은 노드만 실행
+    - 입력 해시 = 노드가 읽는 config 항목 + 상위 노드 출력 -> 설정을 바꾸면 영향받는 노드만 다시 계산
+    - WAL 모드 + 스레드별 커넥션이므로 배치 워커 스레드/프로세스가 같은 파일을 공유 가능
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS node_outputs (
+        symbol      TEXT NOT NULL,
+        run_date    TEXT NOT NULL,
+        node        TEXT NOT NULL,
+        input_hash  TEXT NOT NULL,
+        output      TEXT NOT NULL,
+        created_at  REAL NOT NULL,
+        PRIMARY KEY (symbol, run_date, node, input_hash)
+    )
+    """
+
+    def __init__(self, path: str, reuse: bool = True):
+        self.path = path
+        self.reuse = reuse  # False면 저장된 출력을 읽지 않고 다시 계산 (결과는 계속 기록)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(self.SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict, reuse: bool = True) -> Optional["CheckpointStore"]:
+        """checkpoint.enabled가 false거나 경로가 없으면 None"""
+        cfg = config.get('checkpoint') or {}
+        if not cfg.get('enabled', True) or not cfg.get('path'):
+            return None
+        return cls(cfg['path'], reuse=reuse)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------
+    # Keys
+    # ------------------------------------------
+    @staticmethod
+    def input_hash(node: str, config: dict, config_keys: Iterable[str], state: Dict,
+                   state_keys: Iterable[str]) -> str:
+        """노드 입력 해시: 노드 이름 + 읽는 config 항목(점 표기 경로) + 읽는 state 키"""
+        parts: List[Any] = [node]
+        for path in config_keys:
+            value: Any = config
+            for part in path.split("."):
+                value = value.get(part) if isinstance(value, dict) else None
+            parts.append(json.dumps([path, value], sort_keys=True, default=str))
+        for key in state_keys:
+            parts.append(json.dumps([key, state.get(key)], sort_keys=True, default=str))
+        return DiskCache.make_key(*parts)
+
+    # ------------------------------------------
+    # Read / Write
+    # ------------------------------------------
+    def get(self, symbol: str, run_date: str, node: str, input_hash: str) -> Optional[Dict]:
+        if not self.reuse:
+            return None
+        row = self._connect().execute(
+            "SELECT output FROM node_outputs WHERE symbol=? AND run_date=? AND node=? AND input_hash=?",
+            (symbol, run_date, node, input_hash),
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        current_span().add(checkpoint_hit=int(row is not None), checkpoint_miss=int(row is None))
+        return decode_update(row[0]) if row is not None else None
+
+    def put(self, symbol: str, run_date: str, node: str, input_hash: str, update: Dict):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO node_outputs VALUES (?, ?, ?, ?, ?, ?)",
+            (symbol, run_date, node, input_hash, encode_update(update), time.time()),
+        )
+
+    def completed_nodes(self, symbol: str, run_date: str) -> List[str]:
+        """해당 종목/거래일에 출력이 저장된 노드 이름 (입력 해시 무관)"""
+        rows = self._connect().execute(
+            "SELECT DISTINCT node FROM node_outputs WHERE symbol=? AND run_date=?", (symbol, run_date)
+        ).fetchall()
+        return [node for (node,) in rows]
+
+    def prune(self, keep_days: int = 30) -> int:
+        """keep_days보다 오래된 체크포인트 삭제 -> 삭제된 행 수"""
+        cursor = self._connect().execute("DELETE FROM node_outputs WHERE created_at < ?",
+                                         (time.time() - keep_days * 86400,))
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+# ==========================================
+# Serialization
+# ==========================================
+def encode_update(update: Dict) -> str:
+    return json.dumps(update, ensure_ascii=False, default=str)
+
+def decode_update(text: str) -> Dict:
+    return json.loads(text)
+
+def has_error(update: Dict) -> bool:
+    """실패 결과(예: VisionAnalyst의 {"error": ...})는 체크포인트하지 않음 -> 재실행 시 다시 시도"""
+    def walk(value, depth):
+        if isinstance(value, dict):
+            return "error" in value or (depth > 0 and any(walk(v, depth - 1) for v in value.values()))
+        return False
+    return any(walk(value, 2) for value in update.values())
@@ -1,41 +1,257 @@
-from neo4j import GraphDatabase
 import os
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from .cache import DiskCache, InflightDeduper
+from .limits import backend_slot
+
+# ==========================================
+# 프로세스 공용 Neo4j 드라이버 (커넥션 풀 공유)
+# ==========================================
+_DRIVERS = {}
+_DRIVERS_LOCK = threading.Lock()
+
+def get_driver(uri: str, user: str, password: str, **pool_options):
+    """(uri, user)별로 하나의 드라이버만 생성하여 프로세스 전체에서 커넥션 풀을 공유"""
+    key = (uri, user)
+    with _DRIVERS_LOCK:
+        if key not in _DRIVERS:
+            from neo4j import GraphDatabase  # 드라이버가 실제로 필요할 때만 로드
+            _DRIVERS[key] = GraphDatabase.driver(uri, auth=(user, password), **pool_options)
+        return _DRIVERS[key]
+
+def close_drivers():
+    """프로세스 종료 시 공용 드라이버 정리"""
+    with _DRIVERS_LOCK:
+        for driver in _DRIVERS.values():
+            driver.close()
+        _DRIVERS.clear()
+
+RELATION_TYPES = "SUPPLIES_TO|COMPETES_WITH"
+
+def format_entity_context(symbol: str, data: List[Dict]) -> str:
+    """관계 조회 결과를 LLM에게 전달할 텍스트로 변환 (Neo4j/로컬 스냅샷 엔진 공용)"""
+    if not data:
+        return "No graph data found."
+
+    context_str = f"Knowledge Graph Context for {symbol}:\n"
+    for item in data:
+        hops = f" ({item['hops']}-hop)" if item.get('hops', 1) > 1 else ""
+        context_str += f"- {item['related_company']} is related via {item['relation']}{hops}\n"
+    return context_str
 
 class GraphRAGEngine:
     """
     Neo4j 지식 그래프와 상호작용하여 기업 관계 정보를 추출하는 엔진
     """
-    def __init__(self, uri=None, user=None, password=None):
+    def __init__(self, uri=None, user=None, password=None, depth: int = 1, limit: int = 10,
+                 batch_size: int = 500, max_connection_pool_size: int = 50):
         self.uri = uri or os.getenv("NEO4J_URI")
         self.user = user or os.getenv("NEO4J_USER")
         self.password = password or os.getenv("NEO4J_PASSWORD")
-        self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        self.depth = depth
+        self.limit = limit
+        self.batch_size = batch_size
+        self.driver = get_driver(self.uri, self.user, self.password,
+                                 max_connection_pool_size=max_connection_pool_size)
+        self._prefetched: Dict[tuple, List[Dict]] = {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "GraphRAGEngine":
+        graph_cfg = config.get('graph') or {}
+        return cls(
+            depth=graph_cfg.get('depth', 1),
+            limit=graph_cfg.get('limit', 10),
+            batch_size=graph_cfg.get('batch_size', 500),
+            max_connection_pool_size=graph_cfg.get('max_connection_pool_size', 50),
+        )
 
     def close(self):
-        self.driver.close()
+        # 드라이버는 공유 자원이므로 여기서 닫지 않음 (close_drivers() 사용)
+        self.clear_prefetched()
+
+    def clear_prefetched(self, symbol: Optional[str] = None):
+        """prefetch()로 받아 둔 관계 결과 삭제 (배치 실행이 끝나거나 그래프가 갱신되면 호출)"""
+        if symbol is None:
+            self._prefetched.clear()
+            return
+        for key in [key for key in self._prefetched if key[0] == symbol]:
+            self._prefetched.pop(key, None)
 
-    def query_supply_chain(self, symbol: str):
+    @staticmethod
+    def _build_query(depth: int) -> str:
+        # 가변 길이 관계의 상한은 파라미터화할 수 없으므로 정수로 검증 후 삽입
+        depth = int(depth)
+        if depth < 1:
+            raise ValueError("depth must be >= 1")
+        return f"""
+        UNWIND $symbols AS symbol
+        MATCH (c:Company {{symbol: symbol}})
+        CALL {{
+            WITH c
+            MATCH p = (c)-[:{RELATION_TYPES}*1..{depth}]-(other)
+            WHERE other <> c
+            WITH other, type(last(relationships(p))) AS relation, min(length(p)) AS hops
+            RETURN relation, other.name AS related_company, hops
+            ORDER BY hops
+            LIMIT $limit
+        }}
+        RETURN symbol, c.name AS `c.name`, relation, related_company, hops
+        """
+
+    def query_supply_chain_many(self, symbols: Iterable[str], depth: Optional[int] = None,
+                                limit: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """
+        [New] 여러 기업의 공급망/경쟁사 관계를 UNWIND 배치 쿼리로 한 번에 조회
+        batch_size 단위로 묶어 500개 종목도 몇 번의 왕복으로 처리한다.
+        """
+        depth = depth or self.depth
+        limit = limit or self.limit
+        symbols = list(dict.fromkeys(symbols))
+        results: Dict[str, List[Dict]] = {symbol: [] for symbol in symbols}
+        query = self._build_query(depth)
+
+        for i in range(0, len(symbols), self.batch_size):
+            batch = symbols[i:i + self.batch_size]
+            with backend_slot("neo4j"), self.driver.session() as session:
+                for record in session.run(query, symbols=batch, limit=limit):
+                    row = record.data()
+                    results[row.pop("symbol")].append(row)
+        return results
+
+    def query_supply_chain(self, symbol: str, depth: Optional[int] = None, limit: Optional[int] = None):
         """
         특정 기업의 공급망(Supply Chain) 및 경쟁사 관계 조회
         """
-        query = """
-        MATCH (c:Company {symbol: $symbol})-[r:SUPPLIES_TO|COMPETES_WITH]-(other)
-        RETURN c.name, type(r) as relation, other.name as related_company
-        LIMIT 10
+        key = (symbol, depth or self.depth, limit or self.limit)
+        if key in self._prefetched:
+            return self._prefetched[key]
+        return self.query_supply_chain_many([symbol], depth, limit)[symbol]
+
+    def prefetch(self, symbols: Iterable[str], depth: Optional[int] = None, limit: Optional[int] = None):
+        """
+        배치 실행 전에 여러 종목의 관계를 한 번에 조회해 두고 query_supply_chain에서 재사용
+        (TTL이 없으므로 배치가 끝나면 clear_prefetched()로 비움)
         """
-        with self.driver.session() as session:
-            result = session.run(query, symbol=symbol)
-            return [record.data() for record in result]
-            
+        depth, limit = depth or self.depth, limit or self.limit
+        for symbol, rows in self.query_supply_chain_many(symbols, depth, limit).items():
+            self._prefetched[(symbol, depth, limit)] = rows
+
     def get_entity_context(self, symbol: str) -> str:
         """
         LLM에게 전달할 텍스트 형태의 컨텍스트 생성
         """
-        data = self.query_supply_chain(symbol)
-        if not data:
-            return "No graph data found."
-        
-        context_str = f"Knowledge Graph Context for {symbol}:\n"
-        for item in data:
-            context_str += f"- {item['related_company']} is related via {item['relation']}\n"
-        return context_str
+        return format_entity_context(symbol, self.query_supply_chain(symbol))
+
+    @property
+    def version(self) -> Optional[str]:
+        # Neo4j는 변경 스탬프가 없으므로 캐시 무효화는 TTL + CachedGraphEngine.invalidate()에 맡김
+        return None
+
+    def export_snapshot(self, out_dir: str):
+        """[New] 관계 그래프 전체를 로컬 CSR 스냅샷으로 내보내기 (LocalGraphEngine에서 사용)"""
+        from .graph_snapshot import export_from_neo4j
+        with backend_slot("neo4j"):
+            return export_from_neo4j(self.driver, out_dir)
+
+# ==========================================
+# Entity Context Cache
+# ==========================================
+class CachedGraphEngine:
+    """
+    [New] get_entity_context 결과를 로컬 디스크 캐시에 저장하는 래퍼 (GraphRAGEngine/LocalGraphEngine 공용)
+    - 키: 심볼 + depth/limit + 그래프 버전(스냅샷 해시) + 캐시 세대(generation)
+    - TTL(max_age_seconds)이 지나면 재조회, invalidate()로 즉시 무효화
+    - 세대 번호는 캐시 디렉터리의 파일에 기록되므로 같은 디렉터리를 쓰는 모든 프로세스에 반영된다.
+    """
+    GENERATION_FILE = "GENERATION"
+
+    def __init__(self, engine, cache: DiskCache):
+        self.engine = engine
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self._inflight = InflightDeduper()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # query_supply_chain, close 등 나머지 인터페이스는 내부 엔진에 위임
+        return getattr(self.engine, name)
+
+    # ------------------------------------------
+    # Invalidation
+    # ------------------------------------------
+    def _generation_path(self) -> str:
+        return os.path.join(self.cache.root, self.GENERATION_FILE)
+
+    def generation(self) -> int:
+        try:
+            with open(self._generation_path(), "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """symbol이 주어지면 해당 종목만, 아니면 세대 번호를 올려 전체 캐시를 무효화 (그래프 갱신 후 호출)"""
+        clear_prefetched = getattr(self.engine, "clear_prefetched", None)
+        if callable(clear_prefetched):
+            clear_prefetched(symbol)  # 디스크 캐시 앞단의 메모리 prefetch 결과도 함께 무효화
+        if symbol is not None:
+            self.cache.delete(self._key(symbol))
+            return
+        path = self._generation_path()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(self.generation() + 1))
+        os.replace(tmp, path)
+
+    def _key(self, symbol: str, depth: Optional[int] = None, limit: Optional[int] = None) -> str:
+        # 실제 조회에 쓰인 depth/limit로 키를 만듦 (None = 엔진 기본값, query_supply_chain_many와 동일한 규칙)
+        return DiskCache.make_key("entity_context", symbol, depth or self.engine.depth, limit or self.engine.limit,
+                                  getattr(self.engine, "version", None), self.generation())
+
+    # ------------------------------------------
+    # Cached Queries
+    # ------------------------------------------
+    def get_entity_context(self, symbol: str) -> str:
+        key = self._key(symbol)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count(hit=True)
+            return cached
+        self._count(hit=False)
+        return self._inflight.run(key, lambda: self._fill(key, symbol))
+
+    def _fill(self, key: str, symbol: str) -> str:
+        context = self.engine.get_entity_context(symbol)
+        with self._lock:
+            self.queries += 1
+        self.cache.set(key, context)
+        return context
+
+    def prefetch(self, symbols: Iterable[str], depth: Optional[int] = None, limit: Optional[int] = None):
+        """캐시에 없는 종목만 배치로 조회하여 캐시를 채움"""
+        keys = {symbol: self._key(symbol, depth, limit) for symbol in dict.fromkeys(symbols)}
+        missing = [symbol for symbol, key in keys.items() if key not in self.cache]
+        if not missing:
+            return
+        rows_by_symbol = self.engine.query_supply_chain_many(missing, depth, limit)
+        with self._lock:
+            self.queries += 1
+        for symbol, rows in rows_by_symbol.items():
+            self.cache.set(keys[symbol], format_entity_context(symbol, rows))
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, float]:
+        """hit/miss 카운터 (queries: 캐시 miss로 실제 그래프 백엔드에 보낸 조회 수, 동시 요청 병합 후)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "queries": self.queries,
+                    "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .graph_rag import RELATION_TYPES, format_entity_context
+
+# ==========================================
+# CSR Graph Snapshot (Neo4j -> NumPy, memory-mapped)
+# ==========================================
+# 방향 플래그: 저장된 간선이 원래 그래프에서 node -> neighbor(OUT)인지 neighbor -> node(IN)인지
+OUT, IN = 1, -1
+# 스냅샷 디렉터리 안에서 현재 스냅샷 하위 디렉터리 이름을 담는 포인터 파일
+CURRENT = "CURRENT"
+
+class GraphSnapshot:
+    """
+    [New] 기업 관계 그래프의 압축 스냅샷 (CSR 인접 구조)
+
+    - indptr[i]:indptr[i+1] 구간이 노드 i의 이웃 (양방향 모두 저장, direction으로 구분)
+    - indices: 이웃 노드 번호 / relation: 관계 타입 코드 / direction: OUT(+1) 또는 IN(-1)
+    - 배열은 .npy로 저장하고 mmap으로 열어 프로세스 간 페이지 캐시를 공유
+    """
+    ARRAYS = ("keys", "names", "indptr", "indices", "relation", "direction")
+
+    def __init__(self, keys: np.ndarray, names: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 relation: np.ndarray, direction: np.ndarray, relation_types: List[str], version: str):
+        self.keys, self.names = keys, names
+        self.indptr, self.indices = indptr, indices
+        self.relation, self.direction = relation, direction
+        self.relation_types = relation_types
+        self.version = version
+        self.index: Dict[str, int] = {str(key): i for i, key in enumerate(keys)}
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.keys)
+
+    @property
+    def num_edges(self) -> int:
+        # 양방향으로 저장하므로 원본 간선 수의 2배
+        return len(self.indices) // 2
+
+    # ------------------------------------------
+    # Build / Persist
+    # ------------------------------------------
+    @classmethod
+    def from_edges(cls, nodes: Sequence[Tuple[str, str]], edges: Iterable[Tuple[str, str, str]],
+                   version: Optional[str] = None) -> "GraphSnapshot":
+        """
+        Args:
+            nodes: (key, name) 목록. key는 보통 티커 심볼
+            edges: (source_key, target_key, relation_type) 방향 간선 목록
+        """
+        keys = [key for key, _ in nodes]
+        position = {key: i for i, key in enumerate(keys)}
+        relation_types: List[str] = []
+        rel_code: Dict[str, int] = {}
+
+        src, dst, rel = [], [], []
+        for u, v, r in edges:
+            if u not in position or v not in position:
+                continue
+            if r not in rel_code:
+                rel_code[r] = len(relation_types)
+                relation_types.append(r)
+            src.append(position[u])
+            dst.append(position[v])
+            rel.append(rel_code[r])
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        rel = np.asarray(rel, dtype=np.uint8)
+
+        # 정방향(OUT) + 역방향(IN)을 합친 뒤 출발 노드 기준으로 정렬 -> CSR
+        owner = np.concatenate([src, dst])
+        neighbor = np.concatenate([dst, src])
+        relation = np.concatenate([rel, rel])
+        direction = np.concatenate([np.full(len(src), OUT, np.int8), np.full(len(src), IN, np.int8)])
+        order = np.argsort(owner, kind="stable")
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner, minlength=len(keys)), out=indptr[1:])
+
+        names = np.asarray([name or key for key, name in nodes], dtype=str)
+        keys_arr = np.asarray(keys, dtype=str)
+        indices = neighbor[order].astype(np.int32)
+        if version is None:
+            digest = hashlib.sha256()
+            for array in (keys_arr, indptr, indices, relation[order]):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            version = digest.hexdigest()[:16]
+        return cls(keys_arr, names, indptr, indices, relation[order], direction[order], relation_types, version)
+
+    def save(self, out_dir: str, keep: int = 2):
+        """
+        out_dir/<version>-<ns>/ 에 배열과 meta를 모두 쓴 뒤 CURRENT 포인터를 원자적으로 교체
+        (이미 mmap으로 열린 이전 스냅샷 파일은 덮어쓰지 않으므로 실행 중인 엔진이 계속 안전하게 읽음)
+        keep: 남겨둘 스냅샷 디렉터리 수 (CURRENT 포함, 오래된 것부터 삭제)
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        name = f"{self.version}-{time.time_ns()}"
+        target = os.path.join(out_dir, name)
+        os.makedirs(target)
+        for array in self.ARRAYS:
+            np.save(os.path.join(target, f"{array}.npy"), getattr(self, array))
+        meta = {"relation_types": self.relation_types, "version": self.version, "created_at": time.time(),
+                "num_nodes": self.num_nodes, "num_edges": self.num_edges}
+        with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        tmp = os.path.join(out_dir, f"{CURRENT}.tmp-{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(name)
+        os.replace(tmp, os.path.join(out_dir, CURRENT))  # 포인터 교체 = 배열과 meta가 함께 바뀌는 시점
+        self._prune(out_dir, keep)
+
+    @staticmethod
+    def _prune(out_dir: str, keep: int):
+        # 이미 열려 있는 mmap은 파일이 삭제되어도 inode가 유지되므로 계속 읽을 수 있음
+        with open(os.path.join(out_dir, CURRENT), "r", encoding="utf-8") as f:
+            current = f.read().strip()
+        versions = [entry for entry in os.listdir(out_dir)
+                    if entry != current and os.path.isfile(os.path.join(out_dir, entry, "meta.json"))]
+        versions.sort(key=lambda entry: os.path.getmtime(os.path.join(out_dir, entry, "meta.json")))  # 오래된 순
+        for entry in versions[:max(0, len(versions) - max(keep - 1, 0))]:
+            shutil.rmtree(os.path.join(out_dir, entry), ignore_errors=True)
+
+    @staticmethod
+    def resolve(snapshot_dir: str) -> str:
+        """CURRENT 포인터가 가리키는 스냅샷 디렉터리 (포인터가 없으면 이전 형식의 평면 디렉터리)"""
+        pointer = os.path.join(snapshot_dir, CURRENT)
+        if not os.path.exists(pointer):
+            return snapshot_dir
+        with open(pointer, "r", encoding="utf-8") as f:
+            return os.path.join(snapshot_dir, f.read().strip())
+
+    @classmethod
+    def load(cls, snapshot_dir: str, mmap: bool = True) -> "GraphSnapshot":
+        snapshot_dir = cls.resolve(snapshot_dir)
+        with open(os.path.join(snapshot_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode=mode) for name in cls.ARRAYS}
+        return cls(relation_types=meta["relation_types"], version=meta["version"], **arrays)
+
+def export_from_neo4j(driver, out_dir: Optional[str] = None) -> GraphSnapshot:
+    """Neo4j의 기업 관계 그래프 전체를 스냅샷으로 내보내기 (out_dir이 주어지면 저장)"""
+    node_query = f"""
+    MATCH (n)-[:{RELATION_TYPES}]-()
+    RETURN DISTINCT coalesce(n.symbol, n.name) AS key, n.name AS name
+    """
+    edge_query = f"""
+    MATCH (a)-[r:{RELATION_TYPES}]->(b)
+    RETURN coalesce(a.symbol, a.name) AS source, coalesce(b.symbol, b.name) AS target, type(r) AS relation
+    """
+    with driver.session() as session:
+        nodes = [(record["key"], record["name"]) for record in session.run(node_query)]
+        edges = [(record["source"], record["target"], record["relation"]) for record in session.run(edge_query)]
+
+    snapshot = GraphSnapshot.from_edges(nodes, edges)
+    if out_dir:
+        snapshot.save(out_dir)
+    return snapshot
+
+# ==========================================
+# Local Traversal Engine (GraphRAGEngine 대체 백엔드)
+# ==========================================
+class LocalGraphEngine:
+    """
+    [New] GraphSnapshot 위에서 동작하는 오프라인 그래프 엔진
+    GraphRAGEngine과 같은 인터페이스(query_supply_chain[_many], get_entity_context)를 제공하므로
+    KnowledgeAgent의 백엔드로 바로 교체할 수 있다. (DB 없이 테스트/오프라인 실행 가능)
+    """
+    def __init__(self, snapshot: GraphSnapshot, depth: int = 1, limit: int = 10):
+        self.snapshot = snapshot
+        self.depth = depth
+        self.limit = limit
+
+    @classmethod
+    def from_config(cls, config: dict) -> "LocalGraphEngine":
+        graph_cfg = config.get('graph') or {}
+        return cls(GraphSnapshot.load(graph_cfg['snapshot_dir']),
+                   depth=graph_cfg.get('depth', 1), limit=graph_cfg.get('limit', 10))
+
+    def close(self):
+        pass
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    # ------------------------------------------
+    # Vectorized Neighbor Expansion
+    # ------------------------------------------
+    def _relation_codes(self, relation_types: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        if relation_types is None:
+            return None
+        types = self.snapshot.relation_types
+        return np.asarray([types.index(r) for r in relation_types if r in types], dtype=np.uint8)
+
+    def _expand(self, frontier: np.ndarray, relation_codes: Optional[np.ndarray] = None, direction: int = 0):
+        """frontier 노드들의 이웃을 한 번에 펼침 -> (출발 노드 위치, 이웃 노드, 관계 코드)"""
+        snap = self.snapshot
+        starts = snap.indptr[frontier]
+        lengths = snap.indptr[frontier + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty.astype(np.uint8)
+        owner = np.repeat(np.arange(len(frontier)), lengths)
+        positions = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+
+        keep = np.ones(total, dtype=bool)
+        if relation_codes is not None:
+            keep &= np.isin(snap.relation[positions], relation_codes)
+        if direction:
+            keep &= snap.direction[positions] == direction
+        positions = positions[keep]
+        return owner[keep], snap.indices[positions].astype(np.int64), snap.relation[positions]
+
+    # ------------------------------------------
+    # Queries
+    # ------------------------------------------
+    def k_hop(self, symbol: str, k: int = 2, relation_types: Optional[Iterable[str]] = None,
+              direction: int = 0) -> List[Dict]:
+        """
+        symbol에서 k-hop 이내 노드를 BFS로 탐색 (direction: 0=양방향, OUT=하류, IN=상류)
+        Returns: [{"key", "name", "relation", "hops"}] (hops 오름차순, 노드별 최초 도달 hop의 관계)
+        """
+        snap = self.snapshot
+        if symbol not in snap.index:
+            return []
+        codes = self._relation_codes(relation_types)
+        source = snap.index[symbol]
+        visited = np.array([source], dtype=np.int64)
+        frontier = visited
+        rows = []
+        for hop in range(1, k + 1):
+            _, neighbors, relations = self._expand(frontier, codes, direction)
+            fresh = ~np.isin(neighbors, visited)
+            pairs = np.unique(np.stack([neighbors[fresh], relations[fresh].astype(np.int64)]), axis=1)
+            for node, rel in pairs.T:
+                rows.append({"key": str(snap.keys[node]), "name": str(snap.names[node]),
+                             "relation": snap.relation_types[rel], "hops": hop})
+            frontier = np.unique(pairs[0])
+            if len(frontier) == 0:
+                break
+            visited = np.union1d(visited, frontier)
+        return rows
+
+    def second_order_exposure(self, symbol: str, k: int = 2, decay: float = 0.5, upstream: bool = True,
+                              limit: Optional[int] = None) -> List[Dict]:
+        """
+        [New] 공급망(SUPPLIES_TO) 경로를 따라 k-hop까지 전파되는 노출도
+        score = Σ_h decay^(h-1) * (h-hop 경로 수). upstream=True면 공급사 방향, False면 고객사 방향.
+        """
+        snap = self.snapshot
+        if symbol not in snap.index or "SUPPLIES_TO" not in snap.relation_types:
+            return []
+        codes = self._relation_codes(["SUPPLIES_TO"])
+        direction = IN if upstream else OUT
+        source = snap.index[symbol]
+
+        nodes, counts = np.array([source], dtype=np.int64), np.array([1.0])
+        scores: Dict[int, float] = {}
+        first_hop: Dict[int, int] = {}
+        for hop in range(1, k + 1):
+            owner, neighbors, _ = self._expand(nodes, codes, direction)
+            if len(neighbors) == 0:
+                break
+            # 같은 노드로 가는 경로 수를 합산 (희소 벡터 x 인접 행렬)
+            nodes, inverse = np.unique(neighbors, return_inverse=True)
+            counts = np.bincount(inverse, weights=counts[owner], minlength=len(nodes))
+            weight = decay ** (hop - 1)
+            for node, count in zip(nodes.tolist(), counts.tolist()):
+                if node == source:
+                    continue
+                scores[node] = scores.get(node, 0.0) + weight * count
+                first_hop.setdefault(node, hop)
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+        return [{"key": str(snap.keys[n]), "name": str(snap.names[n]), "hops": first_hop[n], "score": score}
+                for n, score in ranked]
+
+    def query_supply_chain(self, symbol: str, depth: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+        """GraphRAGEngine.query_supply_chain과 같은 형식의 결과 반환"""
+        rows = self.k_hop(symbol, depth or self.depth, relation_types=RELATION_TYPES.split("|"))
+        name = str(self.snapshot.names[self.snapshot.index[symbol]]) if symbol in self.snapshot.index else None
+        return [{"c.name": name, "relation": row["relation"], "related_company": row["name"], "hops": row["hops"]}
+                for row in rows[:limit or self.limit]]
+
+    def query_supply_chain_many(self, symbols: Iterable[str], depth: Optional[int] = None,
+                                limit: Optional[int] = None) -> Dict[str, List[Dict]]:
+        return {symbol: self.query_supply_chain(symbol, depth, limit) for symbol in dict.fromkeys(symbols)}
+
+    def prefetch(self, symbols: Iterable[str], depth: Optional[int] = None, limit: Optional[int] = None):
+        # 로컬 조회는 충분히 빠르므로 미리 조회할 필요 없음
+        pass
+
+    def get_entity_context(self, symbol: str) -> str:
+        return format_entity_context(symbol, self.query_supply_chain(symbol))
@@ -0,0 +1,109 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ==========================================
+# Import Budget
+# ==========================================
+# 모듈 -> (허용 import 시간(ms), import만으로는 로드되면 안 되는 무거운 backend)
+# 무거운 backend(matplotlib, yfinance, neo4j, openai/langchain_openai, PIL, torch)는 첫 사용 시점에 로드한다.
+HEAVY_BACKENDS = ("matplotlib", "yfinance", "neo4j", "langchain_openai", "openai", "PIL", "torch", "torch_geometric")
+IMPORT_BUDGETS: Dict[str, Tuple[float, Sequence[str]]] = {
+    "modules.quant": (600, HEAVY_BACKENDS + ("langchain_core", "langgraph")),
+    "modules.main": (1000, HEAVY_BACKENDS + ("langgraph",)),
+    "modules.agents": (1000, HEAVY_BACKENDS + ("langgraph",)),
+    "modules.batch": (1000, HEAVY_BACKENDS + ("langgraph",)),
+    "experiments.exp_04_structural_analysis.exact_matcher": (400, HEAVY_BACKENDS),
+    "experiments.exp_04_structural_analysis.partition_matcher": (400, HEAVY_BACKENDS),
+}
+
+class ImportProfile(NamedTuple):
+    module: str
+    total_ms: float                 # 대상 모듈 import 누적 시간
+    by_package: Dict[str, float]    # 최상위 패키지별 자체(self) 시간 합계 (ms, 합계 = total)
+    loaded: frozenset               # import 후 로드된 최상위 패키지
+
+def measure_import(module: str, repeat: int = 3, python: str = sys.executable) -> ImportProfile:
+    """
+    새 인터프리터에서 `python -X importtime -c "import module"` 실행 후 파싱
+    repeat회 중 가장 빠른 결과를 사용 (디스크 캐시/잡음 영향 완화)
+    """
+    best: Optional[ImportProfile] = None
+    for _ in range(max(1, repeat)):
+        result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+        profile = _parse_importtime(module, result.stderr)
+        if best is None or profile.total_ms < best.total_ms:
+            best = profile
+    return best
+
+def _parse_importtime(module: str, output: str) -> ImportProfile:
+    by_package: Dict[str, float] = {}
+    total_us = 0.0
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name.strip()
+        package = name.split(".", 1)[0]
+        by_package[package] = by_package.get(package, 0.0) + int(self_us) / 1000
+        if name == module:
+            total_us = int(cumulative_us)
+    return ImportProfile(module, total_us / 1000, by_package, frozenset(by_package))
+
+def check_budgets(budgets: Dict[str, Tuple[float, Sequence[str]]] = IMPORT_BUDGETS,
+                  repeat: int = 3) -> List[str]:
+    """예산 초과 / 금지 backend 로드 항목 목록 (빈 목록이면 통과)"""
+    failures = []
+    for module, (budget_ms, forbidden) in budgets.items():
+        profile = measure_import(module, repeat)
+        status = "✅"
+        if profile.total_ms > budget_ms:
+            failures.append(f"{module}: {profile.total_ms:.0f}ms > budget {budget_ms:.0f}ms")
+            status = "🚨"
+        eager = sorted(profile.loaded & set(forbidden))
+        if eager:
+            failures.append(f"{module}: eagerly imports {', '.join(eager)}")
+            status = "🚨"
+        print(f"{status} {module}: {profile.total_ms:.0f}ms (budget {budget_ms:.0f}ms)")
+    return failures
+
+def format_profile(profile: ImportProfile, top: int = 15) -> str:
+    lines = [f"import {profile.module}: {profile.total_ms:.0f}ms",
+             f"{'dependency':<24} {'ms':>8} {'share':>7}"]
+    ranked = sorted(profile.by_package.items(), key=lambda item: -item[1])
+    for package, ms in ranked[:top]:
+        share = ms / profile.total_ms if profile.total_ms else 0.0
+        lines.append(f"{package:<24} {ms:>8.1f} {share:>7.1%}")
+    if len(ranked) > top:
+        rest = sum(ms for _, ms in ranked[top:])
+        lines.append(f"{f'({len(ranked) - top} others)':<24} {rest:>8.1f}")
+    return "\n".join(lines)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report import cost per dependency and enforce import budgets")
+    parser.add_argument("modules", nargs="*", help="Modules to profile (default: all budgeted modules)")
+    parser.add_argument("--check", action="store_true", help="Fail (exit 1) if any import budget is exceeded")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    if args.check:
+        failures = check_budgets(repeat=args.repeat)
+        for failure in failures:
+            print(f"🚨 {failure}")
+        return 1 if failures else 0
+
+    for module in args.modules or list(IMPORT_BUDGETS):
+        print(format_profile(measure_import(module, args.repeat), args.top))
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
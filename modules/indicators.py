@@ -0,0 +1,320 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# ==========================================
+# 기술적 지표 엔진 (NumPy Panel Kernels)
+# ==========================================
+# Panel = {"Close": (T, N), "High": (T, N), "Low": (T, N)} 형태의 float64 배열 묶음
+# T: 시점(일봉), N: 종목 수. 상장 전 구간 등 결측은 NaN.
+
+DEFAULT_INDICATORS = ["sma:20", "ema:12", "rsi:14", "bbands:20:2", "atr:14", "macd:12:26:9"]
+
+Panel = Dict[str, np.ndarray]
+
+# ------------------------------------------
+# 1. Kernels (전체 구간 일괄 계산)
+# ------------------------------------------
+def rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """누적합 기반 이동합. 윈도우 안에 NaN이 하나라도 있으면 NaN"""
+    valid = ~np.isnan(x)
+    total = np.cumsum(np.where(valid, x, 0.0), axis=0)
+    count = np.cumsum(valid, axis=0)
+    total[window:] = total[window:] - total[:-window]
+    count[window:] = count[window:] - count[:-window]
+    return np.where(count == window, total, np.nan)
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    return rolling_sum(x, window) / window
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """모표준편차(ddof=0, Bollinger 관례)"""
+    mean = sma(x, window)
+    mean_sq = rolling_sum(x * x, window) / window
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+def _ema_step(prev: np.ndarray, x: np.ndarray, alpha: float) -> np.ndarray:
+    # 첫 유효값으로 시작, 결측 시점은 이전 값 유지
+    return np.where(np.isnan(prev), x, np.where(np.isnan(x), prev, prev + alpha * (x - prev)))
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """지수이동평균 (pandas ewm(span, adjust=False)와 동일한 재귀식)"""
+    alpha = 2.0 / (span + 1)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1:], np.nan)
+    for t in range(len(x)):
+        prev = _ema_step(prev, x[t], alpha)
+        out[t] = prev
+    return out
+
+def _wilder_step(prev: np.ndarray, x: np.ndarray, seed: np.ndarray, window: int) -> np.ndarray:
+    return np.where(np.isnan(prev), seed, np.where(np.isnan(x), prev, prev + (x - prev) / window))
+
+def wilder(x: np.ndarray, window: int) -> np.ndarray:
+    """Wilder 평활 (첫 값은 window 구간 단순평균, 이후 alpha = 1/window)"""
+    seed = sma(x, window)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[1:], np.nan)
+    for t in range(len(x)):
+        prev = _wilder_step(prev, x[t], seed[t], window)
+        out[t] = prev
+    return out
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    out[0] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+def _gain_loss(delta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+    loss = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+    return gain, loss
+
+def _rsi_from_avg(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    # 하락폭이 0이면 RSI = 100
+    return np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, rsi)
+
+def _true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    # 전일 종가가 없으면 High - Low (fmax는 NaN 무시)
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+# ------------------------------------------
+# 2. Incremental State (새 봉 추가 시 O(1) 갱신)
+# ------------------------------------------
+class _Ring:
+    """종목별 최근 window개 값을 보관하는 고정 크기 링 버퍼 (window, N)"""
+    def __init__(self, history: np.ndarray, window: int):
+        self.window = window
+        self.buf = np.full((window,) + history.shape[1:], np.nan)
+        tail = history[-window:]
+        self.buf[window - len(tail):] = tail
+        self.pos = 0  # 가장 오래된 값의 위치
+
+    def push(self, x: np.ndarray):
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+
+    def mean(self) -> np.ndarray:
+        count = (~np.isnan(self.buf)).sum(axis=0)
+        return np.where(count == self.window, np.nansum(self.buf, axis=0) / self.window, np.nan)
+
+    def std(self) -> np.ndarray:
+        mean = self.mean()
+        return np.sqrt(np.nanmean((self.buf - mean) ** 2, axis=0))
+
+class _WilderState:
+    def __init__(self, history: np.ndarray, last: np.ndarray, window: int):
+        self.window = window
+        self.ring = _Ring(history, window)
+        self.prev = last.copy()
+
+    def update(self, x: np.ndarray) -> np.ndarray:
+        self.ring.push(x)
+        self.prev = _wilder_step(self.prev, x, self.ring.mean(), self.window)
+        return self.prev
+
+# ------------------------------------------
+# 3. Indicator Definitions
+# ------------------------------------------
+class Indicator:
+    """지표 공통 인터페이스: compute()는 (출력, 증분 상태)를 반환, update()는 새 봉 1개 반영"""
+    inputs: Tuple[str, ...] = ("Close",)
+
+    def compute(self, panel: Panel) -> Tuple[Dict[str, np.ndarray], dict]:
+        raise NotImplementedError
+
+    def update(self, state: dict, bar: Panel) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+class SMA(Indicator):
+    def __init__(self, window: int = 20):
+        self.window = window
+        self.name = f"SMA_{window}"
+
+    def compute(self, panel):
+        close = panel["Close"]
+        return {self.name: sma(close, self.window)}, {"ring": _Ring(close, self.window)}
+
+    def update(self, state, bar):
+        state["ring"].push(bar["Close"])
+        return {self.name: state["ring"].mean()}
+
+class EMA(Indicator):
+    def __init__(self, span: int = 12):
+        self.span = span
+        self.name = f"EMA_{span}"
+
+    def compute(self, panel):
+        values = ema(panel["Close"], self.span)
+        return {self.name: values}, {"prev": values[-1].copy()}
+
+    def update(self, state, bar):
+        state["prev"] = _ema_step(state["prev"], bar["Close"], 2.0 / (self.span + 1))
+        return {self.name: state["prev"]}
+
+class RSI(Indicator):
+    """Wilder RSI (기존 단순 이동평균 RSI 대체)"""
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.name = "RSI" if period == 14 else f"RSI_{period}"
+
+    def compute(self, panel):
+        close = panel["Close"]
+        gain, loss = _gain_loss(close - _shift(close))
+        avg_gain, avg_loss = wilder(gain, self.period), wilder(loss, self.period)
+        state = {
+            "prev_close": close[-1].copy(),
+            "gain": _WilderState(gain, avg_gain[-1], self.period),
+            "loss": _WilderState(loss, avg_loss[-1], self.period),
+        }
+        return {self.name: _rsi_from_avg(avg_gain, avg_loss)}, state
+
+    def update(self, state, bar):
+        close = bar["Close"]
+        gain, loss = _gain_loss(close - state["prev_close"])
+        state["prev_close"] = np.where(np.isnan(close), state["prev_close"], close)
+        return {self.name: _rsi_from_avg(state["gain"].update(gain), state["loss"].update(loss))}
+
+class BollingerBands(Indicator):
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        self.window = window
+        self.num_std = num_std
+
+    def _bands(self, mid, std):
+        return {"Middle_Band": mid, "Upper_Band": mid + self.num_std * std, "Lower_Band": mid - self.num_std * std}
+
+    def compute(self, panel):
+        close = panel["Close"]
+        return self._bands(sma(close, self.window), rolling_std(close, self.window)), {"ring": _Ring(close, self.window)}
+
+    def update(self, state, bar):
+        ring = state["ring"]
+        ring.push(bar["Close"])
+        return self._bands(ring.mean(), ring.std())
+
+class ATR(Indicator):
+    inputs = ("High", "Low", "Close")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.name = f"ATR_{period}"
+
+    def compute(self, panel):
+        close = panel["Close"]
+        tr = _true_range(panel["High"], panel["Low"], _shift(close))
+        values = wilder(tr, self.period)
+        return {self.name: values}, {"prev_close": close[-1].copy(), "tr": _WilderState(tr, values[-1], self.period)}
+
+    def update(self, state, bar):
+        tr = _true_range(bar["High"], bar["Low"], state["prev_close"])
+        state["prev_close"] = np.where(np.isnan(bar["Close"]), state["prev_close"], bar["Close"])
+        return {self.name: state["tr"].update(tr)}
+
+class MACD(Indicator):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = fast, slow, signal
+
+    def compute(self, panel):
+        close = panel["Close"]
+        fast, slow = ema(close, self.fast), ema(close, self.slow)
+        macd = fast - slow
+        signal = ema(macd, self.signal)
+        state = {"fast": fast[-1].copy(), "slow": slow[-1].copy(), "signal": signal[-1].copy()}
+        return {"MACD": macd, "MACD_Signal": signal, "MACD_Hist": macd - signal}, state
+
+    def update(self, state, bar):
+        close = bar["Close"]
+        state["fast"] = _ema_step(state["fast"], close, 2.0 / (self.fast + 1))
+        state["slow"] = _ema_step(state["slow"], close, 2.0 / (self.slow + 1))
+        macd = state["fast"] - state["slow"]
+        state["signal"] = _ema_step(state["signal"], macd, 2.0 / (self.signal + 1))
+        return {"MACD": macd, "MACD_Signal": state["signal"], "MACD_Hist": macd - state["signal"]}
+
+INDICATOR_REGISTRY = {
+    "sma": (SMA, (int,)),
+    "ema": (EMA, (int,)),
+    "rsi": (RSI, (int,)),
+    "bbands": (BollingerBands, (int, float)),
+    "atr": (ATR, (int,)),
+    "macd": (MACD, (int, int, int)),
+}
+
+def parse_spec(spec: str) -> Indicator:
+    """'rsi:14', 'bbands:20:2', 'macd:12:26:9' 형태의 선언을 지표 객체로 변환"""
+    kind, *args = spec.strip().lower().split(":")
+    if kind not in INDICATOR_REGISTRY:
+        raise ValueError(f"Unknown indicator '{kind}' (available: {list(INDICATOR_REGISTRY)})")
+    cls, types = INDICATOR_REGISTRY[kind]
+    return cls(*[cast(arg) for cast, arg in zip(types, args)])
+
+# ------------------------------------------
+# 4. Engine
+# ------------------------------------------
+class IndicatorEngine:
+    """
+    [New] 선언된 지표 집합을 다종목 Panel 전체에 대해 한 번에 계산하는 엔진.
+    stream()으로 만든 IndicatorStream은 새 봉이 추가될 때 과거 구간 재계산 없이 갱신한다.
+    """
+    def __init__(self, specs: Optional[Sequence[str]] = None):
+        self.indicators: List[Indicator] = [parse_spec(s) for s in (specs or DEFAULT_INDICATORS)]
+
+    def _available(self, panel: Panel) -> List[Indicator]:
+        # 입력 컬럼이 없는 지표(예: High/Low 없는 ATR)는 건너뜀
+        return [ind for ind in self.indicators if all(col in panel for col in ind.inputs)]
+
+    def compute(self, panel: Panel) -> Dict[str, np.ndarray]:
+        outputs = {}
+        for indicator in self._available(panel):
+            values, _ = indicator.compute(panel)
+            outputs.update(values)
+        return outputs
+
+    def stream(self, panel: Panel) -> "IndicatorStream":
+        """과거 구간을 일괄 계산하고, 이후 봉을 증분 갱신할 수 있는 스트림 반환"""
+        return IndicatorStream(self._available(panel), panel)
+
+class IndicatorStream:
+    def __init__(self, indicators: List[Indicator], panel: Panel):
+        self.indicators = indicators
+        self.states = []
+        self.history: Dict[str, np.ndarray] = {}
+        for indicator in indicators:
+            values, state = indicator.compute(panel)
+            self.history.update(values)
+            self.states.append(state)
+
+    def update(self, bar: Panel) -> Dict[str, np.ndarray]:
+        """bar = {"Close": (N,), "High": (N,), "Low": (N,)} 새 봉 1개 -> 지표별 최신값 (N,)"""
+        bar = {col: np.asarray(values, dtype="float64") for col, values in bar.items()}
+        latest = {}
+        for indicator, state in zip(self.indicators, self.states):
+            latest.update(indicator.update(state, bar))
+        return latest
+
+# ------------------------------------------
+# 5. DataFrame <-> Panel
+# ------------------------------------------
+PANEL_FIELDS = ("Close", "High", "Low")
+
+def frame_to_panel(df: pd.DataFrame) -> Panel:
+    """단일 종목 OHLCV DataFrame -> (T, 1) Panel"""
+    return {col: df[col].to_numpy(dtype="float64").reshape(-1, 1) for col in PANEL_FIELDS if col in df.columns}
+
+def frames_to_panel(frames: Dict[str, pd.DataFrame], fields: Sequence[str] = PANEL_FIELDS):
+    """
+    종목별 DataFrame을 날짜 합집합 기준으로 정렬한 Panel로 변환
+    Returns: (dates, symbols, panel)
+    """
+    symbols = list(frames)
+    panel, dates = {}, None
+    for field in fields:
+        wide = pd.concat({sym: frames[sym][field] for sym in symbols if field in frames[sym].columns}, axis=1)
+        if wide.shape[1] != len(symbols):
+            continue
+        wide = wide.sort_index()
+        dates = wide.index if dates is None else dates
+        panel[field] = wide.reindex(dates)[symbols].to_numpy(dtype="float64")
+    return dates, symbols, panel
@@ -0,0 +1,40 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from .tracing import span
+
+# ==========================================
+# Backend별 동시 호출 제한 (프로세스 공용)
+# ==========================================
+# 이름 -> Semaphore. 등록되지 않은 backend는 제한 없이 통과한다.
+_LIMITS: Dict[str, threading.BoundedSemaphore] = {}
+_LOCK = threading.Lock()
+
+def configure_limits(limits: Optional[Dict[str, int]]):
+    """
+    backend별 최대 동시 호출 수 설정 (예: {"price": 4, "llm": 4, "vision": 2, "neo4j": 8})
+    0 또는 None 값은 제한 없음으로 취급.
+    """
+    with _LOCK:
+        _LIMITS.clear()
+        for name, value in (limits or {}).items():
+            if value:
+                _LIMITS[name] = threading.BoundedSemaphore(int(value))
+
+@contextmanager
+def backend_slot(name: str):
+    """
+    외부 호출 구간을 감싸 backend 동시성 제한을 적용하는 컨텍스트 매니저
+    구간 전체를 tracing span(kind="call")으로 기록하고 슬롯 대기 시간은 wait_s 카운터로 남긴다.
+    """
+    semaphore = _LIMITS.get(name)
+    with span(name, kind="call") as call:
+        if semaphore is None:
+            yield call
+            return
+        start = time.perf_counter()
+        with semaphore:
+            call.add(wait_s=time.perf_counter() - start)
+            yield call
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .tracing import record_usage
+
+# httpx / openai / langchain_openai는 import 비용이 커서 (합계 ~1s) 첫 호출 시점에 로드
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+    from langchain_openai import ChatOpenAI
+
+# ==========================================
+# Token Bucket (모델별 요청 속도 제한)
+# ==========================================
+class TokenBucket:
+    """초당 rate개씩 채워지는 버킷. acquire()는 토큰이 생길 때까지 비동기로 대기"""
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+        self.rate = rate_per_second
+        self.capacity = capacity or max(1.0, rate_per_second)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+# ==========================================
+# Retry Policy
+# ==========================================
+RETRYABLE_STATUS = {408, 409, 429}
+
+def is_retryable(error: BaseException) -> bool:
+    """429 / 5xx / 타임아웃 / 연결 오류만 재시도"""
+    import openai
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """서버가 Retry-After 헤더를 준 경우 그 값을 우선 사용"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+# ==========================================
+# LLM Gateway
+# ==========================================
+class LLMGateway:
+    """
+    [New] 모든 에이전트가 공유하는 비동기 LLM 호출 계층
+    - 하나의 httpx 커넥션 풀을 모든 모델 클라이언트가 재사용
+    - 모델별 Token Bucket 속도 제한 (config: llm_gateway.rate_limits, 분당 요청 수)
+    - 429/5xx에 대한 지수 백오프 + Full Jitter 재시도 (Retry-After 우선)
+    - 호출별 타임아웃과 취소 지원
+
+    동기 코드(LangGraph 노드)에서는 invoke()를 사용하면 전용 이벤트 루프 스레드에서 실행된다.
+    """
+    def __init__(self, base_url: Optional[str] = None, timeout_seconds: float = 60.0, max_retries: int = 4,
+                 backoff_base_seconds: float = 0.5, backoff_max_seconds: float = 20.0,
+                 max_connections: int = 32, rate_limits: Optional[Dict[str, float]] = None,
+                 api_key: Optional[str] = None):
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.api_key = api_key  # None이면 OPENAI_API_KEY 환경 변수 사용
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.rate_limits = rate_limits or {}
+
+        self.max_connections = max_connections
+        self._http = None  # 공유 httpx.AsyncClient (첫 chat_model 호출 시 생성)
+        self._models: Dict[Tuple, "ChatOpenAI"] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "LLMGateway":
+        gw = config.get('llm_gateway') or {}
+        return cls(
+            base_url=gw.get('base_url'),
+            timeout_seconds=gw.get('timeout_seconds', 60.0),
+            max_retries=gw.get('max_retries', 4),
+            backoff_base_seconds=gw.get('backoff_base_seconds', 0.5),
+            backoff_max_seconds=gw.get('backoff_max_seconds', 20.0),
+            max_connections=gw.get('max_connections', 32),
+            rate_limits=gw.get('rate_limits'),
+        )
+
+    # ------------------------------------------
+    # Clients / Buckets
+    # ------------------------------------------
+    def chat_model(self, model: str, temperature: float = 0.0, max_tokens: Optional[int] = None) -> "ChatOpenAI":
+        """공유 커넥션 풀을 쓰는 ChatOpenAI (재시도는 게이트웨이가 담당하므로 max_retries=0)"""
+        key = (model, temperature, max_tokens)
+        with self._lock:
+            if key not in self._models:
+                import httpx
+                from langchain_openai import ChatOpenAI
+                if self._http is None:
+                    self._http = httpx.AsyncClient(
+                        limits=httpx.Limits(max_connections=self.max_connections,
+                                            max_keepalive_connections=self.max_connections),
+                        timeout=self.timeout_seconds,
+                    )
+                kwargs = {"base_url": self.base_url} if self.base_url else {}
+                if self.api_key:
+                    kwargs["api_key"] = self.api_key
+                self._models[key] = ChatOpenAI(
+                    model=model, temperature=temperature, max_tokens=max_tokens,
+                    max_retries=0, timeout=self.timeout_seconds, http_async_client=self._http, **kwargs,
+                )
+            return self._models[key]
+
+    def _bucket(self, model: str) -> Optional[TokenBucket]:
+        per_minute = self.rate_limits.get(model)
+        if not per_minute:
+            return None
+        if model not in self._buckets:
+            self._buckets[model] = TokenBucket(per_minute / 60.0)
+        return self._buckets[model]
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max_seconds)
+        # Full Jitter: [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+    # ------------------------------------------
+    # Invoke
+    # ------------------------------------------
+    async def ainvoke(self, messages: List["BaseMessage"], model: str, temperature: float = 0.0,
+                      max_tokens: Optional[int] = None, timeout: Optional[float] = None):
+        """비동기 호출 (속도 제한 -> 타임아웃 -> 재시도). 취소되면 진행 중인 HTTP 요청도 중단된다."""
+        llm = self.chat_model(model, temperature, max_tokens)
+        bucket = self._bucket(model)
+        timeout = timeout or self.timeout_seconds
+
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                return await asyncio.wait_for(llm.ainvoke(messages), timeout)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+
+    def invoke(self, messages: List["BaseMessage"], model: str, temperature: float = 0.0,
+               max_tokens: Optional[int] = None, timeout: Optional[float] = None):
+        """동기 코드용 브리지: 게이트웨이 이벤트 루프에서 ainvoke 실행 후 결과 대기"""
+        future = asyncio.run_coroutine_threadsafe(
+            self.ainvoke(messages, model, temperature, max_tokens, timeout), self._ensure_loop()
+        )
+        try:
+            response = future.result()
+        except BaseException:
+            future.cancel()  # KeyboardInterrupt 등으로 중단되면 요청도 취소
+            raise
+        record_usage(response)  # 호출자 span(backend_slot)에 prompt/completion 토큰 누적
+        return response
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+
+# ==========================================
+# 프로세스 공용 인스턴스
+# ==========================================
+_GATEWAYS: Dict[str, LLMGateway] = {}
+_GATEWAY_LOCK = threading.Lock()
+
+def get_gateway(config: Optional[dict] = None) -> LLMGateway:
+    """
+    같은 llm_gateway 설정을 쓰는 호출자끼리 하나의 게이트웨이(커넥션 풀/속도 제한)를 공유
+    설정별로 인스턴스를 구분하므로, 설정 없이 먼저 호출되어도 이후의 config 설정이 무시되지 않는다.
+    """
+    key = json.dumps((config or {}).get('llm_gateway') or {}, sort_keys=True, default=str)
+    with _GATEWAY_LOCK:
+        if key not in _GATEWAYS:
+            _GATEWAYS[key] = LLMGateway.from_config(config or {})
+        return _GATEWAYS[key]
@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Optional
+
+from langchain_core.messages import HumanMessage
+
+from modules.llm_gateway import LLMGateway
+
+# ==========================================
+# Local Stub Server (OpenAI Chat Completions 호환)
+# ==========================================
+class StubLLMServer:
+    """
+    [New] 게이트웨이 처리량 벤치마크용 로컬 stub 서버
+    POST /v1/chat/completions 에 대해 지정한 지연 후 고정 응답을 돌려주며,
+    error_rate 비율로 429/500을 섞어 재시도 동작을 재현한다. (HTTP/1.1 keep-alive 지원)
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 8089, latency: float = 0.5,
+                 jitter: float = 0.1, error_rate: float = 0.0):
+        self.host, self.port = host, port
+        self.latency, self.jitter, self.error_rate = latency, jitter, error_rate
+        self.requests = 0
+        self.errors = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self._respond(json.loads(body or b"{}"))
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, request: dict):
+        self.requests += 1
+        await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        if random.random() < self.error_rate:
+            self.errors += 1
+            status = random.choice(["429 Too Many Requests", "500 Internal Server Error"])
+            return status, {"error": {"message": "stub error", "type": "stub"}}
+        return "200 OK", {
+            "id": f"chatcmpl-stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": '{"trend": "Sideways", "risk_score": 5}'}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110},
+        }
+
+# ==========================================
+# Throughput Benchmark
+# ==========================================
+async def run_benchmark(requests: int, concurrency: int, latency: float, error_rate: float,
+                        rate_per_minute: Optional[float], port: int) -> dict:
+    server = StubLLMServer(port=port, latency=latency, error_rate=error_rate)
+    await server.start()
+    gateway = LLMGateway(base_url=server.base_url, max_retries=5, backoff_base_seconds=0.05,
+                         max_connections=concurrency,
+                         rate_limits={"stub-model": rate_per_minute} if rate_per_minute else None,
+                         api_key="stub")  # stub 서버는 키를 검사하지 않음 (OPENAI_API_KEY 없이 실행 가능)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures, first_error = [], 0, None
+
+    async def one(i: int):
+        nonlocal failures, first_error
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await gateway.ainvoke([HumanMessage(content=f"ping {i}")], model="stub-model")
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                failures += 1
+                if first_error is None:
+                    first_error = f"{type(e).__name__}: {e}"
+                    print(f"⚠️ [Stub] Request {i} failed: {first_error}", file=sys.stderr)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    if gateway._http is not None:
+        await gateway._http.aclose()
+    await server.stop()
+
+    return {
+        "requests": requests,
+        "succeeded": len(latencies),
+        "failed": failures,
+        "first_error": first_error,
+        "server_calls": server.requests,
+        "injected_errors": server.errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_s": round(statistics.median(latencies), 3) if latencies else None,
+        "p95_s": round(statistics.quantiles(latencies, n=20)[-1], 3) if len(latencies) > 1 else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LLMGateway against a local stub provider")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated provider latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 429/500 responses")
+    parser.add_argument("--rate", type=float, help="Token bucket limit (requests per minute)")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_benchmark(args.requests, args.concurrency, args.latency,
+                                       args.error_rate, args.rate, args.port))
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,104 @@
-from langgraph.graph import StateGraph, END
-from modules.agents import ChartAgent, KnowledgeAgent, SupervisorAgent, AgentState
+import os
+import time
+import yaml
+from typing import Optional
 
-def build_graph():
-    # 컴포넌트 초기화
-    chart_agent = ChartAgent()
-    knowledge_agent = KnowledgeAgent()
-    supervisor = SupervisorAgent()
+from modules.agents import ChartAgent, QuantAgent, KnowledgeAgent, SupervisorAgent, AgentState, SharedResources
+from modules.checkpoint import CheckpointStore, has_error
+from modules.price_cache import last_complete_session
+from modules.tracing import configure_tracing, format_summary, span
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+
+# config.yaml의 workflow.analysts 이름 -> 분석가 에이전트 클래스
+ANALYST_REGISTRY = {
+    "chart_reader": ChartAgent,
+    "quant_analyst": QuantAgent,
+    "knowledge_miner": KnowledgeAgent,
+}
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def timed_node(name, fn):
+    """노드 실행 시간(초)을 state['node_timings'][name]에 기록하고 tracing span(kind="node")으로 남기는 래퍼"""
+    def run(state):
+        start = time.perf_counter()
+        with span(name, kind="node", symbol=state.get('stock_symbol')):
+            update = dict(fn(state))
+        update["node_timings"] = {name: time.perf_counter() - start}
+        return update
+    return run
+
+def checkpointed_node(name, fn, agent, config: dict, store: CheckpointStore, run_date: str):
+    """
+    (종목, 거래일, 노드, 입력 해시)로 저장된 출력이 있으면 재사용하고, 없으면 실행 후 저장하는 래퍼
+    입력 해시는 agent.CONFIG_INPUTS(config 경로)와 agent.STATE_INPUTS(상위 노드 출력)로 계산한다.
+    """
+    config_keys = getattr(agent, "CONFIG_INPUTS", ())
+    state_keys = getattr(agent, "STATE_INPUTS", ())
+    def run(state):
+        symbol = state['stock_symbol']
+        key = CheckpointStore.input_hash(name, config, config_keys, state, state_keys)
+        saved = store.get(symbol, run_date, name, key)
+        if saved is not None:
+            print(f"♻️ [{name}] Reusing checkpoint for {symbol} ({run_date})")
+            return saved
+        update = dict(fn(state))
+        if not has_error(update):
+            store.put(symbol, run_date, name, key, update)
+        return update
+    return run
+
+def build_graph(config: dict = None, resources: SharedResources = None,
+                checkpoints: Optional[CheckpointStore] = None, run_date: Optional[str] = None):
+    from langgraph.graph import StateGraph, START, END  # 그래프를 만들 때만 로드 (load_config만 쓰는 경우 제외)
+
+    config = config or load_config()
+    # 모든 에이전트가 같은 데이터 매니저 / LLM 클라이언트 / Neo4j 드라이버를 공유
+    resources = resources or SharedResources(config)
+    analysts = config.get('workflow', {}).get('analysts', list(ANALYST_REGISTRY))
+    # 체크포인트 거래일은 그래프 생성 시 고정 (자정을 넘기는 긴 배치도 같은 키로 재개)
+    run_date = run_date or last_complete_session().isoformat()
+
+    def node(name, agent, method):
+        fn = checkpointed_node(name, method, agent, config, checkpoints, run_date) if checkpoints is not None else method
+        return timed_node(name, fn)
+
+    if not analysts:
+        raise ValueError(f"workflow.analysts must list at least one analyst node (available: {list(ANALYST_REGISTRY)})")
+    unknown = [name for name in analysts if name not in ANALYST_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown analyst nodes in config: {unknown} (available: {list(ANALYST_REGISTRY)})")
 
     # 그래프 정의
     workflow = StateGraph(AgentState)
 
-    # 노드 추가
-    workflow.add_node("chart_reader", chart_agent.analyze)
-    workflow.add_node("knowledge_miner", knowledge_agent.analyze)
-    workflow.add_node("decision_maker", supervisor.decide)
+    # 분석가 노드: 서로 다른 state 키만 쓰므로 같은 superstep에서 병렬 실행 (Fan-out)
+    for name in analysts:
+        agent = ANALYST_REGISTRY[name](config, resources)
+        workflow.add_node(name, node(name, agent, agent.analyze))
+        workflow.add_edge(START, name)
+
+    supervisor = SupervisorAgent(config, resources)
+    workflow.add_node("decision_maker", node("decision_maker", supervisor, supervisor.summarize))
 
-    # 엣지 연결 (병렬 처리 가능)
-    workflow.set_entry_point("chart_reader")
-    workflow.add_edge("chart_reader", "knowledge_miner") # 순차 실행 예시
-    workflow.add_edge("knowledge_miner", "decision_maker")
+    # 모든 분석가가 끝나면 Supervisor로 합류 (Fan-in)
+    workflow.add_edge(analysts, "decision_maker")
     workflow.add_edge("decision_maker", END)
 
     return workflow.compile()
 
 if __name__ == "__main__":
-    app = build_graph()
-    initial_state = {"stock_symbol": "NVDA", "messages": []}
-    result = app.invoke(initial_state)
+    config = load_config()
+    tracer = configure_tracing(config)
+    app = build_graph(config, checkpoints=CheckpointStore.from_config(config))
+    initial_state = {"stock_symbol": "NVDA"}
+    with span("symbol", kind="run", symbol="NVDA"):
+        result = app.invoke(initial_state)
     print(f"Final Decision: {result['final_decision']}")
+    for node, seconds in result.get('node_timings', {}).items():
+        print(f"⏱️ {node}: {seconds:.2f}s")
+    print(format_summary(tracer.summary()))
+    tracer.close()
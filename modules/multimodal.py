@@ -1,9 +1,87 @@
 import base64
+import io
 import json
+import math
 import os
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Tuple, Union, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from .limits import backend_slot
+from .llm_gateway import LLMGateway, get_gateway
+from .cache import DiskCache, InflightDeduper
+
+def guess_mime_type(image_bytes: bytes) -> str:
+    """매직 바이트로 이미지 MIME 타입 판별 (data URL 라벨용)"""
+    if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if image_bytes[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "application/octet-stream"
+
+# ==========================================
+# Image Token Budgeting (OpenAI Vision 과금 규칙 기준)
+# ==========================================
+LOW_DETAIL_TOKENS = 85
+TILE_TOKENS = 170
+TILE_SIZE = 512
+
+def estimate_image_tokens(width: int, height: int, detail: str = "high") -> int:
+    """
+    이미지 1장의 입력 토큰 추정치
+    - low: 고정 85 토큰
+    - high: 2048 박스에 맞춘 뒤 짧은 변을 768로 축소, 512px 타일당 170 + 기본 85
+    """
+    if detail == "low":
+        return LOW_DETAIL_TOKENS
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    tiles = math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+    return TILE_TOKENS * tiles + LOW_DETAIL_TOKENS
+
+def _fit_size(width: int, height: int, max_side: int) -> Tuple[int, int]:
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def fit_images_to_budget(images: List[bytes], budget_tokens: int, fmt: str = "jpeg",
+                         quality: int = 80) -> Tuple[List[bytes], str, int]:
+    """
+    [New] 여러 장의 차트 이미지를 요청당 토큰 예산 안에 들어오도록 축소/압축하고 detail 모드 결정
+
+    가장 큰 해상도(긴 변 기준)부터 줄여가며 high detail로 예산에 맞는 크기를 찾고,
+    512px까지 줄여도 초과하면 low detail(장당 85 토큰)로 전환한다.
+
+    Returns:
+        (재인코딩된 이미지 바이트 리스트, detail 모드, 추정 토큰 수)
+    """
+    from PIL import Image  # 토큰 예산을 쓸 때만 필요
+    opened = [Image.open(io.BytesIO(data)) for data in images]
+    sizes = [img.size for img in opened]
+
+    detail, max_side = "low", TILE_SIZE
+    for candidate in (2048, 1536, 1280, 1024, 896, 768, 640, TILE_SIZE):
+        total = sum(estimate_image_tokens(*_fit_size(w, h, candidate)) for w, h in sizes)
+        if total <= budget_tokens:
+            detail, max_side = "high", candidate
+            break
+
+    encoded = []
+    pil_format = "JPEG" if fmt.lower() in ("jpeg", "jpg") else fmt.upper()
+    for img, (w, h) in zip(opened, sizes):
+        img = img.convert("RGB") if pil_format == "JPEG" else img
+        target = _fit_size(w, h, max_side)
+        if target != (w, h):
+            img = img.resize(target, Image.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format=pil_format, quality=quality, optimize=True)
+        encoded.append(buffer.getvalue())
+
+    tokens = sum(estimate_image_tokens(*_fit_size(w, h, max_side), detail=detail) for w, h in sizes)
+    return encoded, detail, tokens
 
 class VisionAnalyst:
     """
@@ -11,29 +89,50 @@ class VisionAnalyst:
     멀티모달 모델(GPT-4o 등)을 활용하여 단일/다중 금융 차트를 분석하고
     구조화된 데이터(JSON)를 반환하는 분석 엔진.
     """
-    def __init__(self, model_name="gpt-4o", temperature=0.0):
+    def __init__(self, model_name="gpt-4o", temperature=0.0, max_tokens=2048, cache: Optional[DiskCache] = None,
+                 image_token_budget: Optional[int] = None, upload_format: str = "jpeg", upload_quality: int = 80,
+                 gateway: Optional[LLMGateway] = None):
         # Temperature를 0으로 설정하여 분석의 일관성 유지
-        self.llm = ChatOpenAI(model=model_name, max_tokens=2048, temperature=temperature)
+        self.model_name = model_name
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        # 공유 LLM 게이트웨이 (커넥션 풀, 속도 제한, 재시도, 타임아웃)
+        self.gateway = gateway or get_gateway()
 
-    def _encode_image(self, image_path: str) -> str:
-        """로컬 이미지를 Base64 문자열로 인코딩 (예외 처리 추가)"""
+        # [New] 응답 캐시 (temperature=0일 때만 사용) + 동일 요청 동시 호출 병합
+        self.cache = cache if temperature == 0 else None
+        self._inflight = InflightDeduper()
+
+        # [New] 요청당 이미지 토큰 예산 (None이면 원본 그대로 전송)
+        self.image_token_budget = image_token_budget
+        self.upload_format = upload_format
+        self.upload_quality = upload_quality
+
+    def _read_image(self, image_path: str) -> bytes:
+        """로컬 이미지 파일 읽기 (예외 처리 추가)"""
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"Image file not found: {image_path}")
             
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+            return image_file.read()
 
-    def analyze_chart(self, image_paths: Union[str, List[str]], context: str = "", strategy: str = "General") -> Dict:
+    def _encode_image(self, image_path: str) -> str:
+        """로컬 이미지를 Base64 문자열로 인코딩"""
+        return base64.b64encode(self._read_image(image_path)).decode('utf-8')
+
+    def analyze_chart(self, image_paths: Union[str, bytes, List[Union[str, bytes]]], context: str = "", strategy: str = "General",
+                      labels: Optional[List[str]] = None) -> Dict:
         """
         [Upgrade] 단일 또는 다중 차트 이미지를 받아 JSON 형태의 정형화된 리포트 반환
         
         Args:
-            image_paths: 이미지 경로 문자열 또는 경로 리스트 (예: [일봉, 주봉])
+            image_paths: 이미지 경로/바이트 또는 그 리스트 (예: [일봉, 주봉]). 바이트는 디스크를 거치지 않음
             context: 추가 텍스트 정보 (예: "현재 금리 인상기임")
             strategy: 분석 관점 ("Momentum", "Reversal", "General")
+            labels: 이미지별 설명 (예: ["Daily", "Weekly", "Monthly"])
         """
         # 1. 입력 정규화 (항상 리스트로 처리)
-        if isinstance(image_paths, str):
+        if isinstance(image_paths, (str, bytes)):
             image_paths = [image_paths]
 
         # 2. 이미지 메시지 블록 생성
@@ -60,23 +159,63 @@ class VisionAnalyst:
         if context:
             content_blocks.append({"type": "text", "text": f"Additional Context: {context}"})
 
-        # 다중 이미지 로드 및 추가
-        for idx, path in enumerate(image_paths):
-            base64_img = self._encode_image(path)
-            content_blocks.append({
+        # 다중 이미지 로드
+        images = [item if isinstance(item, bytes) else self._read_image(item) for item in image_paths]
+        labels = labels or ["Chart View"] * len(images)
+
+        # 3. 캐시 조회 -> LLM 호출 (동일 요청이 동시에 오면 1회만 호출)
+        # 키는 원본 이미지 기준 (축소/압축은 캐시 미스일 때만 수행)
+        key = DiskCache.make_key(self.model_name, self.temperature, self.max_tokens,
+                                 self.image_token_budget, self.upload_format, self.upload_quality,
+                                 system_prompt, context, *labels, *images)
+        build = lambda: content_blocks + self._image_blocks(images, labels)
+        return self._inflight.run(key, lambda: self._cached_invoke(key, build))
+
+    def _image_blocks(self, images: List[bytes], labels: List[str]) -> List[Dict]:
+        """이미지 메시지 블록 생성 (토큰 예산이 있으면 축소/압축 후 detail 지정)"""
+        detail = None
+        if self.image_token_budget:
+            images, detail, _ = fit_images_to_budget(images, self.image_token_budget,
+                                                     fmt=self.upload_format, quality=self.upload_quality)
+        blocks = []
+        for idx, (image_bytes, label) in enumerate(zip(images, labels)):
+            base64_img = base64.b64encode(image_bytes).decode('utf-8')
+            mime_type = guess_mime_type(image_bytes)
+            image_url = {"url": f"data:{mime_type};base64,{base64_img}"}
+            if detail:
+                image_url["detail"] = detail
+            blocks.append({
                 "type": "text", 
-                "text": f"[Image {idx+1}] Chart View"
+                "text": f"[Image {idx+1}] {label}"
             })
-            content_blocks.append({
+            blocks.append({
                 "type": "image_url",
-                "image_url": {"url": f"data:image/jpeg;base64,{base64_img}"}
+                "image_url": image_url
             })
+        return blocks
+
+    def _cached_invoke(self, key: str, build_blocks) -> Dict:
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = self._invoke(build_blocks())
+
+        # 에러 응답은 캐시하지 않음
+        if self.cache is not None and "error" not in result:
+            self.cache.set(key, result)
+        return result
 
-        # 3. LLM 호출
+    def _invoke(self, content_blocks: List[Dict]) -> Dict:
         message = HumanMessage(content=content_blocks)
         
         try:
-            response = self.llm.invoke([message])
+            with backend_slot("vision") as call:
+                images = [b["image_url"]["url"] for b in content_blocks if b.get("type") == "image_url"]
+                call.add(images=len(images), image_bytes=sum(len(url.split(",", 1)[-1]) * 3 // 4 for url in images))
+                response = self.gateway.invoke([message], model=self.model_name,
+                                               temperature=self.temperature, max_tokens=self.max_tokens)
             # JSON 파싱 시도 (LLM이 가끔 마크다운을 섞을 때를 대비)
             raw_content = response.content.strip()
             if raw_content.startswith("```json"):
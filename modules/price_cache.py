@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, time as dtime
+from typing import Callable, Dict, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from .tracing import current_span
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# 미국 정규장 기준 (장 마감 후 데이터 확정까지 약간의 여유를 둔다)
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_SETTLE_TIME = dtime(16, 30)
+
+# 꼬리 구간과 캐시가 겹치는 봉의 종가 허용 오차 (이보다 크면 분할/배당으로 수정주가가 재계산된 것으로 보고 전체 재다운로드)
+RESTATE_RTOL = 1e-4
+
+_PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "6mo": 183,
+                "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+
+
+def period_to_start(period: str, now: Optional[datetime] = None) -> Optional[date]:
+    """yfinance period 문자열("1y", "6mo", "ytd", "max" ...)을 시작일로 변환 (max는 None)"""
+    now = now or datetime.now(MARKET_TZ)
+    if period == "max":
+        return None
+    if period == "ytd":
+        return date(now.year, 1, 1)
+    if period not in _PERIOD_DAYS:
+        raise ValueError(f"Unsupported period: {period}")
+    return (now - timedelta(days=_PERIOD_DAYS[period])).date()
+
+
+def last_complete_session(now: Optional[datetime] = None) -> date:
+    """
+    가장 최근에 '확정된' 거래일 (주말 제외, 장 마감 전이면 전 거래일)
+    공휴일은 별도 캘린더 없이 TTL 규칙으로 흡수한다.
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    day = now.date()
+    if now.time() < MARKET_SETTLE_TIME:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:  # 토/일
+        day -= timedelta(days=1)
+    return day
+
+
+_KEEP = object()  # _store에서 기존 coverage_start 유지
+
+
+class PriceCache:
+    """
+    [New] 종목별 OHLCV를 로컬 디스크(memory-mapped NumPy)에 저장하고
+    프로세스 내 LRU 캐시로 재사용하는 가격 저장소.
+
+    - 캐시가 최신이면 네트워크 접근 없이 반환 (오프라인 재현 가능)
+    - 오래된 경우 마지막 봉 이후의 꼬리 구간만 추가로 받아 이어 붙임
+      (겹치는 봉의 수정주가가 달라졌으면 전체 구간을 다시 받음)
+    """
+    def __init__(self, root: str, ttl_seconds: float = 3600, lru_size: int = 256, offline: bool = False):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self.lru_size = lru_size
+        self.offline = offline
+        os.makedirs(self.root, exist_ok=True)
+
+        self._lru: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._meta: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.Lock] = {}
+
+    # ------------------------------------------
+    # Public API
+    # ------------------------------------------
+    def get(self, symbol: str, period: str, fetch: Callable[..., pd.DataFrame]) -> pd.DataFrame:
+        """
+        period 구간의 가격 데이터를 반환. 필요할 때만 fetch(symbol, period=..., start=...)를 호출한다.
+        """
+        now = datetime.now(MARKET_TZ)
+        start = period_to_start(period, now)
+
+        with self._symbol_lock(symbol):
+            df, meta = self._load(symbol)
+
+            if df is None or not self._covers(meta, start):
+                if self.offline:
+                    if df is None:
+                        raise FileNotFoundError(f"No cached price history for {symbol} (offline mode)")
+                else:
+                    # 캐시 없음 / 요청 구간이 더 긺 -> 전체 구간 재다운로드 후 병합
+                    fresh = fetch(symbol, period=period)
+                    df, meta = self._store(symbol, df, fresh, coverage_start=start)
+                    current_span().add(price_fetch=1)
+            elif not self.offline and not self._is_fresh(df, meta, now):
+                # 꼬리 구간만 증분 다운로드 (마지막 봉은 장중 값일 수 있으므로 다시 받고, 그 직전 확정 봉과 겹치게 받음)
+                tail = fetch(symbol, start=df.index[max(len(df) - 2, 0)].date())
+                if self._restated(df, tail):
+                    # 분할/배당으로 과거 수정주가가 바뀜 -> 이어 붙이면 가짜 갭이 생기므로 전체 구간 재다운로드
+                    fresh = fetch(symbol, period=period)
+                    df, meta = self._store(symbol, None, fresh, coverage_start=start)
+                    current_span().add(price_refetch=1)
+                else:
+                    df, meta = self._store(symbol, df, tail)
+                    current_span().add(price_tail_fetch=1)
+            else:
+                current_span().add(price_cache_hit=1)
+
+        # LRU에 보관된 DataFrame을 그대로 넘기지 않음 (호출자가 수정해도 캐시는 유지)
+        if start is None:
+            return df.copy()
+        return df.loc[df.index >= pd.Timestamp(start, tz=df.index.tz)]
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """메모리 캐시 무효화 (디스크 데이터는 유지)"""
+        with self._lock:
+            if symbol is None:
+                self._lru.clear()
+                self._meta.clear()
+            else:
+                self._lru.pop(symbol, None)
+                self._meta.pop(symbol, None)
+
+    # ------------------------------------------
+    # Freshness rules
+    # ------------------------------------------
+    def _covers(self, meta: Optional[dict], start: Optional[date]) -> bool:
+        if meta is None:
+            return False
+        covered = meta.get("coverage_start")
+        if covered is None:  # period="max"로 받은 데이터
+            return True
+        return start is not None and date.fromisoformat(covered) <= start
+
+    def _is_fresh(self, df: pd.DataFrame, meta: dict, now: datetime) -> bool:
+        if df.index[-1].date() >= last_complete_session(now):
+            return True
+        # 휴장일 등으로 새 봉이 없을 수 있으므로 최근에 확인했다면 재조회하지 않음
+        return time.time() - meta.get("checked_at", 0) < self.ttl_seconds
+
+    @staticmethod
+    def _restated(old: pd.DataFrame, tail: Optional[pd.DataFrame]) -> bool:
+        """겹치는 확정 봉(캐시의 마지막 봉 제외)의 종가가 RESTATE_RTOL 이상 다르면 True"""
+        if tail is None or tail.empty or len(old) < 2:
+            return False
+        index = tail.index
+        if index.tz is not None and old.index.tz is not None:
+            index = index.tz_convert(old.index.tz)
+        cached = old["Close"].iloc[:-1]
+        fetched = pd.Series(tail["Close"].to_numpy(dtype="float64"), index=index).reindex(cached.index).dropna()
+        if fetched.empty:
+            return False
+        return not np.allclose(fetched.to_numpy(), cached.loc[fetched.index].to_numpy(), rtol=RESTATE_RTOL, atol=0)
+
+    # ------------------------------------------
+    # Storage (LRU + Disk)
+    # ------------------------------------------
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _paths(self, symbol: str) -> Dict[str, str]:
+        base = os.path.join(self.root, symbol.upper())
+        return {"index": base + ".index.npy", "ohlcv": base + ".ohlcv.npy", "meta": base + ".meta.json"}
+
+    def _load(self, symbol: str):
+        with self._lock:
+            if symbol in self._lru:
+                self._lru.move_to_end(symbol)
+                return self._lru[symbol], self._meta[symbol]
+
+        paths = self._paths(symbol)
+        if not os.path.exists(paths["meta"]):
+            return None, None
+        try:
+            with open(paths["meta"], "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            index = np.load(paths["index"], mmap_mode="r")
+            values = np.load(paths["ohlcv"], mmap_mode="r")
+        except (OSError, ValueError):
+            return None, None
+        if len(index) != meta.get("rows") or len(values) != meta.get("rows"):
+            return None, None  # 쓰기 도중 중단된 경우
+
+        idx = pd.DatetimeIndex(pd.to_datetime(np.asarray(index), unit="ns", utc=True), name="Date").tz_convert(meta["tz"])
+        df = pd.DataFrame(values, index=idx, columns=OHLCV_COLUMNS)
+        self._remember(symbol, df, meta)
+        return df, meta
+
+    def _store(self, symbol: str, old: Optional[pd.DataFrame], new: pd.DataFrame, coverage_start=_KEEP):
+        meta = dict(self._meta.get(symbol) or {})
+        meta["checked_at"] = time.time()
+
+        if new is not None and not new.empty:
+            new = new[OHLCV_COLUMNS].astype("float64")
+            if old is not None:
+                if new.index.tz is not None and old.index.tz is not None:
+                    new.index = new.index.tz_convert(old.index.tz)
+                merged = pd.concat([old, new])
+                df = merged[~merged.index.duplicated(keep="last")].sort_index()
+            else:
+                df = new.sort_index()
+        elif old is not None:
+            df = old
+        else:
+            raise ValueError(f"No price data returned for {symbol}")
+
+        if coverage_start is not _KEEP:
+            meta["coverage_start"] = coverage_start.isoformat() if coverage_start else None
+
+        tz = df.index.tz or MARKET_TZ
+        utc_index = (df.index if df.index.tz is not None else df.index.tz_localize(tz)).tz_convert("UTC")
+        meta.update({"tz": str(tz), "rows": len(df)})
+
+        paths = self._paths(symbol)
+        self._atomic_save(paths["index"], utc_index.as_unit("ns").asi8)
+        self._atomic_save(paths["ohlcv"], df[OHLCV_COLUMNS].to_numpy(dtype="float64"))
+        tmp = paths["meta"] + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, paths["meta"])
+
+        self._remember(symbol, df, meta)
+        return df, meta
+
+    @staticmethod
+    def _atomic_save(path: str, array: np.ndarray):
+        tmp = path + ".tmp.npy"
+        np.save(tmp, array)
+        os.replace(tmp, path)
+
+    def _remember(self, symbol: str, df: pd.DataFrame, meta: dict):
+        with self._lock:
+            self._lru[symbol] = df
+            self._meta[symbol] = meta
+            self._lru.move_to_end(symbol)
+            while len(self._lru) > self.lru_size:
+                evicted, _ = self._lru.popitem(last=False)
+                self._meta.pop(evicted, None)
+
+
+# ==========================================
+# 프로세스 공용 인스턴스 (에이전트 간 공유)
+# ==========================================
+_SHARED_CACHES: Dict[str, PriceCache] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def get_price_cache(config: dict) -> Optional[PriceCache]:
+    """config['cache'] 설정으로 저장 경로별 공용 PriceCache 반환 (설정이 없으면 None)"""
+    cache_cfg = config.get("cache") or {}
+    root = cache_cfg.get("price_dir")
+    if not root:
+        return None
+    with _SHARED_LOCK:
+        if root not in _SHARED_CACHES:
+            _SHARED_CACHES[root] = PriceCache(
+                root,
+                ttl_seconds=cache_cfg.get("price_ttl_seconds", 3600),
+                lru_size=cache_cfg.get("price_lru_size", 256),
+                offline=cache_cfg.get("offline", False),
+            )
+        return _SHARED_CACHES[root]
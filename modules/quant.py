@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, TypedDict
+
+from .indicators import rolling_sum
+
+TRADING_DAYS = 252
+
+# ==========================================
+# Cross-sectional Quant Metrics (Universe 단위 일괄 계산)
+# ==========================================
+class UniverseMetrics(TypedDict):
+    metrics: pd.DataFrame               # index=symbol, columns=지표명 (raw float)
+    rolling: Dict[str, pd.DataFrame]    # 지표명 -> (dates x symbols) 시계열
+    correlation: pd.DataFrame           # 일간 수익률 상관계수 행렬 (symbols x symbols)
+
+def _returns(prices: np.ndarray) -> np.ndarray:
+    out = np.full_like(prices, np.nan)
+    out[1:] = prices[1:] / prices[:-1] - 1.0
+    return out
+
+def _rolling_mean_std(x: np.ndarray, window: int):
+    """누적합 기반 이동 평균 / 표본표준편차 (윈도우 내 결측이 있으면 NaN)"""
+    total = rolling_sum(x, window)
+    total_sq = rolling_sum(x * x, window)
+    mean = total / window
+    var = np.maximum(total_sq - total * mean, 0.0) / (window - 1)
+    return mean, np.sqrt(var)
+
+def _beta(returns: np.ndarray, bench: np.ndarray) -> np.ndarray:
+    """종목별 Beta = Cov(r_i, r_b) / Var(r_b) (종목마다 공통 유효 구간만 사용)"""
+    bench = np.broadcast_to(bench.reshape(-1, 1), returns.shape)
+    mask = ~np.isnan(returns) & ~np.isnan(bench)
+    n = mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_r = np.where(mask, returns, 0.0).sum(axis=0) / n
+        mean_b = np.where(mask, bench, 0.0).sum(axis=0) / n
+        dev_b = np.where(mask, bench - mean_b, 0.0)
+        cov = (np.where(mask, returns - mean_r, 0.0) * dev_b).sum(axis=0) / (n - 1)
+        var_b = (dev_b ** 2).sum(axis=0) / (n - 1)
+        return cov / var_b
+
+def _pairwise_corr(returns: np.ndarray) -> np.ndarray:
+    """
+    결측을 허용하는 Pearson 상관계수 행렬 (종목 쌍마다 공통 유효 구간 사용)
+    pandas.DataFrame.corr()의 pairwise 루프 대신 행렬곱(BLAS) 몇 번으로 계산
+    """
+    mask = (~np.isnan(returns)).astype("float64")
+    x = np.where(mask > 0, returns, 0.0)
+    n = mask.T @ mask
+    sum_x = x.T @ mask           # [i, j]: i, j 모두 유효한 구간의 x_i 합
+    sum_sq = (x * x).T @ mask
+    sum_xy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sum_xy - sum_x * sum_x.T
+        var = (n * sum_sq - sum_x ** 2) * (n * sum_sq - sum_x ** 2).T
+        corr = cov / np.sqrt(var)
+    corr[n < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def compute_universe_metrics(prices: pd.DataFrame, benchmark: Optional[pd.Series] = None,
+                             momentum_window: int = 20, rolling_window: int = 63,
+                             risk_free_rate: float = 0.0) -> UniverseMetrics:
+    """
+    [New] 종가 행렬(dates x symbols)에서 전 종목 지표를 한 번의 벡터 연산으로 계산
+
+    Args:
+        prices: 종가 Wide DataFrame (상장 전 등 결측은 NaN)
+        benchmark: 벤치마크 종가 Series (예: SPY). 주어지면 beta 계산
+        momentum_window: 단기 수익률 구간 (기본 20거래일 ≈ 1개월)
+        rolling_window: rolling 변동성/Sharpe 구간
+        risk_free_rate: 연율 무위험 수익률
+    """
+    prices = prices.sort_index()
+    close = prices.to_numpy(dtype="float64")
+    filled = prices.ffill().to_numpy(dtype="float64")
+    returns = _returns(close)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 1. Risk / Return
+        vol = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+        ann_return = np.nanmean(returns, axis=0) * TRADING_DAYS
+        sharpe = (ann_return - risk_free_rate) / vol
+
+        # 2. Momentum (최근 momentum_window 봉 수익률, 기존 iloc[-20] 기준과 동일)
+        momentum = filled[-1] / filled[-momentum_window] - 1.0 if len(filled) >= momentum_window else np.full(close.shape[1], np.nan)
+
+        # 3. Drawdown (fmax.accumulate는 NaN을 건너뜀)
+        peak = np.fmax.accumulate(close, axis=0)
+        drawdown = close / peak - 1.0
+        max_drawdown = np.nanmin(drawdown, axis=0)
+
+    metrics = pd.DataFrame({
+        "volatility_annual": vol,
+        "1m_return": momentum,
+        "max_drawdown": max_drawdown,
+        "annual_return": ann_return,
+        "sharpe": sharpe,
+    }, index=prices.columns)
+
+    # 4. Rolling 지표
+    rolling_mean, rolling_std = _rolling_mean_std(returns, rolling_window)
+    rolling_vol = rolling_std * np.sqrt(TRADING_DAYS)
+    rolling_mean = rolling_mean * TRADING_DAYS
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling_momentum = np.full_like(close, np.nan)
+        rolling_momentum[momentum_window - 1:] = filled[momentum_window - 1:] / filled[:len(filled) - momentum_window + 1] - 1.0
+        rolling_sharpe = (rolling_mean - risk_free_rate) / rolling_vol
+
+    def as_frame(values):
+        return pd.DataFrame(values, index=prices.index, columns=prices.columns)
+
+    rolling = {
+        "volatility_annual": as_frame(rolling_vol),
+        "1m_return": as_frame(rolling_momentum),
+        "drawdown": as_frame(drawdown),
+        "sharpe": as_frame(rolling_sharpe),
+    }
+
+    # 5. Beta (벤치마크 대비)
+    if benchmark is not None:
+        bench_close = benchmark.reindex(prices.index).to_numpy(dtype="float64")
+        metrics["beta"] = _beta(returns, _returns(bench_close.reshape(-1, 1))[:, 0])
+
+    correlation = pd.DataFrame(_pairwise_corr(returns), index=prices.columns, columns=prices.columns)
+
+    return {"metrics": metrics, "rolling": rolling, "correlation": correlation}
+
+# ==========================================
+# Report Boundary (문자열 포맷은 여기서만)
+# ==========================================
+PERCENT_METRICS = {"volatility_annual", "1m_return", "max_drawdown", "annual_return"}
+
+def format_quant_metrics(metrics: Dict[str, float]) -> Dict[str, str]:
+    """raw float 지표 -> 리포트용 문자열 (예: 0.4213 -> '42.13%')"""
+    formatted = {}
+    for name, value in metrics.items():
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            formatted[name] = "N/A"
+        elif name in PERCENT_METRICS:
+            formatted[name] = f"{value:.2%}"
+        else:
+            formatted[name] = f"{value:.2f}"
+    return formatted
@@ -0,0 +1,150 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .indicators import RSI, frames_to_panel
+from .quant import TRADING_DAYS
+from .tools import MarketDataManager
+from .tracing import span
+
+# ==========================================
+# Universe Pre-screen (LLM 그래프 진입 전 규칙 필터)
+# ==========================================
+# 규칙은 pandas eval 식 (종목별 피처 컬럼 + @이름 = config.parameters 값), 하나라도 참이면 통과
+DEFAULT_RULES = {
+    "oversold": "rsi < @rsi_threshold",
+    "overbought": "rsi > 100 - @rsi_threshold",
+}
+
+FEATURES = ("close", "rsi", "volatility", "return_1m", "drawdown", "max_drawdown", "volume_spike")
+
+def _latest(values: np.ndarray) -> np.ndarray:
+    """(T, N) -> 종목별 마지막 유효값 (N,) (거래정지 등으로 마지막 날짜가 비어 있어도 직전 값 사용)"""
+    valid = ~np.isnan(values)
+    last = values.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    out = values[last, np.arange(values.shape[1])]
+    out[~valid.any(axis=0)] = np.nan
+    return out
+
+def compute_features(panel: Dict[str, np.ndarray], rsi_period: int = 14, window: int = 20) -> Dict[str, np.ndarray]:
+    """
+    Panel(T x N) -> 종목별 최신 피처 (N,)
+    - rsi: Wilder RSI / volatility: 최근 window봉 일간 수익률 연율 변동성 / return_1m: window봉 수익률
+    - drawdown: 구간 고점 대비 현재 낙폭 / max_drawdown: 구간 최대 낙폭
+    - volume_spike: 마지막 거래량 / 직전 window봉 평균 거래량 (Volume이 없으면 NaN)
+    """
+    close = panel["Close"]
+    filled = pd.DataFrame(close).ffill().to_numpy()
+    n = close.shape[1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = RSI(rsi_period).compute({"Close": filled})[0]
+        returns = np.full_like(filled, np.nan)
+        returns[1:] = filled[1:] / filled[:-1] - 1.0
+        # 최근 window봉 표본표준편차 (유효 수익률이 2개 미만이면 NaN)
+        recent = returns[-window:]
+        count = (~np.isnan(recent)).sum(axis=0)
+        mean = np.nansum(recent, axis=0) / count
+        volatility = np.sqrt(np.nansum((recent - mean) ** 2, axis=0) / (count - 1))
+        volatility[count < 2] = np.nan
+        peak = np.fmax.accumulate(close, axis=0)
+        drawdown = close / peak - 1.0
+        # window봉 수익률: 마지막 종가 / window봉 전 종가 (window+1개 시점 필요)
+        return_1m = filled[-1] / filled[-window - 1] - 1.0 if len(filled) > window else np.full(n, np.nan)
+
+        volume_spike = np.full(n, np.nan)
+        volume = panel.get("Volume")
+        if volume is not None and len(volume) > window:
+            base = np.nanmean(volume[-window - 1:-1], axis=0)
+            volume_spike = _latest(volume) / np.where(base > 0, base, np.nan)
+
+    return {
+        "close": _latest(close),
+        "rsi": _latest(next(iter(rsi.values()))),
+        "volatility": volatility * np.sqrt(TRADING_DAYS),
+        "return_1m": return_1m,
+        "drawdown": _latest(drawdown),
+        "max_drawdown": np.fmin.reduce(drawdown, axis=0),
+        "volume_spike": volume_spike,
+    }
+
+class ScreenResult(NamedTuple):
+    selected: List[str]             # 규칙을 하나 이상 만족한 종목 (입력 순서)
+    hits: Dict[str, List[str]]      # 종목 -> 만족한 규칙 이름
+    features: pd.DataFrame          # index=symbol, columns=FEATURES
+    missing: List[str]              # 가격 데이터를 불러오지 못한 종목 (규칙 평가 불가, 그래프로 보내지 않음)
+
+class Screener:
+    """
+    [New] 전 종목 가격 Panel에서 피처를 한 번에 계산하고 규칙 식을 벡터 평가하여 LLM 그래프로 보낼 종목만 고르는 단계
+    - 규칙/파라미터는 config.screen.rules + config.parameters (rsi_threshold, lookback_period)
+    - 식 오류(없는 피처/파라미터 이름)는 생성 시점에 ValueError
+    """
+    def __init__(self, rules: Optional[Dict[str, str]] = None, params: Optional[Dict] = None,
+                 period: str = "1y", rsi_period: int = 14, window: int = 20, max_workers: int = 8):
+        self.rules = dict(rules or DEFAULT_RULES)
+        self.params = {k: v for k, v in (params or {}).items() if isinstance(v, (int, float))}
+        self.period = period
+        self.rsi_period = rsi_period
+        self.window = window
+        self.max_workers = max_workers
+        empty = pd.DataFrame(columns=list(FEATURES), dtype="float64")
+        for name in self.rules:
+            try:
+                self._evaluate(empty, name)
+            except Exception as e:
+                raise ValueError(f"Invalid screen rule '{name}': {self.rules[name]} ({e})") from e
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["Screener"]:
+        """screen.enabled가 false면 None (모든 종목을 그래프로 보냄)"""
+        screen_cfg = config.get('screen') or {}
+        if not screen_cfg.get('enabled', False):
+            return None
+        params = config.get('parameters') or {}
+        return cls(rules=screen_cfg.get('rules'), params=params,
+                   period=params.get('lookback_period', "1y"),
+                   rsi_period=screen_cfg.get('rsi_period', 14),
+                   window=screen_cfg.get('window', 20),
+                   max_workers=(config.get('concurrency') or {}).get('price') or 8)
+
+    def _evaluate(self, features: pd.DataFrame, name: str) -> pd.Series:
+        result = features.eval(self.rules[name], local_dict=self.params, engine="python")
+        return pd.Series(result, index=features.index).fillna(False).astype(bool)
+
+    def evaluate(self, features: pd.DataFrame) -> pd.DataFrame:
+        """피처 표 -> (symbol x rule) bool 표 (NaN 비교는 False)"""
+        return pd.DataFrame({name: self._evaluate(features, name) for name in self.rules}, index=features.index)
+
+    def features(self, frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        _, symbols, panel = frames_to_panel(frames, fields=("Close", "Volume"))
+        return pd.DataFrame(compute_features(panel, self.rsi_period, self.window), index=symbols)
+
+    def load(self, data_manager: MarketDataManager, symbols: Sequence[str]):
+        """종목별 가격 조회 (캐시 hit는 로컬, miss만 네트워크) -> (frames, missing)"""
+        def fetch(symbol):
+            try:
+                df = data_manager.get_price_history(symbol, period=self.period)
+                return df if len(df) else None
+            except Exception as e:
+                print(f"⚠️ [Screener] Price history unavailable for {symbol}: {e}", file=sys.stderr)
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            loaded = dict(zip(symbols, pool.map(fetch, symbols)))
+        frames = {symbol: df for symbol, df in loaded.items() if df is not None}
+        return frames, [symbol for symbol, df in loaded.items() if df is None]
+
+    def screen(self, data_manager: MarketDataManager, symbols: Sequence[str]) -> ScreenResult:
+        symbols = list(dict.fromkeys(symbols))
+        with span("prescreen", kind="node", symbols=len(symbols)) as s:
+            frames, missing = self.load(data_manager, symbols)
+            features = self.features(frames) if frames else pd.DataFrame(columns=list(FEATURES), dtype="float64")
+            matched = self.evaluate(features)
+            hits = {symbol: [name for name in self.rules if row[name]]
+                    for symbol, row in matched[matched.any(axis=1)].iterrows()}
+            selected = [symbol for symbol in symbols if symbol in hits]
+            s.add(screened=len(symbols), selected=len(selected))
+        return ScreenResult(selected, hits, features, missing)
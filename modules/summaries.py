@@ -0,0 +1,127 @@
+import math
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .quant import format_quant_metrics
+
+# ==========================================
+# Analyst Summary (Supervisor 입력용 정형 요약)
+# ==========================================
+CHARS_PER_TOKEN = 4  # 토크나이저 없이 쓰는 근사치 (영문 기준 약 4글자 = 1토큰)
+
+class SummaryLimits(NamedTuple):
+    max_items: int = 5                  # 목록 필드(지지/저항, 패턴, 관계 등) 최대 항목 수
+    section_tokens: int = 200           # 분석가 요약 1개의 최대 토큰
+    prompt_tokens: int = 1200           # Supervisor 프롬프트 전체 토큰 예산
+    output_tokens: Optional[int] = 300  # Supervisor 응답 최대 토큰 (None = 모델 기본값)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SummaryLimits":
+        cfg = config.get('summaries') or {}
+        return cls(**{field: cfg[field] for field in cls._fields if field in cfg})
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def clip(text: str, max_tokens: int) -> str:
+    """max_tokens를 넘으면 단어 경계에서 자르고 '…' 표시"""
+    limit = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:max(0, limit - 1)]
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip(" ,;:") + "…"
+
+def _items(values: Any, max_items: int) -> List[str]:
+    if values is None:
+        return []
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    items = [str(v) for v in values[:max_items]]
+    if len(values) > max_items:
+        items.append(f"(+{len(values) - max_items} more)")
+    return items
+
+# ------------------------------------------
+# 분석가별 요약 (필드 고정, 목록/문장 길이 제한)
+# ------------------------------------------
+def summarize_chart(analysis: Optional[Dict], limits: SummaryLimits = SummaryLimits()) -> Dict[str, Any]:
+    """VisionAnalyst JSON -> trend / risk_score / levels / patterns / signals / summary"""
+    analysis = analysis or {}
+    if "error" in analysis:
+        return {"status": "unavailable", "error": clip(str(analysis["error"]), 30)}
+    return {
+        "trend": analysis.get("trend", "Unknown"),
+        "risk_score": analysis.get("risk_score"),
+        "levels": _items(analysis.get("support_resistance"), limits.max_items),
+        "patterns": _items(analysis.get("patterns"), limits.max_items),
+        "signals": _items(analysis.get("signals"), limits.max_items),
+        "summary": clip(str(analysis.get("summary", "")), limits.section_tokens // 2),
+    }
+
+def summarize_quant(metrics: Optional[Dict[str, float]]) -> Dict[str, Any]:
+    """raw float 지표 -> 리포트용 문자열 (지표 수가 고정이라 별도 제한 없음)"""
+    return format_quant_metrics(metrics or {})
+
+def summarize_knowledge(context: Optional[str], limits: SummaryLimits = SummaryLimits()) -> Dict[str, Any]:
+    """format_entity_context 텍스트 -> 관계 목록 (글자 수가 아니라 관계 단위로 자름)"""
+    lines = (context or "").splitlines()
+    relations = [line[2:].strip() for line in lines if line.startswith("- ")]
+    if not relations:
+        return {"relations": [], "note": clip((context or "No graph data found.").strip(), 40)}
+    return {"relations": _items(relations, limits.max_items), "total": len(relations)}
+
+# ------------------------------------------
+# Supervisor Prompt (토큰 예산 내 조립)
+# ------------------------------------------
+def render_section(fields: Dict[str, Any]) -> str:
+    lines = []
+    for key, value in fields.items():
+        if isinstance(value, list):
+            value = "; ".join(value) if value else "none"
+        lines.append(f"- {key}: {value}")
+    return "\n".join(lines)
+
+def fit_sections(sections: Dict[str, str], budget_tokens: int) -> Dict[str, str]:
+    """
+    섹션 텍스트들을 합계 budget_tokens 이내로 맞춤 (water-filling)
+    예산보다 작은 섹션은 그대로 두고, 남은 예산을 큰 섹션들에 균등 분배하여 자른다.
+    """
+    sizes = {name: estimate_tokens(text) for name, text in sections.items()}
+    fitted, remaining = {}, max(0, budget_tokens)
+    pending = sorted(sections, key=lambda name: sizes[name])
+    while pending:
+        share = remaining // len(pending)
+        name = pending.pop(0)
+        if sizes[name] <= share:
+            fitted[name] = sections[name]
+            remaining -= sizes[name]
+        else:
+            # 가장 작은 섹션도 몫을 넘으면 나머지도 모두 넘으므로 같은 몫으로 자름
+            for name in [name] + pending:
+                fitted[name] = clip(sections[name], share)
+            break
+    return {name: fitted[name] for name in sections}
+
+SUPERVISOR_TEMPLATE = """You are the Chief Investment Officer (CIO) of Neural Fusion Lab.
+Synthesize the analyst summaries below into a final investment decision for '{symbol}'.
+
+{sections}
+
+Output format:
+- Decision: [BUY / SELL / HOLD]
+- Confidence Score: [1-10]
+- Key Rationale: (Summarize within 3 sentences)"""
+
+def build_supervisor_prompt(symbol: str, summaries: Dict[str, Dict[str, Any]],
+                            limits: SummaryLimits = SummaryLimits()) -> str:
+    """분석가 요약 -> 섹션별 '- key: value' 블록, 전체가 limits.prompt_tokens를 넘지 않도록 조립"""
+    overhead = estimate_tokens(SUPERVISOR_TEMPLATE.format(symbol=symbol, sections=""))
+    titles = {name: f"[{name.replace('_', ' ').title()}]" for name in summaries}
+    overhead += sum(estimate_tokens(title) + 1 for title in titles.values())
+    sections = fit_sections({name: clip(render_section(fields), limits.section_tokens)
+                             for name, fields in summaries.items()},
+                            limits.prompt_tokens - overhead)
+    body = "\n\n".join(f"{titles[name]}\n{text}" for name, text in sections.items())
+    return SUPERVISOR_TEMPLATE.format(symbol=symbol, sections=body or "(no analyst reports)")
@@ -1,21 +1,37 @@
-import yfinance as yf
 import pandas as pd
-from typing import Dict, Any
+from datetime import date
+from typing import Dict, Any, Optional, Sequence
+
+from .price_cache import PriceCache
+from .indicators import IndicatorEngine, frame_to_panel
+from .limits import backend_slot
 
 class MarketDataManager:
     """
     yfinance를 래핑하여 시계열 데이터와 기본 기술적 지표를 제공하는 클래스
     """
-    def __init__(self):
-        pass
+    def __init__(self, cache: Optional[PriceCache] = None, indicators: Optional[Sequence[str]] = None):
+        # cache가 주어지면 로컬 가격 저장소를 먼저 조회 (Hit 시 네트워크 접근 없음)
+        self.cache = cache
+        self.indicator_engine = IndicatorEngine(indicators)
 
     def get_price_history(self, symbol: str, period: str = "1y") -> pd.DataFrame:
+        if self.cache is not None:
+            return self.cache.get(symbol, period, fetch=self._fetch_history)
+        return self._fetch_history(symbol, period=period)
+
+    def _fetch_history(self, symbol: str, period: Optional[str] = None, start: Optional[date] = None) -> pd.DataFrame:
+        """yfinance 원본 조회 (start가 주어지면 해당 일자 이후 꼬리 구간만)"""
+        import yfinance as yf  # 캐시 hit / 오프라인 실행에서는 로드하지 않음
         ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period)
-        return df
+        with backend_slot("price"):
+            if start is not None:
+                return ticker.history(start=start.isoformat())
+            return ticker.history(period=period)
 
     def get_financial_summary(self, symbol: str) -> Dict[str, Any]:
         """주요 재무 정보 요약"""
+        import yfinance as yf
         ticker = yf.Ticker(symbol)
         info = ticker.info
         return {
@@ -25,15 +41,14 @@ class MarketDataManager:
             "current_price": info.get("currentPrice")
         }
 
-    def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """간단한 기술적 지표 추가 (TA-Lib 대체 가능)"""
-        df = df.copy()
-        # SMA 20 (이동평균선)
-        df['SMA_20'] = df['Close'].rolling(window=20).mean()
-        # RSI 계산 로직 (간소화)
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
+    def add_technical_indicators(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        [Upgrade] 선언된 지표(SMA, EMA, Wilder RSI, Bollinger, ATR, MACD)를 NumPy 커널로 계산하여 컬럼 추가
+        inplace=False여도 원본 데이터는 복사하지 않고(shallow copy) 새 컬럼만 붙인다.
+        """
+        indicators = self.indicator_engine.compute(frame_to_panel(df))
+        if not inplace:
+            df = df.copy(deep=False)
+        for name, values in indicators.items():
+            df[name] = values[:, 0]
         return df
@@ -0,0 +1,227 @@
+import argparse
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# ==========================================
+# Span (노드 / 외부 호출 단위 계측)
+# ==========================================
+_IDS = itertools.count(1)  # span id = {pid}-{순번} (uuid보다 저렴, 프로세스 내 유일)
+
+class Span:
+    """
+    [New] 하나의 계측 구간 (wall / CPU 시간 + 속성 + 카운터)
+    - set(): 값 기록 (예: model, symbol)
+    - add(): 누적 카운터 (예: prompt_tokens, image_bytes, cache_hit)
+    CPU 시간은 현재 스레드 기준 (time.thread_time) -> 외부 응답 대기 시간은 wall에만 포함된다.
+    """
+    __slots__ = ("name", "kind", "span_id", "parent_id", "trace_id", "attrs", "counters",
+                 "_start", "_cpu_start", "_ts")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], attrs: Dict):
+        self.name = name
+        self.kind = kind
+        self.span_id = f"{os.getpid():x}-{next(_IDS):x}"
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.attrs = attrs
+        self.counters: Dict[str, float] = {}
+        self._ts = time.time()
+        self._start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, **counters):
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def finish(self, error: Optional[BaseException] = None) -> Dict:
+        record = {
+            "ts": self._ts,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "wall_s": time.perf_counter() - self._start,
+            "cpu_s": time.thread_time() - self._cpu_start,
+            "status": "error" if error else "ok",
+        }
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if self.counters:
+            record["counters"] = self.counters
+        return record
+
+class _NullSpan:
+    """계측이 꺼져 있을 때 사용하는 no-op span"""
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, **counters):
+        pass
+
+NULL_SPAN = _NullSpan()
+_CURRENT: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("tracing_span", default=None)
+
+# ==========================================
+# Tracer (JSONL exporter)
+# ==========================================
+class Tracer:
+    """
+    [New] 종료된 span을 JSONL로 기록 ({log_dir}/trace-{run_id}.jsonl, 한 줄 = 한 span)
+    span 생성/종료는 perf_counter 2회 + dict 1개 수준이고 기록은 버퍼링된 append라
+    운영 환경에서도 켜 둘 수 있다. enabled=False면 span()은 NULL_SPAN만 반환한다.
+    """
+    def __init__(self, log_dir: Optional[str] = None, enabled: bool = True, run_id: Optional[str] = None,
+                 keep_records: int = 100_000):
+        self.enabled = enabled
+        self.run_id = run_id or time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self.path = os.path.join(log_dir, f"trace-{self.run_id}.jsonl") if (enabled and log_dir) else None
+        # 현재 프로세스의 요약용 (파일이 없어도 summary 가능, 오래 도는 프로세스에서는 최근 keep_records개만)
+        self.records = deque(maxlen=keep_records)
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Tracer":
+        tracing_cfg = config.get('tracing') or {}
+        return cls(log_dir=(config.get('paths') or {}).get('log_dir'),
+                   enabled=tracing_cfg.get('enabled', True))
+
+    @contextmanager
+    def span(self, name: str, kind: str = "call", **attrs) -> Iterator:
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        current = Span(name, kind, _CURRENT.get(), attrs)
+        token = _CURRENT.set(current)
+        error = None
+        try:
+            yield current
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _CURRENT.reset(token)
+            self.emit(current.finish(error))
+
+    def emit(self, record: Dict):
+        record["run_id"] = self.run_id
+        with self._lock:
+            self.records.append(record)
+            if self.path is None:
+                return
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def summary(self) -> List[Dict]:
+        with self._lock:
+            return summarize(list(self.records))
+
+# ==========================================
+# 프로세스 공용 Tracer
+# ==========================================
+_TRACER = Tracer(enabled=False)
+
+def configure_tracing(config: Optional[dict]) -> Tracer:
+    """config(paths.log_dir, tracing.enabled)로 프로세스 공용 Tracer 교체"""
+    global _TRACER
+    _TRACER.close()
+    _TRACER = Tracer.from_config(config or {})
+    return _TRACER
+
+def get_tracer() -> Tracer:
+    return _TRACER
+
+def span(name: str, kind: str = "call", **attrs):
+    """공용 Tracer의 span (예: with span("vision", model=...) as s: s.add(image_bytes=n))"""
+    return _TRACER.span(name, kind, **attrs)
+
+def current_span():
+    """현재 컨텍스트의 span (없거나 계측이 꺼져 있으면 NULL_SPAN)"""
+    return _CURRENT.get() or NULL_SPAN
+
+def record_usage(response):
+    """LangChain 응답의 usage_metadata(토큰 수)를 현재 span에 누적"""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage:
+        current_span().add(prompt_tokens=usage.get("input_tokens", 0),
+                           completion_tokens=usage.get("output_tokens", 0))
+
+# ==========================================
+# Summary
+# ==========================================
+def read_records(paths: Iterable[str]) -> Iterator[Dict]:
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def summarize(records: Iterable[Dict]) -> List[Dict]:
+    """(kind, name)별 호출 수 / wall 합계·평균·p95 / CPU 합계 / 오류 수 / 카운터 합계"""
+    groups: Dict[tuple, Dict] = {}
+    for record in records:
+        row = groups.setdefault((record["kind"], record["name"]),
+                                {"kind": record["kind"], "name": record["name"], "walls": [], "cpu_s": 0.0,
+                                 "errors": 0, "counters": {}})
+        row["walls"].append(record["wall_s"])
+        row["cpu_s"] += record.get("cpu_s", 0.0)
+        row["errors"] += record.get("status") == "error"
+        for key, value in (record.get("counters") or {}).items():
+            row["counters"][key] = row["counters"].get(key, 0) + value
+
+    rows = []
+    for row in groups.values():
+        walls = sorted(row.pop("walls"))
+        rows.append({**row, "count": len(walls), "wall_s": sum(walls), "mean_s": sum(walls) / len(walls),
+                     "p95_s": walls[min(len(walls) - 1, int(0.95 * len(walls)))]})
+    return sorted(rows, key=lambda r: (r["kind"] != "run", r["kind"] != "node", -r["wall_s"]))
+
+def format_summary(rows: List[Dict]) -> str:
+    lines = [f"{'kind':<6} {'name':<18} {'count':>6} {'wall s':>9} {'mean s':>8} {'p95 s':>8} {'cpu s':>8} "
+             f"{'err':>4}  counters"]
+    for row in rows:
+        counters = ", ".join(f"{k}={v:g}" for k, v in sorted(row["counters"].items()))
+        lines.append(f"{row['kind']:<6} {row['name']:<18} {row['count']:>6} {row['wall_s']:>9.2f} "
+                     f"{row['mean_s']:>8.3f} {row['p95_s']:>8.3f} {row['cpu_s']:>8.2f} {row['errors']:>4}  {counters}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize trace JSONL files into a per-run table")
+    parser.add_argument("paths", nargs="+", help="trace-*.jsonl files")
+    parser.add_argument("--run", help="Only include this run_id")
+    args = parser.parse_args(argv)
+
+    records = (r for r in read_records(args.paths) if args.run is None or r.get("run_id") == args.run)
+    print(format_summary(summarize(records)))
+
+if __name__ == "__main__":
+    sys.exit(main())
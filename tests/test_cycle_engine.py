@@ -0,0 +1,35 @@
+import numpy as np
+
+from experiments.exp_04_structural_analysis.cycle_engine import CycleEngine
+
+def test_amount_filter_uses_qualifying_parallel_edge():
+    """같은 u -> v 거래가 여러 건이면 금액 조건을 만족하는 거래로 고리를 구성해야 함"""
+    src = np.array([0, 0, 1, 2])
+    dst = np.array([1, 1, 2, 0])
+    amount = np.array([10.0, 9e6, 9e6, 9e6])
+    engine = CycleEngine(src, dst, amount)
+    assert engine.count(3) == 1
+    assert engine.count(3, min_amount=5e6) == 1
+    assert engine.count(3, max_amount=100) == 0
+    (ring,) = engine.cycles(3, min_amount=5e6)
+    assert ring.amounts == (9e6, 9e6, 9e6)
+
+def test_max_paths_bounds_every_hop(monkeypatch):
+    """max_paths가 첫 hop뿐 아니라 모든 확장 단계의 부분 경로 수를 제한해야 함"""
+    rng = np.random.default_rng(0)
+    n = 60
+    src, dst = rng.integers(0, n, 600), rng.integers(0, n, 600)
+    expected = [CycleEngine(src, dst).count(k) for k in (3, 4, 5)]
+
+    max_paths = int(np.bincount(src, minlength=n).max())
+    sizes = []
+    extend = CycleEngine._extend
+    def recording(*args):
+        paths = extend(*args)
+        sizes.append(len(paths))
+        return paths
+    monkeypatch.setattr(CycleEngine, "_extend", staticmethod(recording))
+
+    bounded = CycleEngine(src, dst, max_paths=max_paths)
+    assert [bounded.count(k) for k in (3, 4, 5)] == expected
+    assert sizes and max(sizes) <= max_paths
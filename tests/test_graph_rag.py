@@ -0,0 +1,29 @@
+from modules.cache import DiskCache
+from modules.graph_rag import CachedGraphEngine, GraphRAGEngine
+
+class FakeGraphEngine(GraphRAGEngine):
+    """Neo4j 없이 query_supply_chain_many 결과만 바꿔 가며 돌려주는 엔진"""
+    def __init__(self):
+        self.depth, self.limit = 1, 10
+        self._prefetched = {}
+        self.partner = "TSMC"
+        self.calls = 0
+
+    def query_supply_chain_many(self, symbols, depth=None, limit=None):
+        self.calls += 1
+        return {symbol: [{"c.name": symbol, "relation": "SUPPLIES_TO", "related_company": self.partner, "hops": 1}]
+                for symbol in symbols}
+
+def test_invalidate_clears_prefetched_relations(tmp_path):
+    engine = FakeGraphEngine()
+    engine.prefetch(["NVDA", "AMD"])
+    engine.partner = "Samsung"  # 그래프 갱신
+    assert engine.query_supply_chain("NVDA")[0]["related_company"] == "TSMC"
+
+    cached = CachedGraphEngine(engine, DiskCache(str(tmp_path)))
+    cached.invalidate("NVDA")
+    assert cached.query_supply_chain("NVDA")[0]["related_company"] == "Samsung"
+    assert cached.query_supply_chain("AMD")[0]["related_company"] == "TSMC"
+    cached.invalidate()
+    assert "Samsung" in cached.get_entity_context("AMD")
+    assert engine._prefetched == {}
@@ -0,0 +1,27 @@
+from modules.graph_snapshot import GraphSnapshot, LocalGraphEngine
+
+def _chain(n):
+    nodes = [(f"S{i}", f"Company {i}") for i in range(n)]
+    edges = [(f"S{i}", f"S{i + 1}", "SUPPLIES_TO") for i in range(n - 1)]
+    return GraphSnapshot.from_edges(nodes, edges)
+
+def test_save_over_live_snapshot_keeps_mmap_readers(tmp_path):
+    """mmap으로 열린 스냅샷 위에 작은 스냅샷을 다시 저장해도 실행 중인 엔진의 결과는 그대로여야 함"""
+    _chain(2000).save(str(tmp_path))
+    live = LocalGraphEngine(GraphSnapshot.load(str(tmp_path), mmap=True))
+    before = live.k_hop("S1", k=2)
+    assert {row["key"] for row in before} == {"S0", "S2", "S3"}
+
+    for _ in range(3):
+        _chain(10).save(str(tmp_path))
+    assert live.k_hop("S1", k=2) == before
+    assert live.snapshot.num_nodes == 2000
+
+    reloaded = GraphSnapshot.load(str(tmp_path))
+    assert reloaded.num_nodes == 10
+    assert LocalGraphEngine(reloaded).k_hop("S9", k=3) == [
+        {"key": "S8", "name": "Company 8", "relation": "SUPPLIES_TO", "hops": 1},
+        {"key": "S7", "name": "Company 7", "relation": "SUPPLIES_TO", "hops": 2},
+        {"key": "S6", "name": "Company 6", "relation": "SUPPLIES_TO", "hops": 3},
+    ]
+    assert len([p for p in tmp_path.iterdir() if p.is_dir()]) == 2  # keep=2 -> 오래된 스냅샷 정리
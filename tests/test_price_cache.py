@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from modules.price_cache import MARKET_TZ, OHLCV_COLUMNS, PriceCache, last_complete_session
+
+def _bars(end, scale=1.0):
+    index = pd.bdate_range(end=pd.Timestamp(end), periods=300, tz=MARKET_TZ, name="Date")
+    close = np.linspace(100.0, 200.0, len(index)) * scale
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1e6}, index=index)
+
+class FakeProvider:
+    """end일까지의 봉을 scale배 수정주가로 반환 (start가 있으면 꼬리 구간만)"""
+    def __init__(self, end, scale=1.0):
+        self.end, self.scale, self.calls = end, scale, []
+
+    def __call__(self, symbol, period=None, start=None):
+        self.calls.append("period" if start is None else "tail")
+        df = _bars(self.end, self.scale)
+        return df if start is None else df.loc[df.index >= pd.Timestamp(start, tz=MARKET_TZ)]
+
+def test_tail_fetch_refetches_when_history_is_restated(tmp_path):
+    """분할로 과거 수정주가가 바뀌면 꼬리만 이어 붙이지 않고 전체 구간을 다시 받아야 함"""
+    today = pd.Timestamp(last_complete_session())
+    cache = PriceCache(str(tmp_path), ttl_seconds=0)
+    cache.get("NVDA", "1y", FakeProvider(today - pd.offsets.BDay(5)))
+
+    split = FakeProvider(today, scale=0.5)  # 2:1 분할 -> 과거 봉 전체가 절반으로 재계산됨
+    df = cache.get("NVDA", "1y", split)
+    assert split.calls == ["tail", "period"]
+    returns = df["Close"].pct_change().dropna()
+    assert returns.min() > -0.1  # 가짜 -50% 갭 없음
+    pd.testing.assert_frame_equal(df[OHLCV_COLUMNS], _bars(today, 0.5).loc[df.index[0]:][OHLCV_COLUMNS],
+                                  check_freq=False)
+
+def test_tail_fetch_appends_when_history_is_unchanged(tmp_path):
+    today = pd.Timestamp(last_complete_session())
+    cache = PriceCache(str(tmp_path), ttl_seconds=0)
+    old = _bars(today - pd.offsets.BDay(5))
+    cache.get("NVDA", "1y", lambda symbol, period=None, start=None: old)
+
+    # 과거 봉은 그대로 두고 새 봉만 이어지는 가격 경로
+    extra = pd.bdate_range(today - pd.offsets.BDay(4), today, tz=MARKET_TZ, name="Date")
+    full = pd.concat([old, pd.DataFrame({column: 200.0 for column in OHLCV_COLUMNS}, index=extra)])
+    calls = []
+    def fetch(symbol, period=None, start=None):
+        calls.append("period" if start is None else "tail")
+        return full if start is None else full.loc[full.index >= pd.Timestamp(start, tz=MARKET_TZ)]
+
+    df = cache.get("NVDA", "1y", fetch)
+    assert calls == ["tail"]
+    assert df.index[-1] == full.index[-1]